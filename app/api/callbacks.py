@@ -1,45 +1,212 @@
 # app/api/callbacks.py
-from fastapi import APIRouter, HTTPException, status
-from app.schemas.filtros import FiltrosCallbackPayload
-from app.services.clickup_service import ClickUpService
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.core.serialization import ORJSONResponse
+from app.repositories.filtros_callback_repository import PERCENTILES, FiltrosCallbackRepository
+from app.schemas.filtros import FiltrosCallbackBatch, FiltrosCallbackPayload
+from app.services.callback_recorder import build_row, callback_recorder
+from app.services.write_back_queue import WriteBackJob, write_back_queue
 from app.config import settings
+from app.core.instrumentation import stage, record_outcome
+from app.core import tracing
 
 router = APIRouter()
 
+def _trace_parent(payload: FiltrosCallbackPayload, traceparent: Optional[str]) -> Optional[tracing.SpanContext]:
+    """Traza original del webhook: metadata.traceparent del payload o, si no, el header."""
+    metadata = payload.metadata or {}
+    return (
+        tracing.SpanContext.from_traceparent(metadata.get("traceparent"))
+        or tracing.SpanContext.from_traceparent(traceparent)
+    )
+
+
 @router.post("/filtros", status_code=status.HTTP_200_OK)
-async def handle_filtros_callback(payload: FiltrosCallbackPayload):
+async def handle_filtros_callback(
+    payload: FiltrosCallbackPayload,
+    traceparent: Optional[str] = Header(None)
+):
     """
-    Recibe el resultado del análisis de Filtros AI y actualiza ClickUp.
+    Recibe el resultado del análisis de Filtros AI y encola la escritura en
+    ClickUp (app.services.write_back_queue); responde sin esperar a ClickUp.
+    El span del callback se cuelga de la traza del webhook que originó el dispatch.
     """
-    print(f"📥 Callback recibido para Task {payload.task_id} - Status: {payload.status}")
+    with tracing.start_span(
+        "callbacks.filtros",
+        parent=_trace_parent(payload, traceparent),
+        attributes={"clickup.task_id": payload.task_id, "filtros.status": payload.status},
+    ) as span:
+        dispatched_at = (payload.metadata or {}).get("dispatched_at_ms")
+        if isinstance(dispatched_at, (int, float)):
+            span.set_attribute("pipeline.dispatch_to_callback_ms", int(time.time() * 1000 - dispatched_at))
+        return await _handle_filtros_callback(payload)
 
-    # 1. Validar que el proceso fue exitoso
-    if payload.status != "success":
-        print(f"⚠️ El proceso en Filtros falló: {payload.error}")
-        # Retornamos 200 para que Filtros sepa que recibimos el mensaje, 
-        # aunque no actualicemos ClickUp (o podrías actualizar un campo de error).
-        return {"received": True, "action": "ignored_due_to_error"}
 
+def _check(payload: FiltrosCallbackPayload) -> Optional[str]:
+    """Motivo para no escribir en ClickUp, o None si el resultado es válido."""
+    if payload.status != "success":
+        print(f"⚠️ El proceso en Filtros falló ({payload.task_id}): {payload.error}")
+        # Igual se responde 200 para que Filtros sepa que recibimos el mensaje
+        return "ignored_due_to_error"
     if not payload.artifacts or not payload.artifacts.doc_url:
-        print("⚠️ Payload incompleto: No hay URL del documento")
-        return {"received": True, "action": "ignored_no_url"}
-
-    # 2. Inicializar servicio
-    clickup_service = ClickUpService()
-    
-    # 3. Actualizar ClickUp
-    # Usamos el ID del campo configurado en settings
-    success = await clickup_service.set_custom_field_value(
-        task_id=payload.task_id,
-        field_id=settings.clickup_field_id_ai_link,
-        value=payload.artifacts.doc_url
-    )
+        print(f"⚠️ Payload incompleto ({payload.task_id}): No hay URL del documento")
+        return "ignored_no_url"
+    return None
+
+
+def _enqueue(payload: FiltrosCallbackPayload, trace_parent: Optional[tracing.SpanContext]) -> str:
+    """
+    Valida y encola la escritura del Link AI; devuelve la acción (queued,
+    coalesced, rejected, ignored_*). El resultado queda en filtros_callbacks.
+    """
+    action = _check(payload)
+    if action is not None:
+        callback_recorder.record(build_row(payload, action))
+    else:
+        job = WriteBackJob(
+            task_id=payload.task_id,
+            field_id=settings.clickup_field_id_ai_link,
+            value=payload.artifacts.doc_url,
+            trace_parent=trace_parent,
+        )
+        # on_done antes de encolar: si se fusiona con otra escritura, se hereda
+        row = build_row(payload, "queued")
+        callback_recorder.track(job, row)
+        action = write_back_queue.enqueue(job)
+        if action != "queued":
+            callback_recorder.record({**row, "write_back_status": action})
+    record_outcome("callbacks", action)
+    return action
+
+
+async def _handle_filtros_callback(payload: FiltrosCallbackPayload):
+    print(f"📥 Callback recibido para Task {payload.task_id} - Status: {payload.status}")
+
+    # La escritura en ClickUp la hace la cola (reintentos incluidos): se responde ya
+    with stage("callbacks", "enqueue_write_back"):
+        action = _enqueue(payload, tracing.current_context())
+
+    if action == "rejected":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cola de escrituras a ClickUp llena o apagándose, reintentar más tarde"
+        )
+    return {"received": True, "action": action}
 
-    if not success:
+
+@router.post("/filtros/batch", status_code=status.HTTP_200_OK)
+async def handle_filtros_callback_batch(
+    batch: FiltrosCallbackBatch,
+    traceparent: Optional[str] = Header(None)
+):
+    """
+    Varios resultados de Filtros en una petición. Cada uno se encola con la
+    traza de su webhook (metadata.traceparent); los rechazados por cola llena
+    vienen en la respuesta con action "rejected" para reenviarlos.
+    """
+    if len(batch.results) > settings.callbacks_batch_max_items:
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="Error actualizando ClickUp"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.callbacks_batch_max_items} resultados por lote"
         )
 
-    print(f"✅ ClickUp actualizado correctamente: Task {payload.task_id} -> {payload.artifacts.doc_url}")
-    return {"received": True, "action": "clickup_updated"}
\ No newline at end of file
+    with tracing.start_span(
+        "callbacks.filtros_batch",
+        parent=tracing.SpanContext.from_traceparent(traceparent),
+        attributes={"callbacks.batch_size": len(batch.results)},
+    ):
+        print(f"📥 Lote de {len(batch.results)} callbacks de Filtros")
+        batch_context = tracing.current_context()
+        with stage("callbacks", "enqueue_write_back"):
+            results = [
+                {
+                    "task_id": payload.task_id,
+                    "action": _enqueue(payload, _trace_parent(payload, None) or batch_context),
+                }
+                for payload in batch.results
+            ]
+
+    actions: Dict[str, int] = {}
+    for result in results:
+        actions[result["action"]] = actions.get(result["action"], 0) + 1
+    return {"received": len(results), "actions": actions, "results": results}
+
+
+# Tope de buckets por consulta de /filtros/stats
+MAX_STATS_BUCKETS = 2000
+
+
+def _percentiles(values: Optional[List[Optional[float]]]) -> Dict[str, Optional[float]]:
+    values = values or [None] * len(PERCENTILES)
+    return {f"p{round(p * 100)}": v for p, v in zip(PERCENTILES, values)}
+
+
+def _stats_entry(row: Dict[str, Any], seconds: float) -> Dict[str, Any]:
+    callbacks = row["callbacks"]
+    return {
+        **({"bucket": row["bucket"]} if "bucket" in row else {}),
+        "filtros_version": row["filtros_version"],
+        "callbacks": callbacks,
+        "throughput_per_min": round(callbacks * 60 / seconds, 3),
+        "failures": row["failures"],
+        "failure_rate": round(row["failures"] / callbacks, 4) if callbacks else None,
+        "write_back_failures": row["write_back_failures"],
+        "latency_ms": _percentiles(row["latency_ms"]),
+        "processing_ms": _percentiles(row["processing_ms"]),
+    }
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@router.get("/filtros/stats", response_class=ORJSONResponse)
+def filtros_stats(
+    since: Optional[datetime] = Query(None, description="Desde (ISO 8601, UTC si no trae zona); por defecto, 24 h antes de until"),
+    until: Optional[datetime] = Query(None, description="Hasta (exclusivo); por defecto, ahora"),
+    bucket_minutes: int = Query(60, ge=1, le=10080, description="Tamaño de cada bucket de tiempo"),
+    version: Optional[str] = Query(None, description="Solo esta versión de Filtros"),
+    db: Session = Depends(get_db),
+):
+    """
+    Telemetría del pipeline de IA sobre filtros_callbacks, por versión de
+    Filtros: latencia dispatch -> callback y processing_time_ms (p50/p90/p99),
+    throughput y tasa de fallos, en total y por bucket de tiempo. Los
+    agregados se calculan en Postgres.
+
+    Raises:
+    - 400 si el rango no es válido o hay demasiados buckets
+    - 503 si los resultados no se guardan (CALLBACK_RESULTS_ENABLED=false)
+    """
+    if not settings.callback_results_enabled:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Callback results disabled")
+    until = _utc(until) if until else datetime.now(timezone.utc)
+    since = _utc(since) if since else until - timedelta(hours=24)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since debe ser anterior a until")
+    window = (until - since).total_seconds()
+    bucket_seconds = bucket_minutes * 60
+    if window / bucket_seconds > MAX_STATS_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Demasiados buckets (máximo {MAX_STATS_BUCKETS}): aumentar bucket_minutes o acortar el rango"
+        )
+
+    repo = FiltrosCallbackRepository(db)
+    with stage("callbacks", "stats_query"):
+        totals = repo.stats(since, until, version=version)
+        buckets = repo.stats(since, until, bucket_seconds=bucket_seconds, version=version)
+
+    return {
+        "since": since,
+        "until": until,
+        "bucket_minutes": bucket_minutes,
+        "totals": [_stats_entry(row, window) for row in totals],
+        "buckets": [_stats_entry(row, bucket_seconds) for row in buckets],
+    }
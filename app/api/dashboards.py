@@ -0,0 +1,123 @@
+# app/api/dashboards.py
+"""
+Dashboards de pipeline (leads) y de carga de abogados (Case Assignments).
+
+Leen lead_daily_counts / assignment_counts, que los triggers de Postgres
+mantienen al día en cada upsert: el costo depende de cuántos valores y días
+se piden, no de cuántos leads hay (ver app.repositories.dashboard_repository).
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.instrumentation import stage
+from app.core.serialization import ORJSONResponse
+from app.database import get_db
+from app.models.dashboard import ASSIGNMENT_DIMENSIONS, LEAD_DIMENSIONS
+from app.repositories.dashboard_repository import DashboardRepository
+
+router = APIRouter(prefix="/dashboards", tags=["dashboards"])
+
+
+def _dimensions(requested: Optional[List[str]], allowed) -> List[str]:
+    if not requested:
+        return list(allowed)
+    unknown = [d for d in requested if d not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown dimension: {', '.join(unknown)} (valid: {', '.join(allowed)})"
+        )
+    return list(dict.fromkeys(requested))
+
+
+def _group(rows, dimensions: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Filas (dimension, value, count) -> {dimension: [{value, count}]} de mayor a menor ('' -> null)."""
+    grouped = {d: [] for d in dimensions}
+    for row in rows:
+        grouped[row["dimension"]].append({"value": row["value"] or None, "count": row["count"]})
+    for values in grouped.values():
+        values.sort(key=lambda v: -v["count"])
+    return grouped
+
+
+def _total(grouped: Dict[str, List[Dict[str, Any]]], dimension: str) -> int:
+    """Cada fila cuenta una vez por dimensión: la suma de una dimensión es el total."""
+    return sum(v["count"] for v in grouped.get(dimension, ()))
+
+
+@router.get("/pipeline", response_class=ORJSONResponse)
+def pipeline_dashboard(
+    since: Optional[date] = Query(None, description="Primer día de creación (incluido)"),
+    until: Optional[date] = Query(None, description="Último día de creación (excluido)"),
+    dimension: Optional[List[str]] = Query(None, description=f"Repetible: {', '.join(LEAD_DIMENSIONS)}"),
+    daily: bool = Query(False, description="Incluir la serie por día"),
+    db: Session = Depends(get_db),
+):
+    """
+    Leads por status, case_type, interview_result y pipeline_de_viabilidad,
+    según su día de creación (DASHBOARD_TIMEZONE). Sin rango, todos.
+
+    Returns:
+    - leads: Total de leads en el rango
+    - totals: {dimension: [{value, count}]}
+    - days: [{day, leads, <dimension>: [{value, count}]}] (solo con daily=true)
+
+    Raises:
+    - 400 si since >= until, dimensión desconocida o la serie supera DASHBOARD_MAX_DAYS
+    """
+    dimensions = _dimensions(dimension, LEAD_DIMENSIONS)
+    if since and until and since >= until:
+        raise HTTPException(status_code=400, detail="since debe ser anterior a until")
+    if daily and (not since or not until or (until - since).days > settings.dashboard_max_days):
+        raise HTTPException(
+            status_code=400,
+            detail=f"daily=true requiere since y until (máximo {settings.dashboard_max_days} días)"
+        )
+
+    repo = DashboardRepository(db)
+    with stage("dashboards", "counts_query"):
+        totals = _group(repo.lead_counts(dimensions, since, until), dimensions)
+        by_day = repo.lead_counts(dimensions, since, until, daily=True) if daily else []
+
+    response = {
+        "since": since,
+        "until": until,
+        "timezone": settings.dashboard_timezone,
+        "leads": _total(totals, dimensions[0]),
+        "totals": totals,
+    }
+    if daily:
+        rows_by_day = defaultdict(list)
+        for row in by_day:
+            rows_by_day[row["day"]].append(row)
+        days = []
+        for day, rows in rows_by_day.items():
+            grouped = _group(rows, dimensions)
+            days.append({"day": day, "leads": _total(grouped, dimensions[0]), **grouped})
+        response["days"] = days
+    return response
+
+
+@router.get("/attorneys", response_class=ORJSONResponse)
+def attorney_dashboard(
+    dimension: Optional[List[str]] = Query(None, description=f"Repetible: {', '.join(ASSIGNMENT_DIMENSIONS)}"),
+    db: Session = Depends(get_db),
+):
+    """
+    Case Assignments actuales por abogado_asignado, case_review_status y
+    label_type (carga de trabajo por abogado).
+
+    Returns:
+    - assignments: Total de Case Assignments
+    - totals: {dimension: [{value, count}]}
+    """
+    dimensions = _dimensions(dimension, ASSIGNMENT_DIMENSIONS)
+    with stage("dashboards", "counts_query"):
+        totals = _group(DashboardRepository(db).assignment_counts(dimensions), dimensions)
+    return {"assignments": _total(totals, dimensions[0]), "totals": totals}
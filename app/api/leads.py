@@ -2,21 +2,100 @@
 Endpoints para búsqueda y consulta de leads
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple, Any
 
+from app.config import settings
 from app.database import get_db
+from app.core.cache import (
+    CACHE_REQUESTS, COLLECTION_TAG, etag_matches, response_cache, task_tag
+)
+from app.core.serialization import ORJSONResponse, dumps, row_dict, rows_dicts
+from app.core.text_utils import normalize_name
 from app.repositories.lead_repository import LeadRepository
-from app.schemas.lead import LeadResponse, LeadSearchResponse
+from app.services.change_feed import Subscription, change_feed, latest_seq, oldest_seq, read_changes
+from app.schemas.lead import (
+    LeadResponse, LeadSearchResponse, LeadBatchRequest, LeadBatchResponse
+)
 
 router = APIRouter(prefix="/leads", tags=["leads"])
 
+FIELDS_DESCRIPTION = "Campos a devolver separados por coma (ej: task_id,task_name,status)"
+
+# Sin ?fields se piden todas las columnas del schema, como tuplas (sin ORM)
+RESPONSE_FIELDS = list(LeadResponse.model_fields)
+
+_lead_list_adapter = TypeAdapter(List[LeadResponse])
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Convierte el parámetro `fields` en la lista de columnas a proyectar.
+    Solo acepta campos de LeadResponse; task_id siempre se incluye.
+    """
+    if not fields:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LeadResponse.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    columns = ["task_id"]
+    for f in requested:
+        if f not in columns:
+            columns.append(f)
+    return columns
+
+
+def _cached_json(
+    namespace: str,
+    params: Dict[str, Any],
+    if_none_match: Optional[str],
+    build: Callable[[], Tuple[bytes, List[str]]],
+) -> Response:
+    """
+    Resuelve la respuesta desde la caché (o la construye) y aplica ETag:
+    si el cliente ya tiene la versión vigente responde 304 sin cuerpo.
+    """
+    entry = response_cache.fetch(namespace, params, build)
+    headers = {"ETag": entry.etag, "Cache-Control": "private, must-revalidate"}
+
+    if etag_matches(if_none_match, entry.etag):
+        CACHE_REQUESTS.inc(namespace=namespace, result="not_modified")
+        return Response(status_code=304, headers=headers)
+
+    return ORJSONResponse(content=entry.body, headers=headers)
+
+
+def _lead_dict(row, fields: List[str]) -> Dict[str, Any]:
+    """Row -> dict; con LEADS_RESPONSE_VALIDATION pasa antes por LeadResponse."""
+    data = row_dict(row, fields)
+    if settings.leads_response_validation:
+        return LeadResponse.model_validate(data).model_dump(exclude_unset=True)
+    return data
+
 
-@router.get("/search", response_model=LeadSearchResponse)
+def _lead_dicts(rows, fields: List[str]) -> List[Dict[str, Any]]:
+    data = rows_dicts(rows, fields)
+    if settings.leads_response_validation:
+        return _lead_list_adapter.dump_python(_lead_list_adapter.validate_python(data), exclude_unset=True)
+    return data
+
+
+@router.get(
+    "/search", response_model=LeadSearchResponse, response_model_exclude_unset=True, response_class=ORJSONResponse
+)
 def search_leads(
     q: str = Query(..., min_length=2, description="Nombre a buscar (mínimo 2 caracteres)"),
     limit: int = Query(10, ge=1, le=50, description="Número máximo de resultados"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -27,23 +106,187 @@ def search_leads(
     Query parameters:
     - q: Texto a buscar (mínimo 2 caracteres)
     - limit: Máximo de resultados (default 10, max 50)
+    - fields: Proyección opcional de columnas
 
     Returns:
     - total: Número de resultados encontrados
     - results: Lista de leads ordenados por similitud
     """
+    columns = _parse_fields(fields)
+    selected = columns or RESPONSE_FIELDS
+
+    def build():
+        repo = LeadRepository(db)
+        results = repo.search_by_name(q, limit=limit, columns=selected)
+        return dumps({"total": len(results), "results": _lead_dicts(results, selected)}), [COLLECTION_TAG]
+
+    params = {"q": normalize_name(q), "limit": limit, "fields": columns}
+    return _cached_json("lead_search", params, if_none_match, build)
+
+
+@router.post(
+    "/batch", response_model=LeadBatchResponse, response_model_exclude_unset=True, response_class=ORJSONResponse
+)
+def get_leads_batch(
+    payload: LeadBatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """
+    Resuelve muchos leads en una sola petición y una sola sesión de DB.
+
+    Body:
+    - task_ids: IDs de tareas de ClickUp
+    - mycase_ids: IDs de MyCase
+    (se pueden mezclar; máximo LEADS_BATCH_MAX_IDS en total)
+
+    Query parameters:
+    - fields: Proyección opcional de columnas
+
+    Returns:
+    - task_ids / mycase_ids: {id_de_entrada: {found, lead}}
+    - not_found: Número de IDs sin resultado
+    """
+    task_ids = list(dict.fromkeys(i.strip() for i in payload.task_ids if i.strip()))
+    mycase_ids = list(dict.fromkeys(i.strip() for i in payload.mycase_ids if i.strip()))
+
+    total = len(task_ids) + len(mycase_ids)
+    if total > settings.leads_batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many IDs: {total} (max {settings.leads_batch_max_ids})"
+        )
+
+    selected = _parse_fields(fields) or RESPONSE_FIELDS
     repo = LeadRepository(db)
-    results = repo.search_by_name(q, limit=limit)
+    by_task = repo.get_many_by_task_ids(task_ids, columns=selected)
+    by_mycase = repo.get_many_by_mycase_ids(mycase_ids, columns=selected)
 
-    return {
-        "total": len(results),
-        "results": results
-    }
+    def _items(ids, found):
+        return {
+            i: {"found": True, "lead": _lead_dict(found[i], selected)} if i in found else {"found": False}
+            for i in ids
+        }
 
+    # Respuesta ya en su forma final: se codifica con orjson sin pasar por response_model
+    return ORJSONResponse({
+        "task_ids": _items(task_ids, by_task),
+        "mycase_ids": _items(mycase_ids, by_mycase),
+        "not_found": total - len(by_task) - len(by_mycase),
+    })
 
-@router.get("/{task_id}", response_model=LeadResponse)
+
+CHANGE_KINDS = ("lead", "assignment")
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + dumps(data) + b"\n\n"
+
+
+async def _change_events(subscription: Subscription, cursor: Optional[int]):
+    """
+    Eventos SSE de una suscripción. Con cursor, primero lee lead_changes
+    desde ahí (en páginas) y sigue con los avisos en vivo; lo mismo si la
+    cola se llenó (subscription.lagged). Los avisos que ya salieron en la
+    lectura de la tabla no se repiten.
+    """
+    filters = {"kinds": subscription.kinds, "lists": subscription.lists, "statuses": subscription.statuses}
+    page_size = settings.change_feed_page_size
+    try:
+        yield b"retry: 3000\n\n"
+        catch_up = cursor is not None
+        grace = settings.change_feed_resume_grace_seconds
+        if cursor is None:
+            cursor = await asyncio.to_thread(latest_seq) or 0
+        sent = set()
+
+        while True:
+            if catch_up or subscription.lagged:
+                subscription.lagged = catch_up = False
+                oldest = await asyncio.to_thread(oldest_seq)
+                if oldest is not None and cursor and oldest > cursor + 1:
+                    # El cursor ya se purgó: el cliente debe resincronizar con /leads
+                    yield _sse("reset", {"reason": "cursor_expired", "oldest_seq": oldest})
+                sent = set()
+                while True:
+                    rows = await asyncio.to_thread(read_changes, cursor, page_size, grace, **filters)
+                    grace = 0.0  # solo la primera página: después el cursor ya avanzó
+                    for row in rows:
+                        if row["seq"] not in sent:
+                            sent.add(row["seq"])
+                            yield _sse(row["kind"], row, row["seq"])
+                    if rows:
+                        cursor = max(cursor, rows[-1]["seq"])
+                    if len(rows) < page_size:
+                        break
+                continue
+
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.change_feed_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if event is None or event["seq"] in sent:
+                continue
+            cursor = max(cursor, event["seq"])
+            yield _sse(event["kind"], event, event["seq"])
+    finally:
+        change_feed.unsubscribe(subscription)
+
+
+@router.get("/changes")
+async def stream_lead_changes(
+    kind: Optional[List[str]] = Query(None, description="lead y/o assignment (repetible)"),
+    list_name: Optional[List[str]] = Query(None, alias="list", description="Nombre de lista (repetible)"),
+    status_filter: Optional[List[str]] = Query(None, alias="status", description="Status de ClickUp (repetible)"),
+    since: Optional[int] = Query(None, ge=0, description="Retomar después de este seq (o header Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Feed de cambios de leads y Case Assignments como server-sent events.
+
+    Cada evento: id = seq (cursor), event = kind y data =
+    {seq, task_id, kind, list_name, status, date_updated}. Se reciben solo
+    los cambios que coinciden con los filtros; sin cursor, desde ahora.
+    Al reconectar, el EventSource manda Last-Event-ID y se retoma desde ahí
+    (entrega al menos una vez: puede repetirse algún evento).
+
+    Query parameters:
+    - kind, list, status: Filtros (repetibles; vacío = todos)
+    - since: seq desde el que retomar
+
+    Raises:
+    - 400 si kind o Last-Event-ID no son válidos
+    - 503 si el feed está desactivado (CHANGE_FEED_ENABLED=false)
+    """
+    if not settings.change_feed_enabled:
+        raise HTTPException(status_code=503, detail="Change feed disabled")
+    unknown = [k for k in kind or () if k not in CHANGE_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(unknown)}")
+
+    cursor = since
+    if last_event_id:
+        try:
+            cursor = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    # Suscripción antes de leer la tabla: nada queda entre la lectura y los avisos
+    subscription = change_feed.subscribe(kinds=kind or (), lists=list_name or (), statuses=status_filter or ())
+    return StreamingResponse(
+        _change_events(subscription, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{task_id}", response_model=LeadResponse, response_model_exclude_unset=True, response_class=ORJSONResponse)
 def get_lead(
     task_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -52,24 +295,38 @@ def get_lead(
     Path parameters:
     - task_id: ID de la tarea de ClickUp
 
+    Query parameters:
+    - fields: Proyección opcional de columnas
+
     Returns:
     - Lead completo
 
     Raises:
     - 404 si no existe
     """
-    repo = LeadRepository(db)
-    lead = repo.get_by_task_id(task_id)
+    columns = _parse_fields(fields)
+    selected = columns or RESPONSE_FIELDS
+
+    def build():
+        repo = LeadRepository(db)
+        lead = repo.get_by_task_id(task_id, columns=selected)
 
-    if not lead:
-        raise HTTPException(status_code=404, detail=f"Lead {task_id} not found")
+        if not lead:
+            raise HTTPException(status_code=404, detail=f"Lead {task_id} not found")
 
-    return lead
+        return dumps(_lead_dict(lead, selected)), [task_tag(task_id)]
 
+    params = {"task_id": task_id, "fields": columns}
+    return _cached_json("lead", params, if_none_match, build)
 
-@router.get("/mycase/{mycase_id}", response_model=LeadResponse)
+
+@router.get(
+    "/mycase/{mycase_id}", response_model=LeadResponse, response_model_exclude_unset=True, response_class=ORJSONResponse
+)
 def get_lead_by_mycase(
     mycase_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -78,25 +335,39 @@ def get_lead_by_mycase(
     Path parameters:
     - mycase_id: ID de MyCase (8 dígitos)
 
+    Query parameters:
+    - fields: Proyección opcional de columnas
+
     Returns:
     - Lead completo
 
     Raises:
     - 404 si no existe
     """
-    repo = LeadRepository(db)
-    lead = repo.get_by_mycase_id(mycase_id)
+    columns = _parse_fields(fields)
+    selected = columns or RESPONSE_FIELDS
 
-    if not lead:
-        raise HTTPException(status_code=404, detail=f"Lead with MyCase ID {mycase_id} not found")
+    def build():
+        repo = LeadRepository(db)
+        lead = repo.get_by_mycase_id(mycase_id, columns=selected)
 
-    return lead
+        if not lead:
+            raise HTTPException(status_code=404, detail=f"Lead with MyCase ID {mycase_id} not found")
 
+        # id_mycase no es único: un upsert de otro lead con el mismo id_mycase
+        # (o más reciente) cambia el ganador sin tocar task_tag de este
+        return dumps(_lead_dict(lead, selected)), [task_tag(lead.task_id), COLLECTION_TAG]
 
-@router.get("/", response_model=List[LeadResponse])
+    params = {"mycase_id": mycase_id.strip(), "fields": columns}
+    return _cached_json("lead_mycase", params, if_none_match, build)
+
+
+@router.get("/", response_model=List[LeadResponse], response_model_exclude_unset=True, response_class=ORJSONResponse)
 def list_leads(
     skip: int = Query(0, ge=0, description="Offset para paginación"),
     limit: int = Query(100, ge=1, le=500, description="Límite de registros"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -105,11 +376,18 @@ def list_leads(
     Query parameters:
     - skip: Offset (default 0)
     - limit: Límite de registros (default 100, max 500)
+    - fields: Proyección opcional de columnas
 
     Returns:
     - Lista de leads ordenados por fecha de actualización (más recientes primero)
     """
-    repo = LeadRepository(db)
-    leads = repo.get_all(skip=skip, limit=limit)
+    columns = _parse_fields(fields)
+    selected = columns or RESPONSE_FIELDS
+
+    def build():
+        repo = LeadRepository(db)
+        leads = repo.get_all(skip=skip, limit=limit, columns=selected)
+        return dumps(_lead_dicts(leads, selected)), [COLLECTION_TAG]
 
-    return leads
+    params = {"skip": skip, "limit": limit, "fields": columns}
+    return _cached_json("lead_list", params, if_none_match, build)
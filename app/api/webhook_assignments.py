@@ -1,20 +1,27 @@
 # app/api/webhook_assignments.py
+import asyncio
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Header, Request
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.config import settings
+from app.core.instrumentation import stage, record_outcome
+from app.core import tracing
+from app.core.task_cache import task_cache
+from app.core.webhook_ingress import read_webhook
 from app.services.assignment_service import AssignmentService
 from app.services.clickup_service import ClickUpService
+from app.services.comment_sync_service import COMMENT_EVENTS, sync_comments_background
+from app.services.clickup_hierarchy import clickup_hierarchy
+from app.services.field_catalog import field_catalog
 from app.repositories.assignment_repository import AssignmentRepository
-from app.schemas.case_assignment import CaseAssignmentWebhook, CaseAssignmentResponse
 
 router = APIRouter(prefix="/webhooks", tags=["assignments"])
 
 @router.post("/assignments", response_model=None)
 async def handle_assignment_webhook(
     request: Request,
-    payload: CaseAssignmentWebhook,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     x_signature: Optional[str] = Header(None)
 ):
@@ -22,34 +29,45 @@ async def handle_assignment_webhook(
     Webhook para la lista Case Assignment.
     Valida la entrada, consulta ClickUp API y sincroniza la DB local.
     """
-    # 1. Validar la firma antes de cualquier otra cosa
-    body = await request.body()
-    body_text = body.decode("utf-8")
-    
-    clickup_service = ClickUpService()
-
-    is_valid = clickup_service.verify_webhook_signature(
-        body_text, 
-        x_signature or "", 
-        secret=settings.clickup_webhook_secret_assignments
+    # 1. Validar la firma antes de cualquier otra cosa (sobre los bytes, antes de parsear)
+    payload = await read_webhook(
+        request, "assignments", x_signature, settings.clickup_webhook_secret_assignments
     )
-    
-    if not is_valid:
-        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    clickup_service = ClickUpService()
 
     # 2. Si la firma es válida, procedemos con la lógica
     task_id = payload.task_id
-    task_data = await clickup_service.get_task(task_id)
+    task_cache.note_webhook(payload.event, task_id, payload.history_items)
+
+    # Comentarios: solo latest_comment, sin pedir ni reescribir la tarea
+    if payload.event in COMMENT_EVENTS and settings.comment_sync_enabled:
+        sync_comments_background.enqueued()
+        background_tasks.add_task(sync_comments_background, [task_id], ("assignments",), tracing.current_context())
+        record_outcome("assignments", "comment_sync")
+        return {"status": "queued", "task_id": task_id, "event": payload.event}
+
+    with stage("assignments", "clickup_get_task"):
+        task_data = await clickup_service.get_task(task_id, keep_raw=settings.assignments_store_raw_data)
     
     if not task_data:
+        record_outcome("assignments", "task_not_found")
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found in ClickUp")
 
+    with stage("assignments", "list_metadata"):
+        await asyncio.gather(
+            field_catalog.ensure(task_data.list_id, clickup_service),
+            clickup_hierarchy.ensure(task_data, clickup_service),
+        )
+
     # 2. Transformar los datos usando el Service (Lógica de Negocio)
     # El Service se encarga de aplicar el MAPEO_IDS y formar el JSONB
-    formatted_data = AssignmentService.transform_task(task_data)
+    with stage("assignments", "transform"):
+        formatted_data = AssignmentService.transform_task(task_data)
 
     # 3. Guardar en DB (Repositorio)
     repo = AssignmentRepository(db)
-    repo.upsert(formatted_data)
+    with stage("assignments", "upsert"):
+        written = repo.upsert(formatted_data)
 
+    record_outcome("assignments", "success" if written else "unchanged")
     return {"status": "success", "task_id": task_id, "event": payload.event}
\ No newline at end of file
@@ -5,9 +5,10 @@ Endpoints para webhooks de ClickUp
 from fastapi import APIRouter, Depends, HTTPException, Request, Header, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import Optional
+import asyncio
 import httpx
 import logging
-import json
+import time
 import uuid
 
 from app.database import get_db
@@ -15,7 +16,16 @@ from app.repositories.lead_repository import LeadRepository
 from app.services.lead_service import LeadService
 from app.services.clickup_service import ClickUpService
 from app.services.sheets_service import GoogleSheetsService
+from app.services.comment_sync_service import COMMENT_EVENTS, sync_comments_background
+from app.services.clickup_hierarchy import clickup_hierarchy
+from app.services.field_catalog import field_catalog
 from app.config import settings
+from app.core.instrumentation import stage, dependency, record_outcome, track_background
+from app.core import tracing
+from app.core.clickup_task import ClickUpTask
+from app.core.field_schema import get_schema
+from app.core.task_cache import task_cache
+from app.core.webhook_ingress import read_webhook
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 logger = logging.getLogger(__name__)
@@ -32,32 +42,32 @@ async def clickup_webhook(
     Webhook optimizado: Responde rápido y procesa en segundo plano.
     NOTA: Persistencia en DB deshabilitada temporalmente.
     """
-    # 1. Validación de Firma y Payload (Rápido)
-    body = await request.body()
-    body_text = body.decode("utf-8")
-
+    # 1. Validación de Firma y Payload (Rápido): una lectura, firma sobre bytes, un parseo
+    envelope = await read_webhook(request, "leads", x_signature, settings.clickup_webhook_secret)
+    event = envelope.event
+    task_id = envelope.task_id
     clickup_service = ClickUpService()
-    if not clickup_service.verify_webhook_signature(body_text, x_signature or ""):
-        raise HTTPException(status_code=401, detail="Invalid webhook signature")
-
-    try:
-        payload = await request.json()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
 
-    event = payload.get("event")
-    task_id = payload.get("task_id")
+    # La copia cacheada de la tarea queda obsoleta si el evento es posterior
+    task_cache.note_webhook(event, task_id, envelope.history_items)
 
-    if not task_id:
-        raise HTTPException(status_code=400, detail="Missing task_id")
+    # Comentarios: solo latest_comment / comment_count, sin pedir la tarea
+    if event in COMMENT_EVENTS and settings.comment_sync_enabled:
+        sync_comments_background.enqueued()
+        background_tasks.add_task(sync_comments_background, [task_id], ("leads",), tracing.current_context())
+        record_outcome("leads", "comment_sync")
+        return {"status": "queued", "task_id": task_id, "event": event}
 
     # Solo procesar updates/creates
     if event not in ["taskUpdated", "taskCreated"]:
+        record_outcome("leads", "ignored_event")
         return {"status": "ignored", "event": event}
 
     # 2. Obtener datos básicos de la tarea (Esto es rápido)
-    task_data = await clickup_service.get_task(task_id)
+    with stage("leads", "clickup_get_task"):
+        task_data = await clickup_service.get_task(task_id)
     if not task_data:
+        record_outcome("leads", "task_not_found")
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
     """
     # Filtro de lista
@@ -66,25 +76,28 @@ async def clickup_webhook(
         return {"status": "ignored", "reason": "wrong_list"}
     """
     
+    # Definiciones de la lista (drop_down / labels -> etiqueta) y nombres de
+    # lista / carpeta / espacio; casi siempre ya en memoria
+    with stage("leads", "list_metadata"):
+        await asyncio.gather(
+            field_catalog.ensure(task_data.list_id, clickup_service),
+            clickup_hierarchy.ensure(task_data, clickup_service),
+        )
+
     # 3. Lógica del Trigger
-    link_intake_value = None
-    custom_fields = task_data.get("custom_fields", [])
-
-    for field in custom_fields:
-        if field.get("name") == settings.clickup_trigger_condicional:
-            link_intake_value = field.get("value")
-            break
-
-    # --- PROTECCIÓN CONTRA BUCLES ---
-    ai_link_exists = False
-    for field in custom_fields:
-        if field.get("id") == settings.clickup_field_id_ai_link:
-            if field.get("value"): 
-                ai_link_exists = True
-                break
+    with stage("leads", "trigger"):
+        # Una sola pasada: link de intake, Link AI y los campos del lead
+        custom_fields = field_catalog.decode(task_data.list_id, task_data.custom_fields)
+        field_values = get_schema("trigger", "leads").extract_profiles(custom_fields)
+        trigger_fields = field_values["trigger"]
+        link_intake_value = trigger_fields.get("link_intake")
+
+        # --- PROTECCIÓN CONTRA BUCLES ---
+        ai_link_exists = bool(trigger_fields.get("ai_link"))
     
     if ai_link_exists:
          logger.info(f"Task {task_id} ya tiene Link AI generado. Ignorando para evitar bucle.")
+         record_outcome("leads", "already_processed")
          return {"status": "ignored", "reason": "already_processed"}
 
     # 4. Encolar tareas en Background (Fire and Forget)
@@ -93,33 +106,62 @@ async def clickup_webhook(
         
         # Encolamos el Dispatch a Filtros
         if settings.external_dispatch_enabled and settings.external_dispatch_url:
+            _dispatch_to_external_service.enqueued()
             background_tasks.add_task(
                 _dispatch_to_external_service, 
                 task_id, 
                 task_data, 
-                link_intake_value
+                link_intake_value,
+                tracing.current_context()
             )
         
         # Encolamos Sheets Sync
         if settings.google_sheets_enabled:
+            _sync_to_google_sheets.enqueued()
             background_tasks.add_task(
                 _sync_to_google_sheets, 
-                task_data
+                task_data,
+                tracing.current_context()
             )
 
     # 5. Guardar en DB Local (Rápido)
-    lead_data = LeadService.transform_clickup_task(task_data)
+    with stage("leads", "transform"):
+        lead_data = LeadService.transform_clickup_task(task_data, custom_field_values=field_values["leads"])
     repo = LeadRepository(db)
-    lead = repo.upsert(lead_data)
+    with stage("leads", "upsert"):
+        lead = repo.upsert(lead_data)
 
     # RESPONDER A CLICKUP INMEDIATAMENTE
+    record_outcome("leads", "queued" if link_intake_value else "synced")
     return {"status": "queued", "task_id": task_id}
 
 
-async def _dispatch_to_external_service(task_id: str, task_data: dict, link_intake_value: str) -> bool:
+@track_background("dispatch_enqueuer")
+async def _dispatch_to_external_service(
+    task_id: str,
+    task_data: ClickUpTask,
+    link_intake_value: str,
+    trace_parent: Optional[tracing.SpanContext] = None,
+) -> bool:
     """
     Envía la solicitud al ENQUEUER (Cloud Tasks Wrapper).
+    El trace del webhook viaja en metadata.traceparent para que el callback
+    de Filtros continúe la misma traza.
     """
+    with tracing.start_span(
+        "background.dispatch_enqueuer", parent=trace_parent, attributes={"clickup.task_id": task_id}
+    ) as span:
+        ok = await _send_to_enqueuer(
+            task_id, task_data, link_intake_value, span.context if span.recording else None
+        )
+        if not ok:
+            span.status = "error"
+        return ok
+
+
+async def _send_to_enqueuer(
+    task_id: str, task_data: ClickUpTask, link_intake_value: str, trace_context: Optional[tracing.SpanContext]
+) -> bool:
     logger.info(f"🚀 [Background] Preparando envío al Enqueuer para Task {task_id}")
     
     try:
@@ -129,12 +171,15 @@ async def _dispatch_to_external_service(task_id: str, task_data: dict, link_inta
         
         worker_payload = {
             "task_id": task_id,
-            "client_name": task_data.get("name"),
+            "client_name": task_data.name,
             "intake_url": link_intake_value,
             "nexus_callback_url": callback_url,
             "metadata": {
-                "clickup_status": task_data.get("status", {}).get("status"),
-                "clickup_url": task_data.get("url")
+                "clickup_status": task_data.status,
+                "clickup_url": task_data.url,
+                "trace_id": trace_context.trace_id if trace_context else None,
+                "traceparent": trace_context.traceparent if trace_context else None,
+                "dispatched_at_ms": int(time.time() * 1000)
             }
         }
 
@@ -148,24 +193,27 @@ async def _dispatch_to_external_service(task_id: str, task_data: dict, link_inta
         }
 
         headers = {
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
             # NOTA: No enviamos X-API-Key en el header hacia el Enqueuer, 
             # lo enviamos en el body ('worker_api_key') según tu diseño.
         }
+        if trace_context:
+            headers["traceparent"] = trace_context.traceparent
 
         logger.info(f"📦 [Enqueuer Dispatch] Enviando a {settings.external_dispatch_url}")
 
         async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                settings.external_dispatch_url,
-                json=enqueuer_payload,
-                headers=headers
-            )
+            with dependency("enqueuer", "dispatch"):
+                response = await client.post(
+                    settings.external_dispatch_url,
+                    json=enqueuer_payload,
+                    headers=headers
+                )
             
-            if response.status_code >= 400:
-                logger.error(f"❌ Error Enqueuer Body: {response.text}")
+                if response.status_code >= 400:
+                    logger.error(f"❌ Error Enqueuer Body: {response.text}")
                 
-            response.raise_for_status()
+                response.raise_for_status()
             
             resp_data = response.json()
             # Tu enqueuer devuelve: {"ok": True, "task": "...", ...}
@@ -178,30 +226,44 @@ async def _dispatch_to_external_service(task_id: str, task_data: dict, link_inta
         return False
 
 
-async def _sync_to_google_sheets(task_data: dict) -> bool:
+@track_background("sheets_sync")
+async def _sync_to_google_sheets(
+    task_data: ClickUpTask, trace_parent: Optional[tracing.SpanContext] = None
+) -> bool:
     """
     Sincronización a Sheets (Ahora en background)
     """
+    with tracing.start_span(
+        "background.sheets_sync", parent=trace_parent, attributes={"clickup.task_id": str(task_data.id)}
+    ) as span:
+        ok = _write_sheets_row(task_data)
+        if not ok:
+            span.status = "error"
+        return ok
+
+
+def _write_sheets_row(task_data: ClickUpTask) -> bool:
     try:
         sheets_service = GoogleSheetsService()
         
         data = {
-            "task_id": task_data.get("id"),
-            "task_name": task_data.get("name"),
-            "status": task_data.get("status", {}).get("status"),
-            "url": task_data.get("url"),
-            "date_created": task_data.get("date_created"),
-            "date_updated": task_data.get("date_updated"),
+            "task_id": task_data.id,
+            "task_name": task_data.name,
+            "status": task_data.status,
+            "url": task_data.url,
+            "date_created": task_data.date_created,
+            "date_updated": task_data.date_updated,
         }
 
-        for field in task_data.get("custom_fields", []):
-            field_name = field.get("name", "").lower().replace(" ", "_")
+        for field in task_data.custom_fields:
+            field_name = (field.get("name") or "").lower().replace(" ", "_")
             field_value = field.get("value")
             if field_value:
                 data[field_name] = field_value
                 
-        logger.info(f"📝 [Background] Escribiendo en Sheets para {task_data.get('id')}")
-        success = sheets_service.write_row(data)
+        logger.info(f"📝 [Background] Escribiendo en Sheets para {task_data.id}")
+        with dependency("sheets", "write_row"):
+            success = sheets_service.write_row(data)
         return success
 
     except Exception as e:
@@ -27,6 +27,28 @@ class Settings(BaseSettings):
     clickup_trigger_condicional: Optional[str] = None
     clickup_field_id_ai_link: str
     clickup_webhook_secret_assignments: str
+    clickup_api_base_url: str = "https://api.clickup.com/api/v2"
+    # Limitador compartido por todas las llamadas a ClickUp (por proceso; 0 = sin límite de tasa)
+    clickup_rate_limit_per_minute: int = 100
+    clickup_max_concurrency: int = 10
+    # Caché de tareas (GET /task) compartida por webhooks, callbacks y sincronizaciones
+    task_cache_enabled: bool = True
+    task_cache_ttl_seconds: int = 30
+    task_cache_max_entries: int = 1000
+    task_cache_backend: str = "memory"  # "memory" | "sqlite"
+    task_cache_shared_path: str = "/tmp/nexus_task_cache.sqlite3"
+    # Catálogo de custom fields por lista (decodifica drop_down / labels a su etiqueta)
+    field_catalog_enabled: bool = True
+    field_catalog_refresh_seconds: int = 3600
+    # Árbol espacio -> carpeta -> lista (space_name / folder_name / list_name por id)
+    clickup_hierarchy_enabled: bool = True
+    clickup_hierarchy_refresh_seconds: int = 3600
+    # Sincronización de comentarios (webhooks taskComment*) y backfill
+    comment_sync_enabled: bool = True
+    comment_sync_batch_size: int = 50
+    custom_field_schema_path: Optional[str] = None  # por defecto app/core/custom_fields.json
+    raw_data_profile_path: Optional[str] = None  # por defecto app/core/raw_data_profile.json
+    assignments_store_raw_data: bool = True  # guardar raw_data (podado) en case_assignments
 
     # Database
     database_url: Optional[str] = None
@@ -37,6 +59,20 @@ class Settings(BaseSettings):
     database_password: str = ""
     database_ssl_mode: str = "require"
 
+    # Pool de conexiones (por worker de gunicorn)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_use_lifo: bool = True
+    # Ping (SELECT 1) en cada checkout: descarta conexiones muertas antes de
+    # usarlas. handle_error solo limpia el pool después de que una consulta falló
+    db_pool_pre_ping: bool = True
+
+    # Caché de SQL compilado (SQLAlchemy) y sentencias preparadas en el servidor
+    db_query_cache_size: int = 1200
+    db_server_side_prepare: bool = True
+
     # Google Sheets
     google_sheets_enabled: bool = False
     google_sheets_spreadsheet_id: Optional[str] = None
@@ -51,6 +87,60 @@ class Settings(BaseSettings):
     filtros_api_key: Optional[str] = None
     external_dispatch_callback_base_url: Optional[str] = None
 
+    # Callbacks de Filtros: cola de escrituras a ClickUp (Link AI)
+    write_back_workers: int = 4
+    write_back_max_attempts: int = 5
+    write_back_retry_base_seconds: float = 2.0
+    write_back_max_pending: int = 10000
+    callbacks_batch_max_items: int = 500
+    # Resultados de Filtros en filtros_callbacks (escritura por lotes).
+    # Apagado por defecto: requiere la tabla (python scripts/init_db.py)
+    callback_results_enabled: bool = False
+    callback_results_batch_size: int = 200
+    callback_results_flush_seconds: float = 2.0
+
+    # Feed de cambios de leads (lead_changes + NOTIFY, SSE en /leads/changes).
+    # Apagado por defecto: cada upsert escribe en lead_changes en la misma
+    # transacción, así que antes de activarlo hay que crear la tabla
+    # (python scripts/init_db.py) o fallan todas las escrituras de webhooks
+    change_feed_enabled: bool = False
+    change_feed_channel: str = "lead_changes"
+    change_feed_queue_size: int = 1000  # eventos en espera por suscriptor
+    change_feed_page_size: int = 500  # filas por lectura al retomar desde un cursor
+    change_feed_heartbeat_seconds: float = 15.0
+    change_feed_resume_grace_seconds: float = 5.0
+    change_feed_retention_days: int = 7
+
+    # Dashboards (lead_daily_counts / assignment_counts, mantenidos por triggers)
+    # Zona horaria del "día" de los leads; al cambiarla hay que reinstalar los
+    # triggers y reconstruir (scripts/check_dashboard_counts.py --install --fix)
+    dashboard_timezone: str = "UTC"
+    dashboard_max_days: int = 366  # días por respuesta con ?daily=true
+
+    # Workers de gunicorn en la instancia (el Dockerfile lo pasa a --workers)
+    web_concurrency: int = 1
+
+    # Response cache (lecturas de /leads)
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 60
+    response_cache_max_entries: int = 2048
+    # "auto": "sqlite" si hay más de un worker (WEB_CONCURRENCY), si no "memory".
+    # Con "memory" y varios workers cada uno guarda su copia y una invalidación
+    # solo llega al worker que procesó la escritura: los demás sirven la
+    # respuesta vieja hasta que vence el TTL.
+    response_cache_backend: str = "auto"  # "auto" | "memory" | "sqlite"
+    response_cache_shared_path: str = "/tmp/nexus_response_cache.sqlite3"
+
+    # Batch de lectura (/leads/batch)
+    leads_batch_max_ids: int = 500
+    # Revalidar con pydantic las filas de la DB antes de serializar (más lento;
+    # por defecto se confía en los tipos de Postgres y se codifica con orjson)
+    leads_response_validation: bool = False
+
+    # Tracing (spans OTLP/JSON a un archivo local, una línea por span)
+    tracing_enabled: bool = False
+    tracing_export_path: str = "traces/spans.jsonl"
+
     # Application
     app_env: str = "production"
     debug: bool = False
@@ -0,0 +1,324 @@
+"""
+Caché de respuestas para los endpoints de lectura de leads.
+
+- TTL + LRU en proceso (MemoryStore) con un solo worker.
+- Backend compartido enchufable: cualquier objeto que implemente SharedStore
+  (get/set/delete/incr). SQLiteStore es el sustituto local para varios
+  workers de gunicorn en la misma instancia, y el backend por defecto
+  ("auto") cuando WEB_CONCURRENCY > 1: con MemoryStore una invalidación
+  solo llegaría al worker que procesó la escritura.
+- Invalidación por etiquetas versionadas: cada entrada guarda la versión de
+  sus etiquetas al escribirse; invalidar = incrementar la versión.
+- ETag por entrada para responder 304 a If-None-Match.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from app.config import settings
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+# Etiqueta que comparten las respuestas de colección (search, list):
+# cualquier escritura puede cambiar sus resultados.
+COLLECTION_TAG = "leads:collection"
+
+
+def task_tag(task_id: str) -> str:
+    return f"lead:{task_id}"
+
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Consultas a la caché por resultado (hit, miss; not_modified cuenta los 304 aparte)",
+    ("namespace", "result"),
+)
+CACHE_INVALIDATIONS = Counter(
+    "response_cache_invalidations_total",
+    "Invalidaciones de etiquetas en la caché de respuestas",
+)
+CACHE_HIT_RATIO = Gauge(
+    "response_cache_hit_ratio",
+    "Proporción de aciertos (hit) sobre el total de consultas (hit + miss)",
+    ("namespace",),
+)
+
+
+# ============================================================================
+# STORES
+# ============================================================================
+
+class SharedStore(Protocol):
+    """Interfaz mínima de almacén clave-valor (subconjunto tipo Redis)."""
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def incr(self, key: str) -> int: ...
+
+
+class MemoryStore:
+    """Almacén en proceso con TTL y desalojo LRU. Thread-safe."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        # Versiones de etiquetas: separadas para que el LRU no las desaloje
+        self._counters: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._counters.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            # Arrancamos desde un valor basado en el reloj para que una versión
+            # desalojada nunca vuelva a coincidir con una anterior.
+            value = self._counters.pop(key, time.time_ns()) + 1
+            self._counters[key] = value
+            while len(self._counters) > self.max_entries * 4:
+                self._counters.popitem(last=False)
+            return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    Sustituto local de un almacén compartido (Redis/Memorystore).
+    Un archivo SQLite accesible por todos los workers de la instancia.
+    """
+
+    # Cada cuántas escrituras se purgan las entradas expiradas
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return None
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value), expires_at),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._conn().execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            value = (pickle.loads(row[0]) if row else time.time_ns()) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, NULL)",
+                (key, pickle.dumps(value)),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+@dataclass
+class CachedResponse:
+    """Cuerpo JSON serializado + ETag + versiones de etiquetas al escribir."""
+
+    body: bytes
+    etag: str
+    tags: Dict[str, Optional[int]] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """Caché de respuestas con invalidación por etiquetas."""
+
+    def __init__(self, store: SharedStore, ttl: float = 60.0, enabled: bool = True):
+        self.store = store
+        self.ttl = ttl
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """Clave estable: namespace + parámetros ordenados (sin None)."""
+        normalized = {k: v for k, v in sorted(params.items()) if v is not None}
+        digest = hashlib.blake2b(
+            json.dumps(normalized, sort_keys=True, default=str).encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+        return f"resp:{namespace}:{digest}"
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def _tag_versions(self, tags: Sequence[str]) -> Dict[str, Optional[int]]:
+        return {tag: self.store.get(f"tag:{tag}") for tag in tags}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        if self._tag_versions(list(entry.tags)) != entry.tags:
+            self.store.delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, body: bytes, tags: Sequence[str]) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=self.make_etag(body), tags=self._tag_versions(tags))
+        self.store.set(key, entry, ttl=self.ttl)
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.store.incr(f"tag:{tag}")
+            CACHE_INVALIDATIONS.inc()
+
+    def invalidate_task(self, task_id: str) -> None:
+        """Invalida el detalle del lead y todas las respuestas de colección."""
+        if not self.enabled:
+            return
+        try:
+            self.invalidate(task_tag(task_id), COLLECTION_TAG)
+        except Exception as e:
+            # La caché nunca debe romper una escritura en DB
+            logger.warning(f"⚠️ Error invalidando caché para {task_id}: {e}")
+
+    def fetch(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        build: Callable[[], Tuple[bytes, List[str]]],
+    ) -> CachedResponse:
+        """
+        Devuelve la respuesta cacheada o la construye con build().
+        build() devuelve (cuerpo JSON, etiquetas); sus excepciones
+        (p. ej. 404) se propagan sin cachear.
+        """
+        if not self.enabled:
+            body, _ = build()
+            return CachedResponse(body=body, etag=self.make_etag(body))
+
+        key = self.make_key(namespace, params)
+        entry = self.get(key)
+        if entry is not None:
+            CACHE_REQUESTS.inc(namespace=namespace, result="hit")
+            return entry
+
+        CACHE_REQUESTS.inc(namespace=namespace, result="miss")
+        # COLLECTION_TAG cambia con cualquier escritura: si cambió mientras
+        # construíamos la respuesta, puede estar desactualizada y no se guarda.
+        before = self.store.get(f"tag:{COLLECTION_TAG}")
+        body, tags = build()
+        if self.store.get(f"tag:{COLLECTION_TAG}") != before:
+            return CachedResponse(body=body, etag=self.make_etag(body))
+        return self.set(key, body, tags)
+
+    @staticmethod
+    def hit_ratio(namespace: str) -> float:
+        hits = CACHE_REQUESTS.value(namespace=namespace, result="hit")
+        total = hits + CACHE_REQUESTS.value(namespace=namespace, result="miss")
+        return hits / total if total else 0.0
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evalúa If-None-Match (lista separada por comas, admite W/ y *)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _build_store() -> SharedStore:
+    backend = settings.response_cache_backend
+    if backend == "auto":
+        backend = "sqlite" if settings.web_concurrency > 1 else "memory"
+    if backend == "sqlite":
+        return SQLiteStore(settings.response_cache_shared_path)
+    return MemoryStore(max_entries=settings.response_cache_max_entries)
+
+
+# Singleton
+response_cache = ResponseCache(
+    _build_store(),
+    ttl=settings.response_cache_ttl_seconds,
+    enabled=settings.response_cache_enabled,
+)
+
+for _namespace in ("lead", "lead_mycase", "lead_search", "lead_list"):
+    CACHE_HIT_RATIO.set_function(lambda ns=_namespace: ResponseCache.hit_ratio(ns), namespace=_namespace)
@@ -0,0 +1,108 @@
+"""
+Representación compacta de una tarea de ClickUp.
+
+GET /task/{id} devuelve 20-30 KB de JSON (avatares, watchers, type_config de
+cada custom field...). ClickUpTask se queda solo con lo que usan las
+transformaciones (LeadService, AssignmentService), el trigger del webhook, el
+dispatch a Filtros y Sheets, en un objeto con __slots__; el árbol de dicts del
+JSON se descarta justo después de decodificarlo, así que lo que viaja a las
+BackgroundTasks pesa una fracción.
+
+Los custom fields se reducen a {id, name, type, value} (la forma que espera
+app.core.field_schema). El documento completo solo se conserva, ya podado
+(app.core.raw_data), cuando se pide con keep_raw (raw_data de case_assignments).
+"""
+
+from sys import intern
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
+
+from app.core.raw_data import prune_raw
+
+
+def _nested(data: Dict, key: str, inner: str) -> Optional[Any]:
+    value = data.get(key)
+    return value.get(inner) if value else None
+
+
+def _slim_field(field: Dict, _intern=intern, _str=str) -> Dict[str, Any]:
+    # id, nombre y tipo se repiten en todas las tareas de la lista: se internan
+    # para que cientos de tareas en vuelo compartan esas cadenas
+    field_id, name, field_type = field.get("id"), field.get("name"), field.get("type")
+    return {
+        "id": _intern(field_id) if field_id.__class__ is _str else field_id,
+        "name": _intern(name) if name.__class__ is _str else name,
+        "type": _intern(field_type) if field_type.__class__ is _str else field_type,
+        "value": field.get("value"),
+    }
+
+
+class ClickUpTask:
+    """Tarea de ClickUp decodificada de forma selectiva."""
+
+    __slots__ = (
+        "id", "name", "status", "priority", "url",
+        "creator", "assignees",
+        "date_created", "date_updated", "date_closed", "date_done", "due_date",
+        "content",
+        "list_id", "list_name", "folder_id", "folder_name", "space_id", "space_name",
+        "custom_fields",
+        "comment_count",
+        "raw_data",
+    )
+
+    def __init__(self, data: Dict, keep_raw: bool = False):
+        self.id: Optional[str] = data.get("id")
+        self.name: Optional[str] = data.get("name")
+        self.status: Optional[str] = _nested(data, "status", "status")
+        self.priority: Optional[str] = _nested(data, "priority", "priority")
+        self.url: Optional[str] = data.get("url")
+
+        self.creator: Optional[str] = _nested(data, "creator", "username")
+        self.assignees: Tuple[str, ...] = tuple(a.get("username", "") for a in data.get("assignees") or ())
+
+        # Fechas tal cual (ms en string); se parsean en las transformaciones
+        self.date_created = data.get("date_created")
+        self.date_updated = data.get("date_updated")
+        self.date_closed = data.get("date_closed")
+        self.date_done = data.get("date_done")
+        self.due_date = data.get("due_date")
+
+        # description y text_content suelen ser el mismo texto: se guarda uno
+        self.content: Optional[str] = data.get("description") or data.get("text_content") or None
+
+        # ClickUp a menudo manda solo el id de carpeta / espacio: los nombres
+        # se resuelven con app.services.clickup_hierarchy
+        self.list_id: Optional[str] = _nested(data, "list", "id")
+        self.list_name: Optional[str] = _nested(data, "list", "name")
+        self.folder_id: Optional[str] = _nested(data, "folder", "id")
+        self.folder_name: Optional[str] = _nested(data, "folder", "name")
+        self.space_id: Optional[str] = _nested(data, "space", "id")
+        self.space_name: Optional[str] = _nested(data, "space", "name")
+
+        self.custom_fields: List[Dict[str, Any]] = [_slim_field(f) for f in data.get("custom_fields") or ()]
+
+        # GET /task no trae comentarios; si vienen (p. ej. exportaciones), se cuentan
+        comments = data.get("comments")
+        self.comment_count: Optional[int] = len(comments) if comments is not None else None
+
+        self.raw_data: Optional[Dict] = prune_raw(data) if keep_raw else None
+
+    @classmethod
+    def from_json(cls, body: Union[bytes, str], keep_raw: bool = False) -> "ClickUpTask":
+        """Decodifica el cuerpo de GET /task/{id} (orjson) y se queda con lo necesario."""
+        return cls(orjson.loads(body), keep_raw=keep_raw)
+
+    @classmethod
+    def coerce(cls, task: Union["ClickUpTask", Dict], keep_raw: bool = False) -> "ClickUpTask":
+        """Acepta tanto un ClickUpTask como el dict de ClickUp (scripts, importaciones)."""
+        return task if isinstance(task, cls) else cls(task, keep_raw=keep_raw)
+
+    @property
+    def assignee(self) -> Optional[str]:
+        """Asignados en una sola cadena, como se guarda en la DB."""
+        return ", ".join(self.assignees) if self.assignees else None
+
+    def __repr__(self):
+        return f"<ClickUpTask(id={self.id}, status={self.status}, custom_fields={len(self.custom_fields)})>"
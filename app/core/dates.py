@@ -0,0 +1,130 @@
+"""
+Parser de fechas por niveles para ClickUp y los CSV exportados.
+
+1. Epoch en milisegundos (int/float o string de dígitos): sin regex ni dateutil.
+2. ISO 8601 con datetime.fromisoformat (C puro).
+3. Formatos de exportación de ClickUp con regex precompiladas:
+   - "Tuesday, January 9th 2024, 3:36:42 pm -06:00" / "May 21st 2024"
+   - "05/21/2024" / "05/21/2024 3:36 pm" (mes primero, como dateutil)
+4. dateutil como último recurso (sin sufijos ordinales).
+
+Los strings pasan por un caché LRU acotado: en importaciones las mismas
+fechas se repiten miles de veces. Todo se devuelve como datetime aware en
+UTC (columnas DateTime(timezone=True)); las fechas sin zona se asumen UTC.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from dateutil import parser as date_parser
+
+from app.core.text_utils import remove_ordinal_suffix
+
+
+DATE_CACHE_SIZE = 8192
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+_TIME = r"(?:,?\s+(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([ap]\.?m\.?)?)?"
+_OFFSET = r"(?:\s*(?:UTC|GMT)?\s*([+-])(\d{2}):?(\d{2}))?"
+
+# [Weekday, ]Month DD[st|nd|rd|th][,] YYYY[, hh:mm[:ss] [am|pm]][ ±hh:mm]
+_TEXT_DATE = re.compile(
+    r"^(?:[a-z]+,?\s+)?([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})" + _TIME + _OFFSET + r"$",
+    re.IGNORECASE,
+)
+# MM/DD/YYYY[ hh:mm[:ss] [am|pm]][ ±hh:mm]
+_NUMERIC_DATE = re.compile(
+    r"^(\d{1,2})/(\d{1,2})/(\d{4})" + _TIME + _OFFSET + r"$",
+    re.IGNORECASE,
+)
+
+
+def parse_date(value) -> Optional[datetime]:
+    """
+    Parsea una fecha de ClickUp / CSV.
+
+    Args:
+        value: epoch ms (int, float o string de dígitos), ISO 8601, formato
+            de exportación de ClickUp o cualquier cosa que entienda dateutil
+
+    Returns:
+        datetime aware en UTC, o None si está vacío o no se pudo parsear
+    """
+    if not value:
+        return None
+
+    if isinstance(value, (int, float)):
+        return _from_epoch_ms(value)
+
+    if isinstance(value, str):
+        if value.isascii() and value.isdigit():
+            return _from_epoch_ms(int(value))
+        return _parse_text(value.strip())
+
+    return None
+
+
+def _from_epoch_ms(value) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError) as e:
+        print(f"Error parseando fecha {value}: {e}")
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_text(text: str) -> Optional[datetime]:
+    if not text:
+        return None
+
+    try:
+        return _to_utc(datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith("Z") else text))
+    except ValueError:
+        pass
+
+    try:
+        match = _TEXT_DATE.match(text)
+        if match and match.group(1)[:3].lower() in _MONTHS:
+            month = _MONTHS[match.group(1)[:3].lower()]
+            return _build(int(match.group(3)), month, int(match.group(2)), match.groups()[3:])
+
+        match = _NUMERIC_DATE.match(text)
+        if match:
+            return _build(int(match.group(3)), int(match.group(1)), int(match.group(2)), match.groups()[3:])
+
+        # Último recurso: heurística de dateutil
+        return _to_utc(date_parser.parse(remove_ordinal_suffix(text)))
+
+    except (ValueError, OverflowError) as e:
+        print(f"Error parseando fecha {text}: {e}")
+        return None
+
+
+def _build(year: int, month: int, day: int, time_parts) -> datetime:
+    hour, minute, second, meridiem, sign, off_h, off_m = time_parts
+    hour = int(hour) if hour else 0
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"hora inválida con {meridiem}: {hour}")
+        is_pm = meridiem[0].lower() == "p"
+        hour = hour % 12 + (12 if is_pm else 0)
+
+    tz = timezone.utc
+    if sign:
+        offset = timedelta(hours=int(off_h), minutes=int(off_m))
+        tz = timezone(-offset if sign == "-" else offset)
+
+    result = datetime(year, month, day, hour, int(minute or 0), int(second or 0), tzinfo=tz)
+    return result if tz is timezone.utc else result.astimezone(timezone.utc)
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
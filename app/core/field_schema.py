@@ -0,0 +1,197 @@
+"""
+Esquema compilado de custom fields de ClickUp.
+
+La configuración (app/core/custom_fields.json, o CUSTOM_FIELD_SCHEMA_PATH)
+define perfiles: para cada uno, qué custom field va a qué columna (por ID,
+con nombre como respaldo) y qué conversor aplicar según el tipo de ClickUp.
+
+Cada perfil se compila una sola vez en dos dicts (id -> spec, nombre -> spec)
+con el conversor ya resuelto, y extract() hace una única pasada por
+custom_fields. Lo usan LeadService, AssignmentService y el trigger del webhook
+(el webhook de leads resuelve trigger + leads en la misma pasada).
+"""
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.dates import parse_date
+
+
+DEFAULT_SCHEMA_PATH = Path(__file__).with_name("custom_fields.json")
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+CONVERTERS: Dict[str, Converter] = {
+    "raw": None,  # sin conversión (se copia el valor tal cual)
+    "date": parse_date,
+    "checkbox": lambda value: value is True,
+    "checkbox_lenient": lambda value: value is True or value == "true",
+}
+
+
+class _FixedConverter:
+    """Tabla tipo -> conversor que ignora el tipo (conversor fijado en el esquema)."""
+
+    __slots__ = ("converter",)
+
+    def __init__(self, converter: Converter):
+        self.converter = converter
+
+    def get(self, _field_type):
+        return self.converter
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    column: str
+    field_id: Optional[str] = None
+    name: Optional[str] = None
+    converter: Optional[str] = None  # fijo; si no, según el tipo del campo
+
+
+class CompiledFieldSchema:
+    """
+    Tablas de despacho de uno o más perfiles: se construyen una vez y se
+    consultan por campo. Con varios perfiles (p. ej. "trigger" + "leads")
+    una sola pasada por custom_fields llena el resultado de todos.
+    """
+
+    def __init__(self, profiles: Dict[str, "_Profile"]):
+        self.profiles = tuple(profiles)
+        # clave -> ((índice de perfil, columna, tabla tipo -> conversor), ...)
+        by_id: Dict[str, List[Tuple]] = {}
+        by_name: Dict[str, List[Tuple]] = {}
+        for index, profile in enumerate(profiles.values()):
+            for spec in profile.specs:
+                converters = (
+                    _FixedConverter(CONVERTERS[spec.converter]) if spec.converter else profile.type_converters
+                )
+                entry = (index, spec.column, converters)
+                if spec.field_id:
+                    by_id.setdefault(spec.field_id, []).append(entry)
+                if spec.name:
+                    by_name.setdefault(spec.name, []).append(entry)
+        self._by_id = {key: tuple(entries) for key, entries in by_id.items()}
+        self._by_name = {key: tuple(entries) for key, entries in by_name.items()}
+
+    @property
+    def id_map(self) -> Dict[str, str]:
+        return {field_id: entries[0][1] for field_id, entries in self._by_id.items()}
+
+    def extract(self, custom_fields: Optional[List[Dict]]) -> Dict[str, Any]:
+        """
+        Una pasada: {columna: valor convertido} del primer perfil.
+        Match por ID y por nombre; el primer campo que coincide gana.
+        """
+        return self._extract(custom_fields)[0]
+
+    def extract_profiles(self, custom_fields: Optional[List[Dict]]) -> Dict[str, Dict[str, Any]]:
+        """Una pasada para todos los perfiles: {perfil: {columna: valor}}."""
+        return dict(zip(self.profiles, self._extract(custom_fields)))
+
+    def _extract(self, custom_fields: Optional[List[Dict]]) -> List[Dict[str, Any]]:
+        if len(self.profiles) == 1 and not (self._by_id and self._by_name):
+            return [self._extract_single(custom_fields)]
+
+        results: List[Dict[str, Any]] = [{} for _ in self.profiles]
+        if not custom_fields:
+            return results
+
+        id_get = self._by_id.get
+        name_get = self._by_name.get
+        for field in custom_fields:
+            entries = id_get(field.get("id"))
+            named = name_get(field.get("name"))
+            if named:
+                entries = entries + named if entries else named
+            elif not entries:
+                continue
+
+            value = field.get("value")
+            for index, column, converters in entries:
+                out = results[index]
+                if column not in out:
+                    converter = converters.get(field.get("type"))
+                    out[column] = converter(value) if converter else value
+        return results
+
+    def _extract_single(self, custom_fields: Optional[List[Dict]]) -> Dict[str, Any]:
+        """Un perfil con una sola clave (solo IDs o solo nombres): el caso caliente."""
+        out: Dict[str, Any] = {}
+        if not custom_fields:
+            return out
+
+        key, table = ("id", self._by_id) if self._by_id else ("name", self._by_name)
+        lookup = table.get
+        for field in custom_fields:
+            entries = lookup(field.get(key))
+            if entries is None:
+                continue
+            for _, column, converters in entries:
+                if column not in out:
+                    converter = converters.get(field.get("type"))
+                    value = field.get("value")
+                    out[column] = converter(value) if converter else value
+        return out
+
+
+@dataclass(frozen=True)
+class _Profile:
+    specs: Tuple[FieldSpec, ...]
+    type_converters: Dict[str, Converter]
+
+
+def _compile(profile: str, config: Dict) -> _Profile:
+    specs = []
+    for entry in config.get("fields", []):
+        field_id = entry.get("id")
+        name = entry.get("name")
+        # IDs / nombres que dependen del entorno se leen de Settings
+        if entry.get("id_setting"):
+            field_id = getattr(settings, entry["id_setting"])
+        if entry.get("name_setting"):
+            name = getattr(settings, entry["name_setting"])
+        if not field_id and not name:
+            continue
+        converter = entry.get("converter")
+        if converter and converter not in CONVERTERS:
+            raise ValueError(f"Conversor desconocido '{converter}' en el perfil '{profile}'")
+        specs.append(FieldSpec(column=entry["column"], field_id=field_id, name=name, converter=converter))
+
+    type_converters = config.get("type_converters", {})
+    unknown = set(type_converters.values()) - set(CONVERTERS)
+    if unknown:
+        raise ValueError(f"Conversores desconocidos {sorted(unknown)} en el perfil '{profile}'")
+    return _Profile(
+        specs=tuple(specs),
+        type_converters={t: CONVERTERS[c] for t, c in type_converters.items()},
+    )
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Dict[str, _Profile]:
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return {profile: _compile(profile, profile_config) for profile, profile_config in config.items()}
+
+
+@lru_cache(maxsize=None)
+def _get_schema(path: str, profiles: Tuple[str, ...]) -> CompiledFieldSchema:
+    available = _load(path)
+    missing = [p for p in profiles if p not in available]
+    if missing:
+        raise KeyError(f"Perfil de custom fields no definido: {', '.join(missing)}")
+    return CompiledFieldSchema({p: available[p] for p in profiles})
+
+
+def get_schema(*profiles: str) -> CompiledFieldSchema:
+    """
+    Esquema compilado de uno o más perfiles ("leads", "assignments", "trigger").
+    get_schema("trigger", "leads").extract_profiles(...) resuelve ambos en una pasada.
+    """
+    return _get_schema(settings.custom_field_schema_path or str(DEFAULT_SCHEMA_PATH), profiles)
@@ -0,0 +1,233 @@
+"""
+Instrumentación del pipeline de webhooks.
+
+- Histograma por etapa (firma, fetch ClickUp, transform, parse, upsert...).
+- Histograma por router HTTP (middleware ASGI, sin BaseHTTPMiddleware).
+- Histograma por dependencia externa: clickup, enqueuer, sheets, postgres.
+- Contador de resultados/ignorados de los handlers.
+- Gauge de tareas en background pendientes.
+
+Todo se publica en /metrics. Cada observación cuesta un lock y un bisect.
+Etapas, dependencias, SQL y peticiones HTTP abren además un span (app.core.tracing).
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core import tracing
+
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Duración de cada etapa del pipeline de webhooks",
+    ("router", "stage"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Duración de las peticiones HTTP por router, ruta y status",
+    ("router", "route", "method", "status"),
+)
+DEPENDENCY_SECONDS = Histogram(
+    "dependency_call_seconds",
+    "Duración de las llamadas a dependencias externas",
+    ("dependency", "operation", "outcome"),
+)
+WEBHOOK_OUTCOMES = Counter(
+    "webhook_outcomes_total",
+    "Resultados de los handlers de webhook (queued, ignored, already_processed...)",
+    ("router", "outcome"),
+)
+BACKGROUND_TASKS_INFLIGHT = Gauge(
+    "background_tasks_inflight",
+    "Tareas en background encoladas o en ejecución",
+    ("task",),
+)
+
+
+@contextmanager
+def stage(router: str, name: str):
+    """Mide una etapa del pipeline: with stage("leads", "upsert"): ..."""
+    start = time.perf_counter()
+    try:
+        with tracing.start_span(f"{router}.{name}", attributes={"pipeline.router": router}):
+            yield
+    finally:
+        PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - start, router=router, stage=name)
+
+
+@contextmanager
+def dependency(name: str, operation: str):
+    """Mide una llamada externa; outcome=error si el bloque lanza excepción."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        with tracing.start_span(
+            f"{name}.{operation}", kind="client", attributes={"peer.service": name}
+        ):
+            yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        DEPENDENCY_SECONDS.observe(
+            time.perf_counter() - start, dependency=name, operation=operation, outcome=outcome
+        )
+
+
+def record_outcome(router: str, outcome: str) -> None:
+    WEBHOOK_OUTCOMES.inc(router=router, outcome=outcome)
+
+
+def track_background(task: str):
+    """
+    Decorador para funciones usadas en BackgroundTasks.
+    Llamar a `.enqueued()` al encolar; el gauge baja cuando la función termina.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                BACKGROUND_TASKS_INFLIGHT.dec(task=task)
+
+        wrapper.enqueued = lambda: BACKGROUND_TASKS_INFLIGHT.inc(task=task)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra la duración de cada sentencia SQL como dependencia 'postgres'."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+        # Sin tracing ni traza activa no hay span que apilar
+        if tracing.is_recording():
+            conn.info.setdefault("query_span", []).append(tracing.begin_span(
+                f"postgres.{_sql_verb(statement)}",
+                kind="client",
+                attributes={"db.system": "postgresql", "db.operation": _sql_verb(statement)},
+            ))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            DEPENDENCY_SECONDS.observe(
+                time.perf_counter() - starts.pop(),
+                dependency="postgres",
+                operation=_sql_verb(statement),
+                outcome="ok",
+            )
+        spans = conn.info.get("query_span")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts:
+            DEPENDENCY_SECONDS.observe(
+                time.perf_counter() - starts.pop(),
+                dependency="postgres",
+                operation=_sql_verb(context.statement or ""),
+                outcome="error",
+            )
+        spans = conn.info.get("query_span") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.record_error(context.original_exception)
+            span.end()
+
+
+def _sql_verb(statement: str) -> str:
+    head = statement.lstrip()[:10].split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: mide cada petición HTTP y la etiqueta con el router
+    (tag de la ruta) y la plantilla de la ruta, no con la URL concreta.
+
+    También abre el span raíz (kind=server), continuando el `traceparent`
+    entrante si lo hay. Duración y span terminan al enviar el último chunk
+    de la respuesta, así las BackgroundTasks no inflan la latencia.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+        finished = False
+
+        headers = dict(scope.get("headers") or ())
+        span = tracing.begin_span(
+            f"{scope.get('method', '')} {scope.get('path', '')}",
+            parent=tracing.SpanContext.from_traceparent(
+                headers.get(b"traceparent", b"").decode("latin-1")
+            ),
+            kind="server",
+            attributes={"http.method": scope.get("method", ""), "http.target": scope.get("path", "")},
+        )
+        token = tracing.activate(span)
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            tags = getattr(route, "tags", None)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                router=tags[0] if tags else "root",
+                route=path,
+                method=scope.get("method", ""),
+                status=str(status or 0),
+            )
+            if span.recording:
+                span.name = f"{scope.get('method', '')} {path}"
+                span.set_attribute("http.route", path)
+                span.set_attribute("http.status_code", status or 0)
+                if (status or 0) >= 500:
+                    span.status = "error"
+                span.end()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if span.recording:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"traceparent", span.context.traceparent.encode("latin-1"))
+                    ]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            status = 500
+            span.record_error(e)
+            raise
+        finally:
+            finish()
+            tracing.deactivate(token)
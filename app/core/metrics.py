@@ -0,0 +1,202 @@
+"""
+Registro de métricas en proceso con exposición en formato Prometheus.
+Sin dependencias externas: contadores, gauges e histogramas protegidos por lock.
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+LabelKey = Tuple[str, ...]
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+# Buckets por defecto (segundos): de 1 ms a 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """Base común: nombre, ayuda, etiquetas y valores por combinación de labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _pairs(self, key: LabelKey) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(self.name, self._pairs(key), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Valor instantáneo. Puede calcularse al vuelo con set_function()."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels) -> None:
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        fn = self._functions.get(key)
+        return float(fn()) if fn else self._values.get(key, 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, fn in functions.items():
+            values[key] = float(fn())
+        return [(self.name, self._pairs(key), value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos (le), suma y conteo."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            # Se guarda el conteo por bucket; se acumula al renderizar
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def timer(self, **labels):
+        """Observa la duración (segundos) del bloque with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def value(self, **labels) -> float:
+        """Suma de las observaciones."""
+        return self._sums.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            snapshot = {key: (list(counts), self._sums[key]) for key, counts in self._counts.items()}
+        result: List[Sample] = []
+        for key, (counts, total) in snapshot.items():
+            pairs = self._pairs(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                result.append((f"{self.name}_bucket", pairs + (("le", le),), cumulative))
+            result.append((f"{self.name}_sum", pairs, total))
+            result.append((f"{self.name}_count", pairs, cumulative))
+        return result
+
+
+class Registry:
+    """Colección de métricas registradas en este proceso."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Serializa todas las métricas en el formato de texto de Prometheus."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, pairs, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(pairs)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    rendered = []
+    for name, value in pairs:
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        rendered.append(f'{name}="{escaped}"')
+    return "{" + ",".join(rendered) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isfinite(value) and value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+# Singleton
+REGISTRY = Registry()
@@ -0,0 +1,104 @@
+"""
+Limitador de tasa compartido para la API de ClickUp.
+
+ClickUp limita las peticiones por token y por minuto (100/min en la mayoría de
+planes) y responde 429 al superarlo. Todas las llamadas del proceso (webhooks,
+sincronización de comentarios, backfills) pasan por el mismo limitador:
+
+- Token bucket: `rate_per_minute` fichas, ráfaga de hasta `burst`.
+- Semáforo: como mucho `max_concurrency` peticiones en vuelo.
+- Tras un 429, `pause_until()` detiene a todos hasta el reset que indica ClickUp.
+
+Es por proceso: con varias instancias, repartir el límite entre ellas.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from app.config import settings
+from app.core.metrics import Counter, Histogram
+
+
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "rate_limit_wait_seconds",
+    "Espera en el limitador antes de llamar a la dependencia",
+    ("dependency",),
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+RATE_LIMITED = Counter(
+    "rate_limited_responses_total",
+    "Respuestas 429 recibidas de la dependencia",
+    ("dependency",),
+)
+
+
+class AsyncRateLimiter:
+    """Token bucket + límite de concurrencia para asyncio. Se usa con `async with`."""
+
+    def __init__(self, name: str, rate_per_minute: float, max_concurrency: int, burst: Optional[int] = None):
+        self.name = name
+        self.rate = rate_per_minute / 60.0  # fichas por segundo; 0 desactiva la tasa
+        self.capacity = float(burst or max(rate_per_minute, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self) -> float:
+        """Segundos a esperar antes de poder tomar una ficha (0 si ya hay)."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+        await self._semaphore.acquire()
+        try:
+            # Sin await entre _refill y el descuento: atómico en el event loop
+            delay = self._delay()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._delay()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        RATE_LIMIT_WAIT_SECONDS.observe(time.perf_counter() - start, dependency=self.name)
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    def pause_until(self, resume_at: float) -> None:
+        """Pausa a todos hasta `resume_at` (time.monotonic()) tras un 429."""
+        RATE_LIMITED.inc(dependency=self.name)
+        self.paused_until = max(self.paused_until, resume_at)
+        self.tokens = 0.0
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+# Singleton compartido por ClickUpService
+clickup_limiter = AsyncRateLimiter(
+    "clickup",
+    rate_per_minute=settings.clickup_rate_limit_per_minute,
+    max_concurrency=settings.clickup_max_concurrency,
+)
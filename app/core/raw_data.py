@@ -0,0 +1,88 @@
+"""
+Poda de raw_data (copia del JSON de ClickUp) antes de guardarlo.
+
+El perfil (app/core/raw_data_profile.json, o RAW_DATA_PROFILE_PATH) indica:
+- drop: claves de primer nivel que se descartan (volátiles o derivables).
+- strip: claves que se quitan dentro de un objeto o de cada elemento de una lista.
+- drop_if_equal: clave que se descarta si repite el valor de otra.
+
+La poda es determinista: la misma tarea da siempre el mismo documento, así que
+el upsert puede saltarse la escritura cuando solo cambiaron claves podadas
+(AssignmentRepository.upsert compara el JSONB guardado con el nuevo).
+
+Nada de lo podado lo usa AssignmentService.transform_task: aplicado a raw_data
+da las mismas columnas que la tarea completa (salvo date_updated), así que el
+respaldo sigue sirviendo para reconstruir la fila.
+"""
+
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Tuple
+
+from app.config import settings
+
+
+DEFAULT_PROFILE_PATH = Path(__file__).with_name("raw_data_profile.json")
+
+
+@dataclass(frozen=True)
+class PruningProfile:
+    drop: FrozenSet[str]
+    strip: Dict[str, FrozenSet[str]]
+    drop_if_equal: Tuple[Tuple[str, str], ...]
+
+    def prune(self, data: Any) -> Any:
+        """Devuelve una copia podada; lo que no es un dict se devuelve tal cual."""
+        if not isinstance(data, dict):
+            return data
+
+        drop = self.drop
+        result = {key: value for key, value in data.items() if key not in drop}
+
+        for key, keys in self.strip.items():
+            value = result.get(key)
+            if isinstance(value, dict):
+                result[key] = {k: v for k, v in value.items() if k not in keys}
+            elif isinstance(value, list):
+                result[key] = [
+                    {k: v for k, v in item.items() if k not in keys} if isinstance(item, dict) else item
+                    for item in value
+                ]
+
+        for key, other in self.drop_if_equal:
+            if key in result and other in result and result[key] == result[other]:
+                del result[key]
+
+        return result
+
+
+def _compile(profile: str, config: Dict) -> PruningProfile:
+    unknown = set(config) - {"description", "drop", "strip", "drop_if_equal"}
+    if unknown:
+        raise ValueError(f"Claves desconocidas {sorted(unknown)} en el perfil de poda '{profile}'")
+    return PruningProfile(
+        drop=frozenset(config.get("drop", [])),
+        strip={key: frozenset(keys) for key, keys in config.get("strip", {}).items()},
+        drop_if_equal=tuple(config.get("drop_if_equal", {}).items()),
+    )
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Dict[str, PruningProfile]:
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return {profile: _compile(profile, profile_config) for profile, profile_config in config.items()}
+
+
+def get_profile(profile: str) -> PruningProfile:
+    profiles = _load(settings.raw_data_profile_path or str(DEFAULT_PROFILE_PATH))
+    if profile not in profiles:
+        raise KeyError(f"Perfil de poda no definido: {profile}")
+    return profiles[profile]
+
+
+def prune_raw(data: Any, profile: str = "case_assignments") -> Any:
+    """raw_data listo para guardar según el perfil indicado."""
+    return get_profile(profile).prune(data)
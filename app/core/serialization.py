@@ -0,0 +1,45 @@
+"""
+Serialización JSON rápida para las respuestas de lectura.
+
+Las filas llegan de la DB como tuplas de columnas (Row de SQLAlchemy, sin
+pasar por el identity map del ORM) y se codifican con orjson directamente:
+los tipos de Postgres (str, int, bool, datetime con zona) ya son los del
+schema, así que validarlos otra vez con pydantic no aporta nada.
+
+Con OPT_UTC_Z las fechas salen igual que con pydantic (…Z para UTC), de modo
+que el JSON es idéntico byte a byte al de model_dump_json().
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence
+
+import orjson
+from fastapi import Response
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def row_dict(row, fields: Sequence[str]) -> Dict[str, Any]:
+    """Tupla de columnas (en el orden de `fields`) -> dict."""
+    return dict(zip(fields, row))
+
+
+def rows_dicts(rows: Iterable, fields: Sequence[str]) -> List[Dict[str, Any]]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class ORJSONResponse(Response):
+    """
+    Respuesta JSON codificada con orjson. Acepta bytes ya codificados (p. ej.
+    de la caché de respuestas) y los envía tal cual.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,219 @@
+"""
+Caché read-through de tareas de ClickUp (GET /task/{id}).
+
+La misma tarea se pide una vez por evento de webhook, otra vez desde el
+webhook de la otra lista (CONSULTAS y Case Assignment) y en las
+sincronizaciones. ClickUpService.get_task pasa por aquí:
+
+- TTL corto + LRU acotado (MemoryStore) o un almacén compartido entre
+  workers (SharedStore de app.core.cache; SQLiteStore en la misma instancia).
+- Single-flight por proceso: peticiones concurrentes de la misma tarea
+  esperan una sola llamada a ClickUp.
+- Invalidación por webhook: un evento que modifica la tarea invalida la
+  entrada si su fecha (history_items[].date) es posterior al date_updated
+  cacheado, y descarta las peticiones en vuelo que empezaron antes del cambio.
+  Así el segundo webhook del mismo cambio reutiliza la tarea que ya pidió el
+  primero.
+- Escrituras propias (set_custom_field_value) invalidan sin condiciones.
+
+Las tareas cacheadas (ClickUpTask) son compartidas: no se modifican.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.config import settings
+from app.core.cache import MemoryStore, SharedStore, SQLiteStore
+from app.core.clickup_task import ClickUpTask
+from app.core.metrics import Counter, Gauge
+
+
+# Eventos de ClickUp que cambian campos de la tarea (los de comentarios no:
+# GET /task no trae comentarios)
+MUTATING_EVENTS = frozenset({
+    "taskCreated",
+    "taskUpdated",
+    "taskDeleted",
+    "taskMoved",
+    "taskStatusUpdated",
+    "taskPriorityUpdated",
+    "taskAssigneeUpdated",
+    "taskDueDateUpdated",
+    "taskTagUpdated",
+})
+
+TASK_CACHE_REQUESTS = Counter(
+    "clickup_task_cache_requests_total",
+    "Consultas a la caché de tareas (hit, miss, coalesced: esperó un fetch en vuelo)",
+    ("result",),
+)
+TASK_CACHE_INVALIDATIONS = Counter(
+    "clickup_task_cache_invalidations_total",
+    "Invalidaciones de la caché de tareas por motivo (webhook, write)",
+    ("reason",),
+)
+TASK_CACHE_HIT_RATIO = Gauge(
+    "clickup_task_cache_hit_ratio",
+    "Proporción de consultas servidas sin llamar a ClickUp ((hit + coalesced) / total)",
+)
+
+
+def _ms(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Flight:
+    """Un fetch en vuelo: los demás solicitantes esperan su future."""
+
+    __slots__ = ("future", "started_ms", "stale")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.started_ms = int(time.time() * 1000)
+        self.stale = False
+
+
+class TaskCache:
+    """Caché de ClickUpTask por task_id con single-flight."""
+
+    def __init__(self, store: SharedStore, ttl: float = 30.0, enabled: bool = True):
+        self.store = store
+        self.ttl = ttl
+        self.enabled = enabled
+        self._inflight: Dict[Tuple[str, bool], _Flight] = {}
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"task:{task_id}"
+
+    def get(self, task_id: str, keep_raw: bool = False) -> Optional[ClickUpTask]:
+        """Tarea cacheada; si se pide raw_data, solo sirve una entrada que lo tenga."""
+        task = self.store.get(self._key(task_id))
+        if task is None or (keep_raw and task.raw_data is None):
+            return None
+        return task
+
+    def put(self, task_id: str, task: ClickUpTask) -> None:
+        """Guarda una tarea recién pedida (reemplaza la copia y los fetch en vuelo)."""
+        if not self.enabled:
+            return
+        self.store.set(self._key(task_id), task, ttl=self.ttl)
+        self._drop_flights(task_id)
+
+    async def get_or_fetch(
+        self,
+        task_id: str,
+        fetch: Callable[[], Awaitable[Optional[ClickUpTask]]],
+        keep_raw: bool = False,
+    ) -> Optional[ClickUpTask]:
+        """
+        Devuelve la tarea cacheada o la pide con fetch() (una sola vez aunque
+        haya peticiones concurrentes). None (error o 404) no se cachea.
+        """
+        if not self.enabled:
+            return await fetch()
+
+        task = self.get(task_id, keep_raw)
+        if task is not None:
+            TASK_CACHE_REQUESTS.inc(result="hit")
+            return task
+
+        flight_key = (task_id, keep_raw)
+        flight = self._inflight.get(flight_key)
+        if flight is not None:
+            TASK_CACHE_REQUESTS.inc(result="coalesced")
+            # shield: si este solicitante se cancela, el fetch compartido sigue
+            return await asyncio.shield(flight.future)
+
+        TASK_CACHE_REQUESTS.inc(result="miss")
+        flight = _Flight(asyncio.get_running_loop().create_future())
+        self._inflight[flight_key] = flight
+        try:
+            task = await fetch()
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except Exception as e:
+            flight.future.set_exception(e)
+            flight.future.exception()  # marcada como leída si nadie más esperaba
+            raise
+        else:
+            if task is not None and not flight.stale:
+                self.store.set(self._key(task_id), task, ttl=self.ttl)
+            flight.future.set_result(task)
+            return task
+        finally:
+            if self._inflight.get(flight_key) is flight:
+                del self._inflight[flight_key]
+
+    def _drop_flights(self, task_id: str, changed_at_ms: Optional[int] = None) -> None:
+        """Los fetch que empezaron antes del cambio no se cachean y dejan de compartirse."""
+        for keep_raw in (False, True):
+            flight = self._inflight.get((task_id, keep_raw))
+            if flight and (changed_at_ms is None or changed_at_ms >= flight.started_ms):
+                flight.stale = True
+                del self._inflight[(task_id, keep_raw)]
+
+    def invalidate(self, task_id: str, reason: str = "write") -> None:
+        """Invalida sin condiciones (p. ej. tras escribir en la tarea)."""
+        if not self.enabled:
+            return
+        try:
+            self.store.delete(self._key(task_id))
+        except Exception as e:
+            # La caché nunca debe romper una escritura
+            print(f"⚠️ Error invalidando la tarea {task_id} en caché: {e}")
+        self._drop_flights(task_id)
+        TASK_CACHE_INVALIDATIONS.inc(reason=reason)
+
+    def note_webhook(self, event: str, task_id: str, history_items: Optional[Iterable[Dict]] = None) -> bool:
+        """
+        Aplica un evento de webhook. Invalida si el evento modifica la tarea y
+        es posterior a la copia cacheada (sin fechas en history_items: siempre).
+        Devuelve True si invalidó algo.
+        """
+        if not self.enabled or event not in MUTATING_EVENTS:
+            return False
+
+        dates = [_ms(item.get("date")) for item in history_items or () if isinstance(item, dict)]
+        changed_at = max((d for d in dates if d is not None), default=None)
+
+        cached = self.store.get(self._key(task_id))
+        cached_updated = _ms(cached.date_updated) if cached is not None else None
+        invalidated = False
+        if cached is not None and (changed_at is None or cached_updated is None or changed_at > cached_updated):
+            self.store.delete(self._key(task_id))
+            invalidated = True
+
+        flights = len(self._inflight)
+        self._drop_flights(task_id, changed_at)
+        invalidated = invalidated or len(self._inflight) < flights
+        if invalidated:
+            TASK_CACHE_INVALIDATIONS.inc(reason="webhook")
+        return invalidated
+
+    @staticmethod
+    def hit_ratio() -> float:
+        served = TASK_CACHE_REQUESTS.value(result="hit") + TASK_CACHE_REQUESTS.value(result="coalesced")
+        total = served + TASK_CACHE_REQUESTS.value(result="miss")
+        return served / total if total else 0.0
+
+
+def _build_store() -> SharedStore:
+    if settings.task_cache_backend == "sqlite":
+        return SQLiteStore(settings.task_cache_shared_path)
+    return MemoryStore(max_entries=settings.task_cache_max_entries)
+
+
+# Singleton compartido por ClickUpService
+task_cache = TaskCache(
+    _build_store(),
+    ttl=settings.task_cache_ttl_seconds,
+    enabled=settings.task_cache_enabled,
+)
+
+TASK_CACHE_HIT_RATIO.set_function(TaskCache.hit_ratio)
@@ -4,10 +4,25 @@ Replica la lógica de R para nombres, teléfonos, fechas.
 """
 
 import re
+import string
+from functools import lru_cache
 from unidecode import unidecode
 from typing import Optional
 
 
+NORMALIZE_CACHE_SIZE = 16384
+
+# Tabla ASCII para normalize_name: minúsculas -> mayúsculas, conserva A-Z,
+# 0-9 y espacio, borra todo lo demás (tabs y saltos de línea incluidos).
+_NAME_TABLE = {code: None for code in range(128)}
+_NAME_TABLE.update({ord(c): ord(c) for c in string.ascii_uppercase + string.digits + " "})
+_NAME_TABLE.update({ord(c): ord(c.upper()) for c in string.ascii_lowercase})
+
+_NON_DIGITS = re.compile(r"[^0-9]")
+_ORDINAL_SUFFIX = re.compile(r"(?<=\d)(st|nd|rd|th)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
 def normalize_name(text: str) -> str:
     """
     Normaliza un nombre para búsqueda fuzzy.
@@ -18,6 +33,9 @@ def normalize_name(text: str) -> str:
     3. Eliminar caracteres no alfanuméricos (dejar solo A-Z, 0-9, espacios)
     4. Squish: reducir espacios múltiples a uno solo y trim
 
+    Única implementación para webhooks, importaciones y búsqueda. Input ASCII
+    puro no pasa por unidecode; los resultados se memorizan (LRU acotado).
+
     Args:
         text: Nombre original
 
@@ -26,20 +44,19 @@ def normalize_name(text: str) -> str:
     """
     if not text:
         return ""
+    return _normalize_name(text)
 
-    # 1. ASCII (remover acentos)
-    ascii_text = unidecode(text)
 
-    # 2. Mayúsculas
-    upper_text = ascii_text.upper()
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_name(text: str) -> str:
+    # 1. ASCII (remover acentos); unidecode es identidad sobre ASCII
+    ascii_text = text if text.isascii() else unidecode(text)
 
-    # 3. Solo A-Z, 0-9, espacios
-    clean_text = re.sub(r"[^A-Z0-9 ]", "", upper_text)
+    # 2 + 3. Mayúsculas y solo A-Z, 0-9, espacios (una sola pasada)
+    clean_text = ascii_text.translate(_NAME_TABLE)
 
     # 4. Squish: múltiples espacios -> uno solo, y trim
-    normalized = re.sub(r"\s+", " ", clean_text).strip()
-
-    return normalized
+    return " ".join(clean_text.split())
 
 
 def clean_phone(phone: Optional[str]) -> Optional[str]:
@@ -57,7 +74,7 @@ def clean_phone(phone: Optional[str]) -> Optional[str]:
         return None
 
     # Eliminar todo excepto números
-    digits = re.sub(r"[^0-9]", "", phone)
+    digits = _NON_DIGITS.sub("", phone)
 
     # Validar longitud
     if 10 <= len(digits) <= 15:
@@ -83,7 +100,7 @@ def remove_ordinal_suffix(date_text: str) -> str:
         return ""
 
     # Regex con lookbehind: solo elimina st/nd/rd/th si hay un dígito antes
-    return re.sub(r"(?<=\d)(st|nd|rd|th)", "", date_text, flags=re.IGNORECASE)
+    return _ORDINAL_SUFFIX.sub("", date_text)
 
 
 def squish_whitespace(text: str) -> str:
@@ -99,4 +116,4 @@ def squish_whitespace(text: str) -> str:
     if not text:
         return ""
 
-    return re.sub(r"\s+", " ", text).strip()
+    return _WHITESPACE.sub(" ", text).strip()
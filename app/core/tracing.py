@@ -0,0 +1,250 @@
+"""
+Tracing en proceso compatible con OpenTelemetry.
+
+- IDs y propagación W3C (`traceparent`): trace_id de 32 hex, span_id de 16 hex.
+- El span activo vive en un ContextVar; los hijos lo toman como padre.
+- Para cruzar fronteras (BackgroundTasks, Enqueuer -> Filtros -> callback)
+  se pasa explícitamente un SpanContext o su `traceparent`.
+- Exportador local: una línea JSON por span con los campos de OTLP/JSON
+  (traceId, spanId, parentSpanId, startTimeUnixNano, attributes...).
+- Con el exportador apagado y sin traza entrante, begin_span devuelve un
+  span no-op compartido (sin IDs ni atributos): la instrumentación no cuesta
+  nada por petición ni por query. Con `traceparent` entrante se sigue
+  creando el span para propagar la traza aguas abajo.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from app.config import settings
+
+
+SERVICE_NAME = "nexus-legal-api"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identidad propagable de un span."""
+
+    trace_id: str
+    span_id: str
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """Parsea un header W3C traceparent; None si es inválido."""
+        if not value:
+            return None
+        parts = value.strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        try:
+            int(parts[1], 16)
+            int(parts[2], 16)
+        except ValueError:
+            return None
+        if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2])
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str] = None
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "unset"
+    status_message: Optional[str] = None
+
+    # False solo en NOOP_SPAN: no se exporta ni se propaga
+    recording = True
+
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            exporter.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind.upper()}",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {
+                "code": {"ok": "STATUS_CODE_OK", "error": "STATUS_CODE_ERROR"}.get(self.status, "STATUS_CODE_UNSET"),
+                **({"message": self.status_message} if self.status_message else {}),
+            },
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class _NoopSpan(Span):
+    """Span que descarta todo; una sola instancia compartida (NOOP_SPAN)."""
+
+    recording = False
+
+    def __init__(self):
+        super().__init__(name="noop", context=SpanContext(trace_id="0" * 32, span_id="0" * 16), start_ns=0)
+        object.__setattr__(self, "_sealed", True)
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        # Compartido entre peticiones: asignaciones como span.status = ... se ignoran
+        if not getattr(self, "_sealed", False):
+            object.__setattr__(self, key, value)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+# IDs en cero: un traceparent inválido según W3C (from_traceparent -> None)
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class JsonFileExporter:
+    """Escribe spans terminados como JSON lines (no-op si el tracing está apagado)."""
+
+    def __init__(self, path: str, enabled: bool):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        line = json.dumps(span.to_otlp(), default=str)
+        try:
+            with self._lock:
+                if self._file is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line + "\n")
+        except OSError as e:
+            # El tracing nunca debe tumbar una petición
+            print(f"⚠️ No se pudo exportar span {span.name}: {e}")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Singleton
+exporter = JsonFileExporter(settings.tracing_export_path, settings.tracing_enabled)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_context() -> Optional[SpanContext]:
+    span = _current_span.get()
+    return span.context if span and span.recording else None
+
+
+def is_recording(parent: Optional[SpanContext] = None) -> bool:
+    """¿Un span nuevo se registraría? Sí si se exporta o si continúa una traza."""
+    return exporter.enabled or parent is not None or current_context() is not None
+
+
+def begin_span(
+    name: str,
+    parent: Optional[SpanContext] = None,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Span:
+    """
+    Crea un span (sin activarlo). Padre: `parent` explícito o el span activo.
+    Para usos donde el fin no coincide con un bloque with (middleware ASGI).
+    NOOP_SPAN si el exportador está apagado y no hay traza que continuar.
+    """
+    if parent is None:
+        parent = current_context()
+    if parent is None and not exporter.enabled:
+        return NOOP_SPAN
+    context = SpanContext(
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+    )
+    return Span(
+        name=name,
+        context=context,
+        parent_span_id=parent.span_id if parent else None,
+        kind=kind,
+        attributes=dict(attributes or {}),
+    )
+
+
+@contextmanager
+def start_span(
+    name: str,
+    parent: Optional[SpanContext] = None,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Iterator[Span]:
+    """Abre un span, lo activa durante el bloque y lo exporta al salir."""
+    span = begin_span(name, parent=parent, kind=kind, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def activate(span: Span):
+    """Activa un span creado con begin_span(); devuelve el token para reset()."""
+    return _current_span.set(span)
+
+
+def deactivate(token) -> None:
+    _current_span.reset(token)
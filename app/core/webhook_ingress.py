@@ -0,0 +1,97 @@
+"""
+Entrada común de los webhooks de ClickUp: una sola lectura del body.
+
+1. `await request.body()` una vez (bytes, sin decodificar).
+2. HMAC-SHA256 directamente sobre esos bytes; con firma inválida se responde
+   401 sin haber parseado nada.
+3. Un solo parseo con orjson (acepta bytes) a un `WebhookEnvelope` con los
+   campos que usan los handlers; history_items queda como referencia a la
+   lista parseada, sin copias ni validación por elemento.
+
+Los errores se devuelven como HTTPException y se registran en
+webhook_outcomes_total (invalid_signature, invalid_json, missing_task_id).
+"""
+
+import hashlib
+import hmac
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+from fastapi import HTTPException, Request
+
+from app.core import tracing
+from app.core.instrumentation import record_outcome, stage
+
+
+class MissingTaskId(ValueError):
+    """JSON válido pero sin task_id."""
+
+
+@dataclass(frozen=True, slots=True)
+class WebhookEnvelope:
+    """Lo que los handlers leen del payload de ClickUp."""
+
+    event: str
+    task_id: str
+    webhook_id: Optional[str] = None
+    history_items: Optional[List[Dict[str, Any]]] = None
+
+
+def verify_signature(body: Union[bytes, str], signature: Optional[str], secret: Optional[str]) -> bool:
+    """HMAC-SHA256 (hex) del body tal cual llegó, en tiempo constante."""
+    if not signature or not secret or not signature.isascii():
+        return False
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+def parse_envelope(body: bytes) -> WebhookEnvelope:
+    """
+    orjson -> WebhookEnvelope. ValueError si no es JSON o no es un objeto;
+    MissingTaskId si falta task_id.
+    """
+    payload = orjson.loads(body)  # orjson.JSONDecodeError es subclase de ValueError
+    if not isinstance(payload, dict):
+        raise ValueError("payload is not a JSON object")
+
+    task_id = payload.get("task_id")
+    if not task_id:
+        raise MissingTaskId("Missing task_id")
+    history_items = payload.get("history_items")
+    webhook_id = payload.get("webhook_id")
+    return WebhookEnvelope(
+        event=str(payload.get("event") or ""),
+        task_id=str(task_id),
+        webhook_id=str(webhook_id) if webhook_id is not None else None,
+        history_items=history_items if isinstance(history_items, list) else None,
+    )
+
+
+async def read_webhook(request: Request, router: str, signature: Optional[str], secret: Optional[str]) -> WebhookEnvelope:
+    """Lee, verifica y parsea el webhook; 401 / 400 con su outcome si algo falla."""
+    body = await request.body()
+
+    with stage(router, "signature"):
+        valid = verify_signature(body, signature, secret)
+    if not valid:
+        record_outcome(router, "invalid_signature")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    try:
+        with stage(router, "parse_payload"):
+            envelope = parse_envelope(body)
+    except MissingTaskId:
+        record_outcome(router, "missing_task_id")
+        raise HTTPException(status_code=400, detail="Missing task_id")
+    except ValueError as e:
+        record_outcome(router, "invalid_json")
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    span = tracing.current_span()
+    if span:
+        span.set_attribute("clickup.event", envelope.event)
+        span.set_attribute("clickup.task_id", envelope.task_id)
+    return envelope
@@ -3,20 +3,95 @@ Configuración de conexión a la base de datos.
 Session factory y dependency injection para FastAPI.
 """
 
-from sqlalchemy import create_engine
+import logging
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 from app.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.instrumentation import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# Métricas del pool
+# ============================================================================
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo esperando una conexión del pool (incluye abrir conexiones nuevas)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts que agotaron DB_POOL_TIMEOUT sin obtener conexión",
+)
+DB_POOL_DISCONNECTS = Counter(
+    "db_pool_disconnects_total",
+    "Errores de desconexión detectados (el pool se invalida y reconecta)",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Conexiones del pool por estado (in_use, idle, overflow, size)",
+    ("state",),
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide el tiempo de espera de cada checkout."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
 
 # Motor de SQLAlchemy
+# Con 2 workers x 4 threads por instancia y escalado horizontal de Cloud Run,
+# (pool_size + max_overflow) x workers x instancias debe quedar bajo el límite
+# de conexiones de Cloud SQL.
 engine = create_engine(
     settings.database_dsn,
-    pool_pre_ping=True,  # Verifica conexión antes de usar
-    pool_size=5,
-    max_overflow=10,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,  # Evita conexiones cortadas por idle en Cloud SQL
+    pool_use_lifo=settings.db_pool_use_lifo,  # LIFO: las conexiones sobrantes envejecen y se reciclan
+    pool_pre_ping=settings.db_pool_pre_ping,  # Activado por defecto: ver handle_error
+    query_cache_size=settings.db_query_cache_size,  # SQL compilado reutilizado entre requests
     echo=settings.debug  # Log SQL queries en debug mode
 )
 
+
+@event.listens_for(engine, "handle_error")
+def _handle_disconnect(context):
+    """
+    Manejo de desconexiones al fallar. No reemplaza a pool_pre_ping: la
+    consulta que detecta la desconexión ya falló (no se reintenta). SQLAlchemy
+    invalida la conexión rota y, con invalidate_pool_on_disconnect, todas las
+    del pool abiertas antes del fallo, así tras un failover el resto de
+    checkouts reconecta sin pagar un ping fallido cada uno.
+    """
+    if context.is_disconnect:
+        DB_POOL_DISCONNECTS.inc()
+        context.invalidate_pool_on_disconnect = True
+        logger.warning(f"⚠️ Desconexión de DB detectada, invalidando pool: {context.original_exception}")
+
+
+instrument_engine(engine)
+
+DB_POOL_CONNECTIONS.set_function(lambda: engine.pool.checkedout(), state="in_use")
+DB_POOL_CONNECTIONS.set_function(lambda: engine.pool.checkedin(), state="idle")
+DB_POOL_CONNECTIONS.set_function(lambda: max(engine.pool.overflow(), 0), state="overflow")
+DB_POOL_CONNECTIONS.set_function(lambda: engine.pool.size(), state="size")
+
 # Session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -1,10 +1,16 @@
 # app/main.py
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.api import webhooks, leads, callbacks, webhook_assignments
+from app.api import webhooks, leads, callbacks, webhook_assignments, dashboards
+from app.core.metrics import REGISTRY
+from app.core.instrumentation import MetricsMiddleware
+from app.services.callback_recorder import callback_recorder
+from app.services.change_feed import change_feed
+from app.services.write_back_queue import write_back_queue
 
 # ============================================================================
 # Lifespan Event Handler (Reemplaza a on_event)
@@ -15,10 +21,16 @@ async def lifespan(app: FastAPI):
     print("🚀 Nexus Legal Integration API iniciada")
     print(f"📍 Entorno: {settings.app_env}")
     print(f"🗄️  Base de datos: {settings.database_host}")
+    write_back_queue.start()
+    callback_recorder.start()
+    change_feed.start()
     
     yield # Aquí es donde la aplicación corre
     
     # Shutdown: Código que se ejecuta al detener
+    await change_feed.stop()
+    await write_back_queue.stop()
+    await callback_recorder.stop()  # después de la cola: guarda los resultados finales
     print("👋 Nexus Legal Integration API detenida")
 
 # ============================================================================
@@ -42,6 +54,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latencia por router/ruta (middleware ASGI puro, ver /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # ============================================================================
 # Routes
 # ============================================================================
@@ -55,6 +70,9 @@ app.include_router(webhook_assignments.router)
 # Callbacks e IA
 app.include_router(callbacks.router, prefix="/callbacks", tags=["Callbacks"])
 
+# Dashboards (conteos incrementales)
+app.include_router(dashboards.router)
+
 # ============================================================================
 # Health Check
 # ============================================================================
@@ -69,4 +87,9 @@ def health_check():
 
 @app.get("/health", tags=["health"])
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+def metrics():
+    """Métricas del proceso en formato de texto Prometheus."""
+    return REGISTRY.render()
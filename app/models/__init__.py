@@ -3,7 +3,13 @@
 Modelos de datos (SQLAlchemy ORM)
 """
 
-from app.models.lead import LeadsCache, Base
+from app.models.lead import LeadsCache, LeadsCacheContent, Base
 from app.models.case_assignment import CaseAssignment
+from app.models.filtros_callback import FiltrosCallback
+from app.models.lead_change import LeadChange
+from app.models.dashboard import AssignmentCount, LeadDailyCount
 
-__all__ = ["LeadsCache", "CaseAssignment", "Base"]
\ No newline at end of file
+__all__ = [
+    "LeadsCache", "LeadsCacheContent", "CaseAssignment", "FiltrosCallback", "LeadChange",
+    "LeadDailyCount", "AssignmentCount", "Base",
+]
\ No newline at end of file
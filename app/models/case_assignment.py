@@ -1,5 +1,6 @@
 # app/models/case_assignment.py
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, Index, JSON
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from app.models.lead import Base
@@ -69,9 +70,9 @@ class CaseAssignment(Base):
     # Asegúrate de que list_name también esté si lo usas en el servicio
 
     # ========================================================================
-    # RESPALDO TOTAL (JSONB para Postgres)
+    # RESPALDO (JSONB, podado según app/core/raw_data_profile.json)
     # ========================================================================
-    raw_data = Column(JSON, nullable=True, comment="Copia íntegra del webhook")
+    raw_data = Column(JSONB, nullable=True, comment="Copia podada del JSON de ClickUp")
     
     synced_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
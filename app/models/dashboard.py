@@ -0,0 +1,47 @@
+# app/models/dashboard.py
+"""
+Modelos: lead_daily_counts, assignment_counts
+
+Conteos agregados para los dashboards de pipeline y de carga de abogados.
+No los escribe la aplicación: los mantienen triggers de Postgres sobre
+leads_cache y case_assignments con el delta de cada fila (OLD -1, NEW +1),
+instalados por DashboardRepository.install_triggers (scripts/init_db.py).
+scripts/check_dashboard_counts.py los recalcula desde cero para verificarlos.
+
+Un valor NULL de la dimensión se guarda como '' (la columna es parte de la PK).
+"""
+
+from sqlalchemy import BigInteger, Column, Date, String
+
+from app.models.lead import Base
+
+# Dimensiones agregadas (nombres de columna de la tabla de origen)
+LEAD_DIMENSIONS = ("status", "case_type", "interview_result", "pipeline_de_viabilidad")
+ASSIGNMENT_DIMENSIONS = ("abogado_asignado", "case_review_status", "label_type")
+
+
+class LeadDailyCount(Base):
+    """Leads por día de creación (DASHBOARD_TIMEZONE) y valor de cada dimensión."""
+
+    __tablename__ = "lead_daily_counts"
+
+    day = Column(Date, primary_key=True, comment="date_created en DASHBOARD_TIMEZONE")
+    dimension = Column(String(50), primary_key=True)
+    value = Column(String(255), primary_key=True, comment="'' = sin valor")
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<LeadDailyCount({self.day} {self.dimension}={self.value!r}: {self.count})>"
+
+
+class AssignmentCount(Base):
+    """Case Assignments por valor de cada dimensión (estado actual, sin día)."""
+
+    __tablename__ = "assignment_counts"
+
+    dimension = Column(String(50), primary_key=True)
+    value = Column(String(255), primary_key=True, comment="'' = sin valor")
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AssignmentCount({self.dimension}={self.value!r}: {self.count})>"
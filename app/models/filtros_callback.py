@@ -0,0 +1,55 @@
+# app/models/filtros_callback.py
+"""
+Modelo: filtros_callbacks
+
+Un registro por resultado de Filtros AI recibido en /callbacks/filtros(/batch):
+qué devolvió (outcome, doc, versión, tiempo de procesamiento), cuánto tardó
+desde el dispatch y cómo terminó la escritura del Link AI en ClickUp.
+Base de /callbacks/filtros/stats (latencia, throughput y fallos por versión).
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.models.lead import Base
+
+
+class FiltrosCallback(Base):
+    """Resultado de Filtros + telemetría del pipeline de IA."""
+
+    __tablename__ = "filtros_callbacks"
+
+    # task_id:dispatched_at_ms (un dispatch = un resultado; los reintentos de
+    # Filtros del mismo callback no duplican filas). Sin dispatch: momento de recepción.
+    callback_id = Column(String(100), primary_key=True)
+    task_id = Column(String(50), nullable=False)
+    trace_id = Column(String(32), nullable=True)
+
+    # Tiempos
+    dispatched_at = Column(DateTime(timezone=True), nullable=True, comment="Envío al Enqueuer")
+    received_at = Column(DateTime(timezone=True), nullable=False, comment="Llegada del callback")
+    latency_ms = Column(BigInteger, nullable=True, comment="dispatch -> callback")
+
+    # Resultado de Filtros
+    status = Column(String(50), nullable=False)
+    outcome = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    doc_id = Column(String(255), nullable=True)
+    doc_url = Column(Text, nullable=True)
+    processing_time_ms = Column(Integer, nullable=True)
+    filtros_version = Column(String(50), nullable=True)
+
+    # Escritura del Link AI en ClickUp (queued/coalesced/rejected/ignored_* -> success/failed/dropped)
+    write_back_status = Column(String(50), nullable=True)
+    write_back_attempts = Column(Integer, nullable=True)
+    written_at = Column(DateTime(timezone=True), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("idx_filtros_callbacks_task_received", "task_id", "received_at"),
+        Index("idx_filtros_callbacks_received", "received_at"),
+    )
+
+    def __repr__(self):
+        return f"<FiltrosCallback(task_id={self.task_id}, status={self.status}, version={self.filtros_version})>"
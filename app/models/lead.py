@@ -2,10 +2,17 @@
 """
 Modelo principal: leads_cache
 Versión Homologada con CSV de Exportación y Análisis R.
+
+El texto pesado (descripción, último comentario, interview_other) vive en la
+tabla 1:1 leads_cache_content, así las búsquedas y listados solo leen filas
+estrechas. LeadsCache lo expone con los mismos nombres de atributo (carga
+perezosa al primer acceso).
 """
 
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, Index
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, Index, ForeignKey, Computed
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime, timezone
 
@@ -60,7 +67,6 @@ class LeadsCache(Base):
     interviewee = Column(String(255), nullable=True)
     interview_type = Column(String(255), nullable=True, comment="Individual/Combo")
     interview_result = Column(String(255), nullable=True)
-    interview_other = Column(Text, nullable=True, comment="Motivos de no completado/otros")
     
     # Datos del Caso
     case_type = Column(String(255), nullable=True)
@@ -96,10 +102,25 @@ class LeadsCache(Base):
     )
 
     # ========================================================================
-    # 6. CONTENIDO PESADO (Large Text)
+    # 6. CONTENIDO PESADO (tabla leads_cache_content, carga perezosa)
     # ========================================================================
-    task_content = Column(Text, nullable=True, comment="Descripción completa")
-    latest_comment = Column(Text, nullable=True, comment="Último comentario (puede ser enorme)")
+    content = relationship(
+        "LeadsCacheContent",
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        back_populates="lead",
+    )
+    task_content = association_proxy(
+        "content", "task_content", creator=lambda value: LeadsCacheContent(task_content=value)
+    )
+    latest_comment = association_proxy(
+        "content", "latest_comment", creator=lambda value: LeadsCacheContent(latest_comment=value)
+    )
+    interview_other = association_proxy(
+        "content", "interview_other", creator=lambda value: LeadsCacheContent(interview_other=value)
+    )
     comment_count = Column(Integer, default=0)
 
     # ========================================================================
@@ -123,4 +144,45 @@ class LeadsCache(Base):
     )
 
     def __repr__(self):
-        return f"<LeadsCache(id={self.task_id}, status={self.status})>"
\ No newline at end of file
+        return f"<LeadsCache(id={self.task_id}, status={self.status})>"
+
+
+# Columnas de texto pesado que viven en leads_cache_content
+CONTENT_COLUMNS = ("task_content", "latest_comment", "interview_other")
+
+
+def content_hash_sql(column_sql=lambda column: column) -> str:
+    """
+    Expresión SQL del hash de CONTENT_COLUMNS.
+    column_sql decide de dónde sale cada columna (p. ej. excluded.<col> en un upsert).
+    Solo usa funciones inmutables, así sirve también como columna generada.
+    """
+    parts = [f"coalesce({column_sql(column)}, chr(30))" for column in CONTENT_COLUMNS]
+    return "md5(" + " || chr(31) || ".join(parts) + ")"
+
+
+class LeadsCacheContent(Base):
+    """
+    Texto pesado de un lead (1:1 con leads_cache, misma task_id).
+    content_hash lo calcula Postgres; el upsert solo escribe si cambia.
+    """
+
+    __tablename__ = "leads_cache_content"
+
+    task_id = Column(
+        String(50),
+        ForeignKey("leads_cache.task_id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    task_content = Column(Text, nullable=True, comment="Descripción completa")
+    latest_comment = Column(Text, nullable=True, comment="Último comentario (puede ser enorme)")
+    interview_other = Column(Text, nullable=True, comment="Motivos de no completado/otros")
+
+    content_hash = Column(String(32), Computed(content_hash_sql(), persisted=True))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    lead = relationship("LeadsCache", back_populates="content")
+
+    def __repr__(self):
+        return f"<LeadsCacheContent(id={self.task_id}, hash={self.content_hash})>"
@@ -0,0 +1,38 @@
+# app/models/lead_change.py
+"""
+Modelo: lead_changes
+
+Registro de cambios de leads_cache y case_assignments, una fila por upsert
+que escribió. seq es el cursor del feed de cambios (/leads/changes): cada
+fila se avisa también por NOTIFY y los clientes retoman desde el último seq
+que vieron. Se purga pasados CHANGE_FEED_RETENTION_DAYS.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, String
+from sqlalchemy.sql import func
+
+from app.models.lead import Base
+
+
+class LeadChange(Base):
+    """Cambio compacto de un lead o de un Case Assignment."""
+
+    __tablename__ = "lead_changes"
+
+    seq = Column(BigInteger, Identity(always=True), primary_key=True)
+    task_id = Column(String(50), nullable=False)
+    kind = Column(String(20), nullable=False, comment="lead | assignment")
+
+    # Lo necesario para filtrar sin leer la fila completa
+    list_name = Column(String(255), nullable=True)
+    status = Column(String(255), nullable=True)
+    date_updated = Column(DateTime(timezone=True), nullable=True, comment="date_updated de ClickUp")
+
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_lead_changes_changed_at", "changed_at"),
+    )
+
+    def __repr__(self):
+        return f"<LeadChange(seq={self.seq}, task_id={self.task_id}, kind={self.kind})>"
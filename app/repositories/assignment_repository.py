@@ -1,17 +1,39 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.orm import Session, defer
 from sqlalchemy.dialects.postgresql import insert
+from app.config import settings
 from app.models.case_assignment import CaseAssignment
+from app.repositories.lead_change_repository import LeadChangeRepository
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cambia en cada evento de ClickUp (también por claves podadas): no decide si
+# hay que reescribir la fila, pero se guarda cuando otra columna cambia
+SKIP_COMPARE_COLUMNS = frozenset({"date_updated", "synced_at"})
+
+# Columnas que el webhook no escribe: latest_comment lo mantiene
+# update_latest_comment y un upsert no debe pisarlo con NULL
+PRESERVED_COLUMNS = frozenset({"latest_comment"})
+
 class AssignmentRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def upsert(self, data: dict):
+    def upsert(self, data: dict) -> bool:
         """
         Inserta un nuevo registro o actualiza el existente si el task_id ya existe.
+        Se reescriben todas las columnas salvo PRESERVED_COLUMNS: una clave
+        ausente en `data` (sin asignados, custom field vacío) queda en NULL.
+
+        Si las columnas escritas (salvo SKIP_COMPARE_COLUMNS) son iguales a las
+        guardadas, no se escribe nada: solo cambiaron claves podadas de
+        raw_data (avatares, watchers, date_updated...). Se comparan todas, no
+        solo raw_data: etiquetas (field_catalog) y nombres de lista/carpeta/
+        espacio (clickup_hierarchy) se resuelven fuera de raw_data y pueden
+        corregirse sin que la tarea cambie.
+        Devuelve True si se insertó o actualizó la fila; solo entonces, con
+        CHANGE_FEED_ENABLED, el cambio queda en lead_changes (y sale por NOTIFY).
         """
         try:
             # Definimos la instrucción de inserción
@@ -19,24 +41,68 @@ class AssignmentRepository:
 
             # Definimos qué pasa si hay conflicto en la Primary Key (task_id)
             update_dict = {
-                c.name: c for c in stmt.excluded 
-                if not c.primary_key # No actualizamos la PK
+                c.name: c for c in stmt.excluded
+                if not c.primary_key and c.name not in PRESERVED_COLUMNS
             }
+            # onupdate no corre en ON CONFLICT DO UPDATE: synced_at explícito
+            update_dict["synced_at"] = func.now()
 
+            compared = [k for k in update_dict if k not in SKIP_COMPARE_COLUMNS]
             upsert_stmt = stmt.on_conflict_do_update(
                 index_elements=['task_id'],
-                set_=update_dict
+                set_=update_dict,
+                where=(
+                    tuple_(*(CaseAssignment.__table__.c[k] for k in compared))
+                    .is_distinct_from(tuple_(*(stmt.excluded[k] for k in compared)))
+                    if compared else None
+                )
             )
 
-            self.db.execute(upsert_stmt)
+            written = self.db.execute(upsert_stmt).rowcount > 0
+            if written and settings.change_feed_enabled:
+                LeadChangeRepository(self.db).record(
+                    data["task_id"], "assignment",
+                    data.get("list_name"), data.get("status"), data.get("date_updated"),
+                )
             self.db.commit()
-            logger.info(f"✅ CaseAssignment {data.get('task_id')} sincronizado exitosamente.")
-            return True
+            if written:
+                logger.info(f"✅ CaseAssignment {data.get('task_id')} sincronizado exitosamente.")
+            else:
+                logger.info(f"⏭️  CaseAssignment {data.get('task_id')} sin cambios; no se reescribe.")
+            return written
 
         except Exception as e:
             self.db.rollback()
             logger.error(f"❌ Error en upsert de CaseAssignment: {e}")
             raise e
 
-    def get_by_task_id(self, task_id: str):
-        return self.db.query(CaseAssignment).filter(CaseAssignment.task_id == task_id).first()
\ No newline at end of file
+    def update_latest_comment(self, task_id: str, latest_comment) -> bool:
+        """
+        Actualiza latest_comment si cambió. Devuelve True si se escribió
+        (False si no cambió o si el CaseAssignment no existe).
+        """
+        try:
+            result = self.db.execute(
+                update(CaseAssignment)
+                .where(
+                    CaseAssignment.task_id == task_id,
+                    CaseAssignment.latest_comment.is_distinct_from(latest_comment),
+                )
+                .values(latest_comment=latest_comment)
+            )
+            self.db.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"❌ Error actualizando comentarios de CaseAssignment {task_id}: {e}")
+            raise e
+
+    def get_by_task_id(self, task_id: str, include_raw: bool = False):
+        """
+        Obtiene un CaseAssignment por task_id.
+        raw_data (copia íntegra del JSON de ClickUp) se difiere salvo que se pida.
+        """
+        query = self.db.query(CaseAssignment)
+        if not include_raw:
+            query = query.options(defer(CaseAssignment.raw_data))
+        return query.filter(CaseAssignment.task_id == task_id).first()
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Repository de los conteos de dashboards (lead_daily_counts, assignment_counts).
+
+Los conteos se mantienen en Postgres con triggers por fila: cada INSERT,
+UPDATE (solo si cambia alguna dimensión o el día) o DELETE en leads_cache /
+case_assignments aplica su delta (fila vieja -1, fila nueva +1) en la misma
+transacción. Los upserts de los repositorios no cambian: cualquier escritura,
+también scripts e importaciones, queda contada. Un TRUNCATE no dispara
+triggers por fila: después hay que reconstruir (rebuild).
+
+El SQL se genera desde LEAD_DIMENSIONS / ASSIGNMENT_DIMENSIONS, así triggers,
+recálculo y verificación usan exactamente las mismas expresiones.
+"""
+
+import re
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.dashboard import ASSIGNMENT_DIMENSIONS, LEAD_DIMENSIONS, AssignmentCount, LeadDailyCount
+
+# Nombres de zona horaria IANA (van literales en la función del trigger)
+_TIMEZONE_NAME = re.compile(r"^[A-Za-z0-9_+\-/]+$")
+
+
+class _Aggregate:
+    """SQL de un agregado: tabla de origen -> tabla de conteos."""
+
+    def __init__(self, name: str, source: str, target: str, dimensions: Sequence[str], daily: bool):
+        self.name = name
+        self.source = source
+        self.target = target
+        self.dimensions = tuple(dimensions)
+        self.daily = daily
+        self.keys = ("day", "dimension", "value") if daily else ("dimension", "value")
+
+    def _day(self, row: str, timezone: str) -> str:
+        return f"({row}.date_created AT TIME ZONE {timezone})::date"
+
+    def _values(self, row: str) -> str:
+        return ", ".join(f"('{d}', {row}.{d})" for d in self.dimensions)
+
+    def _delta(self, row: str, sign: int, skip_op: str, timezone: str) -> str:
+        day = f"{self._day(row, timezone)}, " if self.daily else ""
+        where = f"TG_OP <> '{skip_op}'" + (f" AND {row}.date_created IS NOT NULL" if self.daily else "")
+        return (
+            f"SELECT {day}d.dimension, coalesce(d.value, ''), {sign} "
+            f"FROM (VALUES {self._values(row)}) AS d(dimension, value) WHERE {where}"
+        )
+
+    def trigger_ddl(self, timezone: str) -> List[str]:
+        """Función y triggers (idempotente: CREATE OR REPLACE / DROP IF EXISTS)."""
+        tz = f"'{timezone}'"
+        keys = ", ".join(self.keys)
+        function = f"{self.target}_delta"
+        watched = [*self.dimensions, *(("date_created",) if self.daily else ())]
+        changed = " OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in watched)
+        return [
+            f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+            DECLARE
+                old_row {self.source}%ROWTYPE;
+                new_row {self.source}%ROWTYPE;
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN old_row := OLD; END IF;
+                IF TG_OP <> 'DELETE' THEN new_row := NEW; END IF;
+                -- Orden fijo de claves: dos transacciones no se bloquean en cruz
+                INSERT INTO {self.target} AS c ({keys}, count)
+                SELECT {keys}, sum(delta)
+                FROM (
+                    {self._delta("old_row", -1, "INSERT", tz)}
+                    UNION ALL
+                    {self._delta("new_row", 1, "DELETE", tz)}
+                ) AS deltas({keys}, delta)
+                GROUP BY {keys}
+                HAVING sum(delta) <> 0
+                ORDER BY {keys}
+                ON CONFLICT ({keys}) DO UPDATE SET count = c.count + excluded.count;
+                RETURN NULL;
+            END $$
+            """,
+            f"DROP TRIGGER IF EXISTS {self.target}_ins_del ON {self.source}",
+            f"""
+            CREATE TRIGGER {self.target}_ins_del AFTER INSERT OR DELETE ON {self.source}
+            FOR EACH ROW EXECUTE FUNCTION {function}()
+            """,
+            f"DROP TRIGGER IF EXISTS {self.target}_upd ON {self.source}",
+            f"""
+            CREATE TRIGGER {self.target}_upd AFTER UPDATE OF {", ".join(watched)} ON {self.source}
+            FOR EACH ROW WHEN ({changed}) EXECUTE FUNCTION {function}()
+            """,
+        ]
+
+    def recount_sql(self) -> str:
+        """Conteos calculados desde cero sobre la tabla de origen (parámetro :tz)."""
+        day = f"{self._day('s', ':tz')} AS day, " if self.daily else ""
+        where = "WHERE s.date_created IS NOT NULL " if self.daily else ""
+        return (
+            f"SELECT {day}d.dimension, coalesce(d.value, '') AS value, count(*) AS count "
+            f"FROM {self.source} AS s CROSS JOIN LATERAL (VALUES {self._values('s')}) AS d(dimension, value) "
+            f"{where}GROUP BY {', '.join(str(i) for i in range(1, len(self.keys) + 1))}"
+        )
+
+    def diff_sql(self) -> str:
+        """Claves donde la tabla de conteos no coincide con el recálculo."""
+        keys = ", ".join(self.keys)
+        return (
+            f"WITH expected AS ({self.recount_sql()}) "
+            f"SELECT {keys}, coalesce(e.count, 0) AS expected, coalesce(c.count, 0) AS actual "
+            f"FROM expected AS e FULL JOIN {self.target} AS c USING ({keys}) "
+            f"WHERE coalesce(e.count, 0) <> coalesce(c.count, 0) "
+            f"ORDER BY {keys} LIMIT :limit"
+        )
+
+
+LEAD_AGGREGATE = _Aggregate("leads", "leads_cache", LeadDailyCount.__tablename__, LEAD_DIMENSIONS, daily=True)
+ASSIGNMENT_AGGREGATE = _Aggregate(
+    "assignments", "case_assignments", AssignmentCount.__tablename__, ASSIGNMENT_DIMENSIONS, daily=False
+)
+AGGREGATES = (LEAD_AGGREGATE, ASSIGNMENT_AGGREGATE)
+
+
+def _check_timezone(timezone: str) -> str:
+    if not _TIMEZONE_NAME.match(timezone):
+        raise ValueError(f"Invalid timezone name: {timezone!r}")
+    return timezone
+
+
+class DashboardRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- Lecturas (costo por filas de conteo, no por leads) --------------------
+
+    def lead_counts(
+        self,
+        dimensions: Sequence[str] = LEAD_DIMENSIONS,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        daily: bool = False,
+    ) -> List[Dict]:
+        """
+        Leads por (día,) dimensión y valor, días en [since, until).
+        Sin daily se suman los días del rango.
+        """
+        keys = [LeadDailyCount.dimension, LeadDailyCount.value]
+        if daily:
+            keys.insert(0, LeadDailyCount.day)
+        total = func.sum(LeadDailyCount.count)
+        stmt = (
+            select(*keys, total.label("count"))
+            .where(LeadDailyCount.dimension.in_(dimensions))
+            .group_by(*keys)
+            .having(total > 0)
+            .order_by(*keys)
+        )
+        if since is not None:
+            stmt = stmt.where(LeadDailyCount.day >= since)
+        if until is not None:
+            stmt = stmt.where(LeadDailyCount.day < until)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def assignment_counts(self, dimensions: Sequence[str] = ASSIGNMENT_DIMENSIONS) -> List[Dict]:
+        """Case Assignments por dimensión y valor."""
+        stmt = (
+            select(AssignmentCount.dimension, AssignmentCount.value, AssignmentCount.count)
+            .where(AssignmentCount.dimension.in_(dimensions), AssignmentCount.count > 0)
+            .order_by(AssignmentCount.dimension, AssignmentCount.value)
+        )
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    # --- Mantenimiento -----------------------------------------------------------
+
+    def install_triggers(self, timezone: str) -> None:
+        """Crea o reemplaza funciones y triggers (el día de los leads en `timezone`)."""
+        timezone = _check_timezone(timezone)
+        try:
+            for aggregate in AGGREGATES:
+                for statement in aggregate.trigger_ddl(timezone):
+                    self.db.execute(text(statement))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def check(self, timezone: str, limit: int = 1000) -> Dict[str, List[Dict]]:
+        """
+        Recalcula desde cero y compara con las tablas de conteos.
+        Cada comparación es una sola sentencia (un snapshot): los triggers
+        escriben en la misma transacción que el origen, así que cualquier
+        diferencia es real. Devuelve {agregado: [claves distintas]}.
+        """
+        params = {"tz": _check_timezone(timezone), "limit": limit}
+        return {
+            aggregate.name: [dict(row._mapping) for row in self.db.execute(text(aggregate.diff_sql()), params)]
+            for aggregate in AGGREGATES
+        }
+
+    def rebuild(self, timezone: str) -> Dict[str, int]:
+        """
+        Reemplaza los conteos por el recálculo. Bloquea las escrituras en el
+        origen (SHARE: las lecturas siguen) hasta el commit, así ningún delta
+        se pierde ni se cuenta dos veces. Devuelve las filas escritas.
+        """
+        params = {"tz": _check_timezone(timezone)}
+        written = {}
+        try:
+            for aggregate in AGGREGATES:
+                self.db.execute(text(f"LOCK TABLE {aggregate.source} IN SHARE MODE"))
+                self.db.execute(text(f"DELETE FROM {aggregate.target}"))
+                written[aggregate.name] = self.db.execute(
+                    text(
+                        f"INSERT INTO {aggregate.target} ({', '.join(aggregate.keys)}, count) "
+                        f"{aggregate.recount_sql()}"
+                    ),
+                    params,
+                ).rowcount
+            self.db.commit()
+            return written
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, array, insert
+from sqlalchemy.orm import Session
+
+from app.models.filtros_callback import FiltrosCallback
+
+# Percentiles que devuelve stats() (un solo ordenamiento por grupo)
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class FiltrosCallbackRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_many(self, rows: Sequence[Dict]) -> int:
+        """
+        Un INSERT ... ON CONFLICT (callback_id) DO UPDATE para todo el lote.
+        Si el lote trae la misma clave más de una vez gana la última (Postgres
+        no permite tocar la misma fila dos veces en una sentencia). Todas las
+        filas deben traer las mismas columnas. Devuelve las filas escritas.
+        """
+        if not rows:
+            return 0
+        unique = list({row["callback_id"]: row for row in rows}.values())
+
+        stmt = insert(FiltrosCallback).values(unique)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FiltrosCallback.callback_id],
+            set_={k: stmt.excluded[k] for k in unique[0] if k != "callback_id"} | {"updated_at": func.now()},
+        )
+        try:
+            written = self.db.execute(stmt).rowcount
+            self.db.commit()
+            return written
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def stats(
+        self,
+        since: datetime,
+        until: datetime,
+        bucket_seconds: Optional[int] = None,
+        version: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Agregados por versión de Filtros (y por bucket de bucket_seconds si se
+        da): callbacks, fallos de Filtros, fallos de escritura en ClickUp y
+        percentiles de latencia dispatch -> callback y de processing_time_ms.
+        Todo se calcula en Postgres sobre idx_filtros_callbacks_received.
+        """
+        pcts = cast(array(PERCENTILES), ARRAY(Float))
+        columns = [
+            FiltrosCallback.filtros_version.label("filtros_version"),
+            func.count().label("callbacks"),
+            func.count().filter(FiltrosCallback.status != "success").label("failures"),
+            func.count().filter(FiltrosCallback.write_back_status == "failed").label("write_back_failures"),
+            func.percentile_cont(pcts).within_group(FiltrosCallback.latency_ms).label("latency_ms"),
+            func.percentile_cont(pcts).within_group(FiltrosCallback.processing_time_ms).label("processing_ms"),
+        ]
+        group_by = [FiltrosCallback.filtros_version]
+
+        if bucket_seconds:
+            # Literal (entero validado), no parámetro: así SELECT y GROUP BY son
+            # la misma expresión para Postgres
+            seconds = literal_column(str(int(bucket_seconds)))
+            bucket = func.to_timestamp(
+                func.floor(func.extract("epoch", FiltrosCallback.received_at) / seconds) * seconds
+            ).label("bucket")
+            columns.insert(0, bucket)
+            group_by.insert(0, bucket)
+
+        stmt = (
+            select(*columns)
+            .where(FiltrosCallback.received_at >= since, FiltrosCallback.received_at < until)
+            .group_by(*group_by)
+            .order_by(*group_by)
+        )
+        if version is not None:
+            stmt = stmt.where(FiltrosCallback.filtros_version == version)
+
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, Text, bindparam, cast, delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lead_change import LeadChange
+
+# Columnas de cada evento del feed (mismo orden en NOTIFY y en since())
+EVENT_COLUMNS = ("seq", "task_id", "kind", "list_name", "status", "date_updated")
+
+
+class LeadChangeRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(
+        self,
+        task_id: str,
+        kind: str,
+        list_name: Optional[str] = None,
+        status: Optional[str] = None,
+        date_updated: Optional[datetime] = None,
+    ) -> None:
+        """
+        INSERT en lead_changes + pg_notify en una sola sentencia, dentro de la
+        transacción del upsert: no hace commit, y Postgres entrega el NOTIFY
+        solo si la transacción se confirma (un rollback no avisa nada).
+        """
+        change = (
+            insert(LeadChange)
+            .values(task_id=task_id, kind=kind, list_name=list_name, status=status, date_updated=date_updated)
+            .returning(*(getattr(LeadChange, c) for c in EVENT_COLUMNS))
+            .cte("change")
+        )
+        payload = func.json_build_object(*(
+            part for c in EVENT_COLUMNS for part in (literal_column(f"'{c}'"), change.c[c])
+        ))
+        self.db.execute(select(func.pg_notify(settings.change_feed_channel, cast(payload, Text))).select_from(change))
+
+    def since(
+        self,
+        cursor: int,
+        limit: int,
+        kinds: Sequence[str] = (),
+        lists: Sequence[str] = (),
+        statuses: Sequence[str] = (),
+        grace_seconds: float = 0.0,
+    ) -> List[Dict]:
+        """
+        Cambios con seq > cursor, en orden de seq, con los filtros del feed
+        (status sin distinguir mayúsculas). grace_seconds agrega los cambios
+        recientes con seq <= cursor: seq se asigna al insertar, no al hacer
+        commit, así que uno más viejo puede confirmarse después que el cursor.
+        """
+        stmt = select(*(getattr(LeadChange, c) for c in EVENT_COLUMNS))
+        if grace_seconds > 0:
+            grace = bindparam("grace_seconds", grace_seconds, type_=Float)
+            recent = LeadChange.changed_at > func.now() - literal_column("interval '1 second'") * grace
+            stmt = stmt.where(or_(LeadChange.seq > cursor, recent))
+        else:
+            stmt = stmt.where(LeadChange.seq > cursor)
+        if kinds:
+            stmt = stmt.where(LeadChange.kind.in_(kinds))
+        if lists:
+            stmt = stmt.where(LeadChange.list_name.in_(lists))
+        if statuses:
+            stmt = stmt.where(func.lower(LeadChange.status).in_([s.lower() for s in statuses]))
+        stmt = stmt.order_by(LeadChange.seq).limit(limit)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def oldest_seq(self) -> Optional[int]:
+        """Primer seq que sigue en la tabla (None si está vacía)."""
+        return self.db.execute(select(func.min(LeadChange.seq))).scalar()
+
+    def latest_seq(self) -> Optional[int]:
+        return self.db.execute(select(func.max(LeadChange.seq))).scalar()
+
+    def prune(self, before: datetime) -> int:
+        """Borra los cambios anteriores a `before`; devuelve las filas borradas."""
+        try:
+            deleted = self.db.execute(delete(LeadChange).where(LeadChange.changed_at < before)).rowcount
+            self.db.commit()
+            return deleted
+        except Exception:
+            self.db.rollback()
+            raise
@@ -3,13 +3,55 @@ Repository para operaciones CRUD sobre leads_cache.
 Incluye búsqueda fuzzy con pg_trgm.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import text, func
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, text, func, any_, bindparam, update, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime, timezone  # Importamos timezone para evitar el warning
 
-from app.models.lead import LeadsCache
+from app.models.lead import CONTENT_COLUMNS, LeadsCache, LeadsCacheContent, content_hash_sql
+from app.config import settings
+from app.core.cache import response_cache
+from app.core.metrics import Counter
 from app.core.text_utils import normalize_name
+from app.repositories.lead_change_repository import LeadChangeRepository
+from app.repositories.prepared import PreparedQuery
+
+
+# Columnas de texto pesado que ninguna respuesta de la API consume: viven en
+# leads_cache_content, así que leads_cache (búsquedas, listados) es estrecha.
+HEAVY_COLUMNS = CONTENT_COLUMNS
+
+_LIGHT_COLUMNS = list(LeadsCache.__table__.columns)
+_LIGHT_NAMES = frozenset(c.name for c in _LIGHT_COLUMNS)
+_LIGHT_SELECT = ", ".join(c.name for c in _LIGHT_COLUMNS)
+
+CONTENT_WRITES = Counter(
+    "lead_content_writes_total",
+    "Upserts de leads_cache_content por resultado (written, unchanged: mismo content_hash)",
+    ("result",),
+)
+
+# Consultas calientes preparadas en el servidor (una vez por conexión)
+PREPARED_BY_TASK_ID = PreparedQuery(
+    "lead_by_task_id",
+    f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE task_id = $1 LIMIT 1",
+    [("task_id", "varchar")],
+)
+PREPARED_BY_MYCASE_ID = PreparedQuery(
+    "lead_by_mycase_id",
+    # id_mycase no es único: mismo criterio que get_many_by_mycase_ids
+    f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE id_mycase = $1 "
+    f"ORDER BY date_updated DESC NULLS LAST LIMIT 1",
+    [("mycase_id", "varchar")],
+)
+PREPARED_SEARCH = PreparedQuery(
+    "lead_search_trgm",
+    f"SELECT {_LIGHT_SELECT} FROM leads_cache "
+    f"WHERE nombre_normalizado % $1 "
+    f"ORDER BY similarity(nombre_normalizado, $1) DESC LIMIT $2",
+    [("query", "text"), ("limit", "int")],
+)
 
 
 class LeadRepository:
@@ -21,24 +63,126 @@ class LeadRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_by_task_id(self, task_id: str) -> Optional[LeadsCache]:
+    def _query(self, columns: Optional[Sequence[str]] = None, full: bool = False):
+        """
+        Construye la query base con proyección de columnas.
+
+        - columns: SELECT explícito de esas columnas (devuelve Rows, no ORM).
+        - full: entidad ORM con el contenido pesado (JOIN a leads_cache_content).
+        - por defecto: entidad ORM; el contenido pesado se carga al accederlo.
+        """
+        if columns:
+            return self.db.query(*[getattr(LeadsCache, c) for c in columns])
+        if full:
+            return self.db.query(LeadsCache).options(joinedload(LeadsCache.content))
+        return self.db.query(LeadsCache)
+
+    def _execute_prepared(
+        self, prepared: PreparedQuery, columns: Optional[Sequence[str]] = None, **params
+    ) -> List:
+        """
+        Ejecuta una sentencia preparada.
+
+        - columns: tuplas (Row) con solo esas columnas, sin pasar por el ORM.
+        - por defecto: filas mapeadas a LeadsCache; el contenido pesado queda
+          sin cargar (relación perezosa).
+        """
+        prepared.ensure(self.db)
+        statement = prepared.statement().columns(*_LIGHT_COLUMNS)
+        if columns:
+            return list(self.db.execute(statement, params).columns(*columns))
+        stmt = select(LeadsCache).from_statement(statement)
+        return list(self.db.execute(stmt, params).scalars())
+
+    def _use_prepared(self, columns: Optional[Sequence[str]], full: bool = False) -> bool:
+        if columns and not _LIGHT_NAMES.issuperset(columns):
+            return False
+        return not full and PreparedQuery.enabled(self.db)
+
+    def get_by_task_id(
+        self, task_id: str, columns: Optional[Sequence[str]] = None, full: bool = False
+    ) -> Optional[LeadsCache]:
         """Obtiene un lead por task_id"""
-        return self.db.query(LeadsCache).filter(LeadsCache.task_id == task_id).first()
+        if self._use_prepared(columns, full):
+            rows = self._execute_prepared(PREPARED_BY_TASK_ID, columns, task_id=task_id)
+            return rows[0] if rows else None
+        return self._query(columns, full).filter(LeadsCache.task_id == task_id).first()
 
-    def get_by_mycase_id(self, mycase_id: str) -> Optional[LeadsCache]:
-        """Obtiene un lead por id_mycase"""
-        return self.db.query(LeadsCache).filter(LeadsCache.id_mycase == mycase_id).first()
+    def get_by_mycase_id(
+        self, mycase_id: str, columns: Optional[Sequence[str]] = None, full: bool = False
+    ) -> Optional[LeadsCache]:
+        """
+        Obtiene un lead por id_mycase.
+        Si varios leads comparten id_mycase, gana el actualizado más recientemente.
+        """
+        if self._use_prepared(columns, full):
+            rows = self._execute_prepared(PREPARED_BY_MYCASE_ID, columns, mycase_id=mycase_id)
+            return rows[0] if rows else None
+        return (
+            self._query(columns, full)
+            .filter(LeadsCache.id_mycase == mycase_id)
+            .order_by(LeadsCache.date_updated.desc().nulls_last())
+            .first()
+        )
+
+    def get_many_by_task_ids(
+        self, task_ids: Sequence[str], columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, LeadsCache]:
+        """
+        Resuelve muchos task_id en una sola consulta: WHERE task_id = ANY(:task_ids).
+        Un único parámetro array => mismo SQL (y mismo plan) para cualquier tamaño.
+        """
+        if not task_ids:
+            return {}
+
+        rows = (
+            self._query(columns)
+            .filter(LeadsCache.task_id == any_(bindparam("task_ids", list(task_ids), type_=ARRAY(String))))
+            .all()
+        )
+        return {row.task_id: row for row in rows}
+
+    def get_many_by_mycase_ids(
+        self, mycase_ids: Sequence[str], columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, LeadsCache]:
+        """
+        Resuelve muchos id_mycase en una sola consulta: WHERE id_mycase = ANY(:mycase_ids).
+        Si varios leads comparten id_mycase, gana el actualizado más recientemente.
+        """
+        if not mycase_ids:
+            return {}
+
+        if columns and "id_mycase" not in columns:
+            columns = [*columns, "id_mycase"]
+
+        rows = (
+            self._query(columns)
+            .filter(LeadsCache.id_mycase == any_(bindparam("mycase_ids", list(mycase_ids), type_=ARRAY(String))))
+            .order_by(LeadsCache.date_updated.desc().nulls_last())
+            .all()
+        )
+        result = {}
+        for row in rows:
+            result.setdefault(row.id_mycase, row)
+        return result
 
-    
     def upsert(self, data: dict) -> LeadsCache:
         """
-        Inserta o actualiza un registro manejando concurrencia.
-        Usa session.merge() y try/except para evitar choques.
+        Inserta o actualiza un registro en una sola sentencia:
+        INSERT ... ON CONFLICT (task_id) DO UPDATE (sin carrera SELECT + INSERT).
+        Solo se actualizan las columnas presentes en `data`.
+
+        Las HEAVY_COLUMNS presentes van a leads_cache_content en la misma
+        transacción, y solo se escriben si su content_hash cambia.
+        Con CHANGE_FEED_ENABLED el cambio queda en lead_changes (y sale por NOTIFY).
         """
         task_id = data.get("task_id")
         if not task_id:
             raise ValueError("Task ID is required for upsert")
 
+        # Copia: las limpiezas de abajo no deben tocar el dict del llamador
+        data = dict(data)
+
         # 1. Limpieza de seguridad (mycase_id vs id_mycase)
         if "mycase_id" in data:
             # Si no trae id_mycase explícito, usamos el que viene como mycase_id
@@ -52,35 +196,85 @@ class LeadRepository:
         if "synced_at" not in data:
             data["synced_at"] = datetime.now(timezone.utc)
 
+        content = {k: data.pop(k) for k in HEAVY_COLUMNS if k in data}
+
         try:
-            # Creamos una instancia temporal con los datos
-            lead_instance = LeadsCache(**data)
-            
-            # MERGE: SQLAlchemy se encarga de ver si está en sesión o DB.
-            # Si existe PK, actualiza. Si no, prepara insert.
-            merged_lead = self.db.merge(lead_instance)
-            
-            # Intentamos guardar
+            # Misma forma de `data` => misma clave en la caché de SQL compilado
+            # de SQLAlchemy: solo se compila la primera vez por forma.
+            stmt = insert(LeadsCache).values(**data)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[LeadsCache.task_id],
+                set_={k: stmt.excluded[k] for k in data if k != "task_id"},
+            ).returning(LeadsCache)
+
+            lead = self.db.scalars(
+                stmt, execution_options={"populate_existing": True}
+            ).one()
+            if content:
+                self._upsert_content(task_id, content)
+            if settings.change_feed_enabled:
+                # Mismo commit que el upsert: NOTIFY solo si el lead quedó escrito
+                LeadChangeRepository(self.db).record(
+                    task_id, "lead", lead.list_name, lead.status, lead.date_updated
+                )
             self.db.commit()
-            
-            # Refrescamos para tener los datos finales (IDs, fechas autogeneradas)
-            # Ojo: refresh sobre 'merged_lead', no sobre 'lead_instance'
-            return merged_lead
+
+            # Write-through: las respuestas cacheadas de este lead quedan obsoletas
+            response_cache.invalidate_task(task_id)
+
+            return lead
 
         except Exception as e:
             self.db.rollback()
-            # Si falló (probablemente por carrera), intentamos recuperarnos suavemente
-            # devolviendo lo que ya existe en la DB sin explotar.
-            print(f"⚠️ Aviso en upsert (Recuperado de Race Condition): {e}")
-            
-            existing = self.get_by_task_id(task_id)
-            if existing:
-                return existing
-            
-            # Si falló y no existe... entonces es un error real, lo relanzamos.
+            print(f"⚠️ Error en upsert de lead {task_id}: {e}")
             raise e
 
-    def search_by_name(self, query: str, limit: int = 10) -> List[LeadsCache]:
+    def _upsert_content(self, task_id: str, content: dict) -> bool:
+        """
+        Upsert de leads_cache_content que no escribe si el hash no cambia.
+        Las columnas ausentes en `content` conservan su valor (también en el hash).
+        Devuelve True si se insertó o actualizó la fila.
+        """
+        table = LeadsCacheContent.__tablename__
+        new_hash = content_hash_sql(
+            lambda c: f"excluded.{c}" if c in content else f"{table}.{c}"
+        )
+        stmt = insert(LeadsCacheContent).values(task_id=task_id, **content)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeadsCacheContent.task_id],
+            set_={**{k: stmt.excluded[k] for k in content}, "updated_at": func.now()},
+            where=text(f"{table}.content_hash IS DISTINCT FROM {new_hash}"),
+        )
+        written = self.db.execute(stmt).rowcount > 0
+        CONTENT_WRITES.inc(result="written" if written else "unchanged")
+        return written
+
+    def update_comments(self, task_id: str, latest_comment: Optional[str], comment_count: int) -> bool:
+        """
+        Actualiza comment_count (fila caliente) y latest_comment (leads_cache_content).
+        No reescribe lo que no cambió. Devuelve True si algo cambió; False
+        también si el lead no existe (los comentarios no crean leads).
+        """
+        try:
+            hot = self.db.execute(
+                update(LeadsCache)
+                .where(LeadsCache.task_id == task_id, LeadsCache.comment_count.is_distinct_from(comment_count))
+                .values(comment_count=comment_count)
+            ).rowcount > 0
+            if not hot and self.db.query(LeadsCache.task_id).filter(LeadsCache.task_id == task_id).first() is None:
+                self.db.rollback()
+                return False
+            content = self._upsert_content(task_id, {"latest_comment": latest_comment})
+            self.db.commit()
+            return hot or content
+        except Exception as e:
+            self.db.rollback()
+            print(f"⚠️ Error actualizando comentarios del lead {task_id}: {e}")
+            raise e
+
+    def search_by_name(
+        self, query: str, limit: int = 10, columns: Optional[Sequence[str]] = None
+    ) -> List[LeadsCache]:
         """
         Búsqueda fuzzy por nombre usando pg_trgm similarity.
         """
@@ -89,8 +283,11 @@ class LeadRepository:
         if not normalized_query:
             return []
 
+        if self._use_prepared(columns):
+            return self._execute_prepared(PREPARED_SEARCH, columns, query=normalized_query, limit=limit)
+
         results = (
-            self.db.query(LeadsCache)
+            self._query(columns)
             .filter(text("nombre_normalizado % :query"))
             .params(query=normalized_query)
             .order_by(text("similarity(nombre_normalizado, :query) DESC"))
@@ -100,24 +297,28 @@ class LeadRepository:
 
         return results
 
-    def get_recent_updates(self, since: datetime, limit: int = 100) -> List[LeadsCache]:
+    def get_recent_updates(
+        self, since: datetime, limit: int = 100, columns: Optional[Sequence[str]] = None
+    ) -> List[LeadsCache]:
         """
         Obtiene leads actualizados después de una fecha.
         """
         return (
-            self.db.query(LeadsCache)
+            self._query(columns)
             .filter(LeadsCache.date_updated > since)
             .order_by(LeadsCache.date_updated.desc())
             .limit(limit)
             .all()
         )
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[LeadsCache]:
+    def get_all(
+        self, skip: int = 0, limit: int = 100, columns: Optional[Sequence[str]] = None
+    ) -> List[LeadsCache]:
         """
         Obtiene todos los leads con paginación.
         """
         return (
-            self.db.query(LeadsCache)
+            self._query(columns)
             .order_by(LeadsCache.date_updated.desc())
             .offset(skip)
             .limit(limit)
@@ -0,0 +1,64 @@
+"""
+Sentencias preparadas en el servidor (PREPARE / EXECUTE) para las consultas calientes.
+
+psycopg2 no prepara sentencias por sí mismo: cada query se parsea y planifica
+de nuevo en Postgres. Aquí se emite PREPARE una sola vez por conexión física
+(se registra en connection.info, que sobrevive a los checkouts del pool y se
+pierde cuando la conexión se recicla o invalida) y luego solo EXECUTE.
+"""
+
+from typing import Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.config import settings
+
+
+class PreparedQuery:
+    """Una sentencia preparada con nombre y parámetros posicionales ($1, $2...)."""
+
+    INFO_KEY = "prepared_statements"
+
+    def __init__(self, name: str, sql: str, params: Sequence[Tuple[str, str]]):
+        """
+        Args:
+            name: Nombre de la sentencia en el servidor
+            sql: SQL con marcadores $1..$n
+            params: [(nombre_bind, tipo_postgres), ...] en el orden de $1..$n
+        """
+        self.name = name
+        self.sql = sql
+        self.params = list(params)
+        types = ", ".join(pg_type for _, pg_type in self.params)
+        self._prepare_sql = f"PREPARE {name} ({types}) AS {sql}"
+        binds = ", ".join(f":{bind}" for bind, _ in self.params)
+        self._execute = text(f"EXECUTE {name}({binds})")
+
+    @staticmethod
+    def enabled(session: Session) -> bool:
+        return (
+            settings.db_server_side_prepare
+            and session.get_bind().dialect.name == "postgresql"
+        )
+
+    def ensure(self, session: Session) -> None:
+        """Emite PREPARE si esta conexión física aún no la tiene."""
+        fairy = session.connection().connection
+        prepared = fairy.info.setdefault(self.INFO_KEY, set())
+        if self.name in prepared:
+            return
+
+        # Cursor DBAPI directo y sin parámetros: psycopg2 no interpreta los '%'
+        # del SQL (p. ej. el operador de pg_trgm) como marcadores.
+        cursor = fairy.dbapi_connection.cursor()
+        try:
+            cursor.execute(self._prepare_sql)
+        finally:
+            cursor.close()
+        prepared.add(self.name)
+
+    def statement(self) -> TextClause:
+        """EXECUTE name(:bind1, ...) listo para session.execute(stmt, params)."""
+        return self._execute
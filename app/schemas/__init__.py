@@ -2,7 +2,13 @@
 Pydantic schemas para request/response validation
 """
 
-from app.schemas.lead import LeadResponse, LeadSearchResponse
+from app.schemas.lead import (
+    LeadResponse, LeadSearchResponse, LeadBatchRequest, LeadBatchItem, LeadBatchResponse
+)
 from app.schemas.webhook import WebhookPayload
 
-__all__ = ["LeadResponse", "LeadSearchResponse", "WebhookPayload"]
+__all__ = [
+    "LeadResponse", "LeadSearchResponse",
+    "LeadBatchRequest", "LeadBatchItem", "LeadBatchResponse",
+    "WebhookPayload",
+]
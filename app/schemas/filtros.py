@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List
 
 class ArtifactsInfo(BaseModel):
     doc_id: str
@@ -17,3 +17,10 @@ class FiltrosCallbackPayload(BaseModel):
     artifacts: Optional[ArtifactsInfo] = None
     diagnostics: Optional[DiagnosticsInfo] = None
     error: Optional[str] = None
+    # Eco de worker_payload.metadata (trace_id, traceparent, dispatched_at_ms...)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class FiltrosCallbackBatch(BaseModel):
+    """Varios resultados de FILTROS en una sola petición (vaciado de backlog)."""
+    results: List[FiltrosCallbackPayload] = Field(..., min_length=1)
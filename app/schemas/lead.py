@@ -2,8 +2,8 @@
 Schemas Pydantic para respuestas de API
 """
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -43,3 +43,25 @@ class LeadSearchResponse(BaseModel):
 
     total: int
     results: list[LeadResponse]
+
+
+class LeadBatchRequest(BaseModel):
+    """IDs a resolver en una sola consulta (se pueden mezclar ambos tipos)"""
+
+    task_ids: List[str] = Field(default_factory=list)
+    mycase_ids: List[str] = Field(default_factory=list)
+
+
+class LeadBatchItem(BaseModel):
+    """Resultado por ID: found=False marca los IDs inexistentes"""
+
+    found: bool
+    lead: Optional[LeadResponse] = None
+
+
+class LeadBatchResponse(BaseModel):
+    """Resultados indexados por el ID de entrada"""
+
+    task_ids: Dict[str, LeadBatchItem] = Field(default_factory=dict)
+    mycase_ids: Dict[str, LeadBatchItem] = Field(default_factory=dict)
+    not_found: int = 0
@@ -0,0 +1,200 @@
+# app/services/callback_recorder.py
+"""
+Registro de resultados de Filtros en filtros_callbacks.
+
+Cada callback (individual o de un lote) produce una fila con lo que devolvió
+Filtros (outcome, doc_id, versión, processing_time_ms), la latencia
+dispatch -> callback y el estado de la escritura del Link AI; cuando la cola
+de escrituras termina (success / failed) la fila se vuelve a registrar con
+el resultado final.
+
+Las filas no se escriben en la petición: se juntan en memoria (las repetidas
+por callback_id se fusionan) y un flusher las manda cada
+CALLBACK_RESULTS_FLUSH_SECONDS, o al llegar a CALLBACK_RESULTS_BATCH_SIZE, en
+un solo INSERT ... ON CONFLICT (FiltrosCallbackRepository.upsert_many) desde
+un thread, sin bloquear el loop. Si Postgres falla, las filas vuelven al
+buffer (hasta 10 lotes) para el siguiente intento.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.config import settings
+from app.core.metrics import Counter, Gauge
+from app.database import SessionLocal
+from app.repositories.filtros_callback_repository import FiltrosCallbackRepository
+from app.schemas.filtros import FiltrosCallbackPayload
+from app.services.write_back_queue import WriteBackJob
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_RESULTS_WRITTEN = Counter(
+    "filtros_callback_results_total",
+    "Filas de filtros_callbacks por resultado (written, retried, dropped: buffer lleno con Postgres caído)",
+    ("result",),
+)
+CALLBACK_RESULTS_BUFFERED = Gauge(
+    "filtros_callback_results_buffered",
+    "Filas de filtros_callbacks esperando el próximo flush",
+)
+
+# Si Postgres no responde, como mucho se retienen tantos lotes
+MAX_BUFFERED_BATCHES = 10
+
+
+def _clip(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if isinstance(value, str) else value
+
+
+def build_row(payload: FiltrosCallbackPayload, action: str, received_at: Optional[datetime] = None) -> Dict:
+    """Fila de filtros_callbacks para un callback (todas las columnas, siempre las mismas claves)."""
+    received_at = received_at or datetime.now(timezone.utc)
+    metadata = payload.metadata or {}
+    dispatched_ms = metadata.get("dispatched_at_ms")
+    if not isinstance(dispatched_ms, (int, float)) or isinstance(dispatched_ms, bool):
+        dispatched_ms = None
+    received_ms = int(received_at.timestamp() * 1000)
+
+    artifacts = payload.artifacts
+    diagnostics = payload.diagnostics
+    return {
+        "callback_id": (
+            f"{payload.task_id}:{int(dispatched_ms)}" if dispatched_ms is not None
+            else f"{payload.task_id}:r{received_ms}"
+        )[:100],
+        "task_id": _clip(payload.task_id, 50),
+        "trace_id": _clip(metadata.get("trace_id"), 32) if isinstance(metadata.get("trace_id"), str) else None,
+        "dispatched_at": (
+            datetime.fromtimestamp(dispatched_ms / 1000, tz=timezone.utc) if dispatched_ms is not None else None
+        ),
+        "received_at": received_at,
+        "latency_ms": received_ms - int(dispatched_ms) if dispatched_ms is not None else None,
+        "status": _clip(payload.status, 50),
+        "outcome": _clip(payload.outcome, 255),
+        "error": payload.error,
+        "doc_id": _clip(artifacts.doc_id, 255) if artifacts else None,
+        "doc_url": artifacts.doc_url if artifacts else None,
+        "processing_time_ms": diagnostics.processing_time_ms if diagnostics else None,
+        "filtros_version": _clip(diagnostics.version, 50) if diagnostics else None,
+        "write_back_status": action,
+        "write_back_attempts": None,
+        "written_at": None,
+    }
+
+
+class CallbackRecorder:
+    """Buffer + flusher periódico hacia filtros_callbacks."""
+
+    def __init__(self, batch_size: int = 200, flush_seconds: float = 2.0, enabled: bool = True):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self._buffer: Dict[str, Dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """Arranca el flusher en el loop actual (idempotente)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(), name="callback_recorder")
+
+    async def stop(self) -> None:
+        """Detiene el flusher y escribe lo que quede."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def record(self, row: Dict) -> None:
+        """Agrega (o reemplaza, por callback_id) una fila al buffer."""
+        if not self.enabled:
+            return
+        self.start()
+        if row["callback_id"] not in self._buffer and len(self._buffer) >= self.batch_size * MAX_BUFFERED_BATCHES:
+            CALLBACK_RESULTS_WRITTEN.inc(result="dropped")
+            return
+        self._buffer[row["callback_id"]] = row
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def track(self, job: WriteBackJob, row: Dict) -> None:
+        """Registra la fila ahora y otra vez cuando la escritura en ClickUp termine."""
+        def done(finished: WriteBackJob, outcome: str) -> None:
+            self.record({
+                **row,
+                "write_back_status": outcome,
+                "write_back_attempts": finished.attempts,
+                "written_at": datetime.now(timezone.utc) if outcome == "success" else None,
+            })
+
+        job.on_done.append(done)
+        self.record(row)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Escribe el buffer en lotes de batch_size; devuelve las filas escritas."""
+        written = 0
+        while self._buffer:
+            keys = list(self._buffer)[: self.batch_size]
+            rows = [self._buffer.pop(key) for key in keys]
+            try:
+                written += await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                logger.error(f"❌ Error guardando {len(rows)} resultados de Filtros: {e}")
+                self._requeue(rows)
+                break
+        return written
+
+    @staticmethod
+    def _write(rows) -> int:
+        db = SessionLocal()
+        try:
+            written = FiltrosCallbackRepository(db).upsert_many(rows)
+            CALLBACK_RESULTS_WRITTEN.inc(len(rows), result="written")
+            return written
+        finally:
+            db.close()
+
+    def _requeue(self, rows) -> None:
+        room = self.batch_size * MAX_BUFFERED_BATCHES - len(self._buffer)
+        kept = dropped = 0
+        for row in rows:
+            # Si llegó una versión más nueva de la fila mientras tanto, gana esa
+            if row["callback_id"] in self._buffer:
+                continue
+            if kept < room:
+                self._buffer[row["callback_id"]] = row
+                kept += 1
+            else:
+                dropped += 1
+        CALLBACK_RESULTS_WRITTEN.inc(kept, result="retried")
+        CALLBACK_RESULTS_WRITTEN.inc(dropped, result="dropped")
+
+
+# Singleton compartido por los endpoints de callbacks
+callback_recorder = CallbackRecorder(
+    batch_size=settings.callback_results_batch_size,
+    flush_seconds=settings.callback_results_flush_seconds,
+    enabled=settings.callback_results_enabled,
+)
+
+CALLBACK_RESULTS_BUFFERED.set_function(callback_recorder.buffered)
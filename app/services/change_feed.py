@@ -0,0 +1,297 @@
+# app/services/change_feed.py
+"""
+Feed de cambios de leads y Case Assignments (LISTEN/NOTIFY -> SSE).
+
+Los upserts de LeadRepository y AssignmentRepository dejan cada cambio en
+lead_changes y lo avisan con NOTIFY en la misma transacción
+(LeadChangeRepository.record). Por proceso hay un listener:
+
+- una conexión psycopg2 dedicada, fuera del pool, en autocommit y con
+  LISTEN CHANGE_FEED_CHANNEL; el loop la lee con add_reader (sin threads ni
+  polling) y reparte cada aviso a los suscriptores cuyos filtros coinciden;
+- si la conexión se cae, reconecta con backoff y publica desde la tabla lo
+  que se perdió mientras tanto (seq > último visto);
+- cada hora purga lo más viejo que CHANGE_FEED_RETENTION_DAYS.
+
+Cada suscriptor (una conexión SSE de /leads/changes) tiene una cola acotada;
+si se llena no frena al resto: se marca atrasado y se pone al día leyendo
+lead_changes desde su último seq (ver Subscription.lagged).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Optional, Set
+
+import orjson
+from psycopg2 import sql
+
+from app.config import settings
+from app.core.metrics import Counter, Gauge
+from app.database import SessionLocal, engine
+from app.repositories.lead_change_repository import LeadChangeRepository
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_EVENTS = Counter(
+    "lead_change_events_total",
+    "Eventos del feed de cambios por resultado (received, recovered: leídos de la tabla tras reconectar, invalid)",
+    ("result",),
+)
+CHANGE_FEED_DELIVERIES = Counter(
+    "lead_change_deliveries_total",
+    "Entregas a suscriptores por resultado (queued, lagged: cola llena, se pone al día desde la tabla)",
+    ("result",),
+)
+CHANGE_FEED_CONNECTS = Counter(
+    "lead_change_listener_connects_total",
+    "Conexiones LISTEN del feed de cambios por resultado (ok, error, lost)",
+    ("result",),
+)
+CHANGE_FEED_SUBSCRIBERS = Gauge(
+    "lead_change_subscribers",
+    "Suscriptores conectados al feed de cambios (/leads/changes)",
+)
+
+# Backoff de reconexión del listener (segundos)
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 60.0
+PRUNE_EVERY_SECONDS = 3600.0
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Filtros y cola de un suscriptor; los filtros vacíos dejan pasar todo."""
+
+    kinds: FrozenSet[str] = frozenset()
+    lists: FrozenSet[str] = frozenset()
+    statuses: FrozenSet[str] = frozenset()  # en minúsculas
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.change_feed_queue_size))
+    # Cola llena: se descartó lo encolado y el consumidor debe releer la tabla
+    lagged: bool = False
+
+    def matches(self, event: Dict) -> bool:
+        if self.kinds and event.get("kind") not in self.kinds:
+            return False
+        if self.lists and event.get("list_name") not in self.lists:
+            return False
+        if self.statuses and (event.get("status") or "").lower() not in self.statuses:
+            return False
+        return True
+
+    def offer(self, event: Dict) -> None:
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(event)
+            CHANGE_FEED_DELIVERIES.inc(result="queued")
+        except asyncio.QueueFull:
+            CHANGE_FEED_DELIVERIES.inc(result="lagged")
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            # Despierta al consumidor para que relea desde la tabla
+            self.queue.put_nowait(None)
+
+
+class ChangeFeed:
+    """Listener LISTEN/NOTIFY por proceso + reparto a suscriptores."""
+
+    def __init__(self, channel: str = "lead_changes", retention_days: int = 7, enabled: bool = True):
+        self.channel = channel
+        self.retention_days = retention_days
+        self.enabled = enabled
+        self.last_seq = 0
+        self.connected = False
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    # --- Suscriptores ---------------------------------------------------------
+
+    def subscribe(
+        self, kinds: List[str] = (), lists: List[str] = (), statuses: List[str] = ()
+    ) -> Subscription:
+        self.start()
+        subscription = Subscription(
+            kinds=frozenset(kinds), lists=frozenset(lists), statuses=frozenset(s.lower() for s in statuses)
+        )
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: Dict) -> None:
+        """Reparte un evento a los suscriptores cuyos filtros coinciden."""
+        seq = event.get("seq")
+        if isinstance(seq, int) and seq > self.last_seq:
+            self.last_seq = seq
+        for subscription in list(self._subscribers):
+            if subscription.matches(event):
+                subscription.offer(event)
+
+    # --- Listener ---------------------------------------------------------------
+
+    def start(self) -> None:
+        """Arranca el listener en el loop actual (idempotente)."""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run(), name="change_feed")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = RECONNECT_MIN
+        recover = False
+        last_prune = 0.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncio.to_thread(self._connect)
+                CHANGE_FEED_CONNECTS.inc(result="ok")
+                self.connected = True
+                delay = RECONNECT_MIN
+                logger.info(f"📡 Feed de cambios: escuchando '{self.channel}' (desde seq {self.last_seq})")
+
+                lost = self._loop.create_future()
+                self._loop.add_reader(conn.fileno(), self._on_readable, conn, lost)
+                try:
+                    # Lo confirmado mientras no había LISTEN solo está en la tabla
+                    if recover:
+                        await self._recover()
+                    else:
+                        self.last_seq = max(self.last_seq, await asyncio.to_thread(latest_seq) or 0)
+                    recover = True
+                    while True:
+                        done, _ = await asyncio.wait({lost}, timeout=PRUNE_EVERY_SECONDS)
+                        if done:
+                            lost.result()
+                        if self._loop.time() - last_prune >= PRUNE_EVERY_SECONDS:
+                            last_prune = self._loop.time()
+                            await self._prune()
+                finally:
+                    self._loop.remove_reader(conn.fileno())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                CHANGE_FEED_CONNECTS.inc(result="lost" if self.connected else "error")
+                logger.warning(f"⚠️ Feed de cambios: conexión LISTEN perdida ({e}); reintento en {delay:.0f}s")
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    def _connect(self):
+        """Conexión psycopg2 propia (fuera del pool) con los mismos parámetros que el engine."""
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        # Keepalives: una conexión ociosa cortada por la red se detecta sin consultas
+        cparams = {"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, "keepalives_count": 3, **cparams}
+        conn = engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        return conn
+
+    def _on_readable(self, conn, lost: asyncio.Future) -> None:
+        try:
+            conn.poll()
+        except Exception as e:
+            if not lost.done():
+                lost.set_exception(e)
+            return
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                event = orjson.loads(notify.payload)
+            except orjson.JSONDecodeError:
+                CHANGE_FEED_EVENTS.inc(result="invalid")
+                continue
+            CHANGE_FEED_EVENTS.inc(result="received")
+            self.publish(event)
+
+    async def _recover(self) -> None:
+        """Publica desde lead_changes lo confirmado con seq > last_seq."""
+        while True:
+            rows = await asyncio.to_thread(read_changes, self.last_seq, settings.change_feed_page_size)
+            for row in rows:
+                CHANGE_FEED_EVENTS.inc(result="recovered")
+                self.publish(row)
+            if len(rows) < settings.change_feed_page_size:
+                return
+
+    async def _prune(self) -> None:
+        before = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        try:
+            deleted = await asyncio.to_thread(_prune, before)
+            if deleted:
+                logger.info(f"🧹 Feed de cambios: {deleted} cambios anteriores a {before:%Y-%m-%d} purgados")
+        except Exception as e:
+            logger.warning(f"⚠️ Feed de cambios: no se pudo purgar lead_changes: {e}")
+
+
+def event_dict(row: Dict) -> Dict:
+    """Fila de lead_changes -> evento (mismo formato que el JSON del NOTIFY)."""
+    date_updated = row.get("date_updated")
+    return {**row, "date_updated": date_updated.isoformat() if isinstance(date_updated, datetime) else date_updated}
+
+
+def read_changes(cursor: int, limit: int, grace_seconds: float = 0.0, **filters) -> List[Dict]:
+    """Cambios con seq > cursor (síncrono: llamar con asyncio.to_thread)."""
+    db = SessionLocal()
+    try:
+        rows = LeadChangeRepository(db).since(cursor, limit, grace_seconds=grace_seconds, **filters)
+        return [event_dict(row) for row in rows]
+    finally:
+        db.close()
+
+
+def oldest_seq() -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return LeadChangeRepository(db).oldest_seq()
+    finally:
+        db.close()
+
+
+def latest_seq() -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return LeadChangeRepository(db).latest_seq()
+    finally:
+        db.close()
+
+
+def _prune(before: datetime) -> int:
+    db = SessionLocal()
+    try:
+        return LeadChangeRepository(db).prune(before)
+    finally:
+        db.close()
+
+
+# Singleton compartido por el lifespan y /leads/changes
+change_feed = ChangeFeed(
+    channel=settings.change_feed_channel,
+    retention_days=settings.change_feed_retention_days,
+    enabled=settings.change_feed_enabled,
+)
+
+CHANGE_FEED_SUBSCRIBERS.set_function(change_feed.subscribers)
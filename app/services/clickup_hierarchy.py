@@ -0,0 +1,198 @@
+# app/services/clickup_hierarchy.py
+"""
+Árbol espacio -> carpeta -> lista del workspace de ClickUp, en memoria.
+
+GET /task muchas veces trae solo el id de carpeta y espacio (sin nombre), así
+que space_name / folder_name quedaban en null. El resolver carga el árbol una
+vez (GET /team/{id}/space y, por espacio, /folder y /list) y después lo
+refresca de a poco:
+
+- la lista de espacios, cada CLICKUP_HIERARCHY_REFRESH_SECONDS (una llamada;
+  los espacios nuevos se cargan enteros);
+- cada espacio, cuando llega una tarea suya y su copia es más vieja que eso;
+- una lista desconocida (creada después de la carga) con GET /list/{id}.
+
+Las transformaciones resuelven los nombres con names(), síncrono y sin
+llamadas a la API; los webhooks llaman a ensure() antes. Si ClickUp falla se
+siguen usando los nombres anteriores o, sin ellos, los del payload.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.core.clickup_task import ClickUpTask
+from app.core.metrics import Counter
+from app.services.clickup_service import ClickUpService
+
+HIERARCHY_FETCHES = Counter(
+    "clickup_hierarchy_fetches_total",
+    "Descargas del árbol de ClickUp por alcance (team, space, list) y resultado (ok, error)",
+    ("scope", "result"),
+)
+
+# Tras un error de ClickUp no se vuelve a intentar antes de esto (segundos)
+RETRY_AFTER_ERROR = 60.0
+
+
+class ClickUpHierarchy:
+    """Nombres de espacios, carpetas y listas por id, por proceso."""
+
+    def __init__(self, refresh_seconds: float = 3600.0, enabled: bool = True):
+        self.refresh_seconds = refresh_seconds
+        self.enabled = enabled
+        self._spaces: Dict[str, str] = {}  # space_id -> nombre
+        self._folders: Dict[str, Tuple[str, str]] = {}  # folder_id -> (nombre, space_id)
+        self._lists: Dict[str, Tuple[str, Optional[str], str]] = {}  # list_id -> (nombre, folder_id, space_id)
+        self._loaded_at: Dict[str, float] = {}  # "team" / space_id -> momento de la última carga
+        self._failed_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    # --- Resolución (síncrona) -----------------------------------------------
+
+    def names(self, task: ClickUpTask) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """(list_name, folder_name, space_name) de la tarea; lo que no esté en el árbol sale del payload."""
+        if not self.enabled:
+            return task.list_name, task.folder_name, task.space_name
+
+        entry = self._lists.get(task.list_id)
+        if entry is not None:
+            list_name, folder_id, space_id = entry
+            folder = self._folders.get(folder_id) if folder_id else None
+            # Lista sin carpeta: ClickUp la pone en una carpeta oculta, sin nombre real
+            folder_name = folder[0] if folder else None
+        else:
+            list_name, space_id = task.list_name, task.space_id
+            folder = self._folders.get(task.folder_id)
+            folder_name = folder[0] if folder else task.folder_name
+        return list_name, folder_name, self._spaces.get(space_id, task.space_name)
+
+    # --- Carga / refresco ------------------------------------------------------
+
+    def _due(self, key: str, now: float) -> bool:
+        loaded_at = self._loaded_at.get(key)
+        if loaded_at is not None and now - loaded_at < self.refresh_seconds:
+            return False
+        failed_at = self._failed_at.get(key)
+        return failed_at is None or now - failed_at >= RETRY_AFTER_ERROR
+
+    def _failed(self, scope: str, key: str) -> None:
+        HIERARCHY_FETCHES.inc(scope=scope, result="error")
+        self._failed_at[key] = time.monotonic()
+
+    async def ensure(self, task: ClickUpTask, clickup_service: Optional[ClickUpService] = None) -> None:
+        """
+        Deja el árbol listo para resolver la tarea: carga inicial, espacio
+        vencido o lista nueva. Casi siempre no hace nada (sin I/O).
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        space_id = self._lists.get(task.list_id, (None, None, task.space_id))[2]
+        if not (
+            self._due("team", now)
+            or (space_id and self._due(space_id, now))
+            or (task.list_id and task.list_id not in self._lists and self._due(task.list_id, now))
+        ):
+            return
+
+        service = clickup_service or ClickUpService()
+        async with self._lock:
+            now = time.monotonic()
+            if self._due("team", now):
+                await self._load_team(service)
+            space_id = self._lists.get(task.list_id, (None, None, task.space_id))[2]
+            if space_id and self._due(space_id, now):
+                await self._load_space(service, space_id)
+            if task.list_id and task.list_id not in self._lists and self._due(task.list_id, now):
+                await self._load_list(service, task.list_id)
+
+    async def ensure_all(self, tasks: Iterable[ClickUpTask], clickup_service: Optional[ClickUpService] = None) -> None:
+        """ensure() para un lote (sincronizaciones): una vez por lista distinta."""
+        seen = set()
+        for task in tasks:
+            if task.list_id not in seen:
+                seen.add(task.list_id)
+                await self.ensure(task, clickup_service)
+
+    async def _load_team(self, service: ClickUpService) -> None:
+        team_id = await service.get_team_id()
+        spaces = await service.get_spaces(team_id) if team_id else None
+        if spaces is None:
+            self._failed("team", "team")
+            return
+        HIERARCHY_FETCHES.inc(scope="team", result="ok")
+        now = time.monotonic()
+        for space in spaces:
+            self._spaces[str(space["id"])] = space.get("name")
+        self._loaded_at["team"] = now
+        self._failed_at.pop("team", None)
+
+        # Espacios nuevos (o vencidos): en paralelo, el limitador de ClickUp acota
+        pending = [sid for sid in (str(s["id"]) for s in spaces) if self._due(sid, now)]
+        await asyncio.gather(*(self._load_space(service, sid) for sid in pending))
+
+    async def _load_space(self, service: ClickUpService, space_id: str) -> None:
+        folders, folderless = await asyncio.gather(
+            service.get_folders(space_id), service.get_folderless_lists(space_id)
+        )
+        if folders is None or folderless is None:
+            self._failed("space", space_id)
+            return
+        HIERARCHY_FETCHES.inc(scope="space", result="ok")
+
+        # Se reemplaza el espacio entero: carpetas y listas borradas desaparecen
+        for folder_id in [f for f, (_, sid) in self._folders.items() if sid == space_id]:
+            del self._folders[folder_id]
+        for list_id in [l for l, (_, _, sid) in self._lists.items() if sid == space_id]:
+            del self._lists[list_id]
+        for folder in folders:
+            folder_id = str(folder["id"])
+            self._folders[folder_id] = (folder.get("name"), space_id)
+            for lst in folder.get("lists") or ():
+                self._lists[str(lst["id"])] = (lst.get("name"), folder_id, space_id)
+        for lst in folderless:
+            self._lists[str(lst["id"])] = (lst.get("name"), None, space_id)
+
+        self._loaded_at[space_id] = time.monotonic()
+        self._failed_at.pop(space_id, None)
+
+    async def _load_list(self, service: ClickUpService, list_id: str) -> None:
+        data = await service.get_list(list_id)
+        if data is None:
+            self._failed("list", list_id)
+            return
+        HIERARCHY_FETCHES.inc(scope="list", result="ok")
+        space = data.get("space") or {}
+        folder = data.get("folder") or {}
+        space_id = str(space["id"]) if space.get("id") else None
+        folder_id = str(folder["id"]) if folder.get("id") and not folder.get("hidden") else None
+        if space_id and space.get("name"):
+            self._spaces.setdefault(space_id, space["name"])
+        if folder_id and space_id:
+            self._folders[folder_id] = (folder.get("name"), space_id)
+        self._lists[list_id] = (data.get("name"), folder_id, space_id)
+        self._failed_at.pop(list_id, None)
+
+    def load(self, spaces: List[Dict], folders: Dict[str, List[Dict]], lists: Dict[str, List[Dict]]) -> None:
+        """Carga un árbol ya obtenido (scripts, pruebas): {space_id: carpetas}, {space_id: listas sueltas}."""
+        now = time.monotonic()
+        for space in spaces:
+            space_id = str(space["id"])
+            self._spaces[space_id] = space.get("name")
+            for folder in folders.get(space_id, ()):
+                self._folders[str(folder["id"])] = (folder.get("name"), space_id)
+                for lst in folder.get("lists") or ():
+                    self._lists[str(lst["id"])] = (lst.get("name"), str(folder["id"]), space_id)
+            for lst in lists.get(space_id, ()):
+                self._lists[str(lst["id"])] = (lst.get("name"), None, space_id)
+            self._loaded_at[space_id] = now
+        self._loaded_at["team"] = now
+
+
+# Singleton compartido por los webhooks y las transformaciones
+clickup_hierarchy = ClickUpHierarchy(
+    refresh_seconds=settings.clickup_hierarchy_refresh_seconds,
+    enabled=settings.clickup_hierarchy_enabled,
+)
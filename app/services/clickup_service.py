@@ -3,47 +3,154 @@
 Servicio para interactuar con la API de ClickUp.
 Obtiene tareas, comentarios, etc.
 """
-import hmac
-import hashlib
+import time
 import httpx
-from typing import Optional, Dict, List
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, Union
 from datetime import datetime
 from app.config import settings
+from app.core.clickup_task import ClickUpTask
+from app.core.instrumentation import dependency
+from app.core.rate_limit import clickup_limiter
+from app.core.task_cache import task_cache
+from app.core.webhook_ingress import verify_signature
+
+# ClickUp devuelve los comentarios de 25 en 25 (más recientes primero)
+COMMENTS_PAGE_SIZE = 25
 
 
 class ClickUpService:
     """Cliente para la API de ClickUp"""
 
-    BASE_URL = "https://api.clickup.com/api/v2"
-
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            client: AsyncClient compartido (p. ej. en lotes, para reutilizar
+                conexiones). Sin él, cada llamada abre el suyo.
+        """
+        # Configurable para apuntar a un ClickUp falso en pruebas de carga
+        self.base_url = settings.clickup_api_base_url.rstrip("/")
         self.api_token = settings.clickup_api_token
         self.headers = {
             "Authorization": self.api_token,
             "Content-Type": "application/json"
         }
+        self.client = client
+
+    @asynccontextmanager
+    async def _client(self):
+        if self.client is not None:
+            yield self.client
+        else:
+            async with httpx.AsyncClient() as client:
+                yield client
 
-    async def get_task(self, task_id: str) -> Optional[Dict]:
+    async def _request(
+        self, client: httpx.AsyncClient, method: str, url: str, operation: str, **kwargs
+    ) -> httpx.Response:
         """
-        Obtiene una tarea de ClickUp por ID.
+        Petición a ClickUp bajo el limitador compartido (app.core.rate_limit).
+        Ante un 429 pausa a todos hasta el reset de ClickUp y reintenta una vez.
+        """
+        for attempt in range(2):
+            async with clickup_limiter:
+                with dependency("clickup", operation):
+                    response = await client.request(method, url, headers=self.headers, **kwargs)
+                    if response.status_code != 429 or attempt:
+                        response.raise_for_status()
+                        return response
+            clickup_limiter.pause_until(time.monotonic() + _retry_after(response))
+
+    async def get_task(self, task_id: str, keep_raw: bool = False, use_cache: bool = True) -> Optional[ClickUpTask]:
+        """
+        Obtiene una tarea de ClickUp por ID (read-through de app.core.task_cache).
 
         Args:
             task_id: ID de la tarea
+            keep_raw: Conservar el JSON (podado) en task.raw_data
+            use_cache: False para ir siempre a ClickUp (la respuesta igual se cachea)
 
         Returns:
-            Diccionario con los datos de la tarea o None si error
+            ClickUpTask con los campos que usa la app, o None si error
         """
-        url = f"{self.BASE_URL}/task/{task_id}"
+        if not use_cache:
+            task = await self._fetch_task(task_id, keep_raw)
+            if task is not None:
+                task_cache.put(task_id, task)
+            return task
+        return await task_cache.get_or_fetch(task_id, lambda: self._fetch_task(task_id, keep_raw), keep_raw)
+
+    async def _fetch_task(self, task_id: str, keep_raw: bool = False) -> Optional[ClickUpTask]:
+        url = f"{self.base_url}/task/{task_id}"
 
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=self.headers, timeout=10.0)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
+                response = await self._request(client, "GET", url, "get_task", timeout=10.0)
+                return ClickUpTask.from_json(response.content, keep_raw=keep_raw)
+            except (httpx.HTTPError, ValueError) as e:
                 print(f"Error obteniendo tarea {task_id}: {e}")
                 return None
 
+    async def get_list_fields(self, list_id: str) -> Optional[List[Dict]]:
+        """
+        Definiciones de custom fields de una lista (GET /list/{id}/field),
+        con type_config (opciones de drop_down / labels).
+
+        Returns:
+            Lista de campos o None si error
+        """
+        url = f"{self.base_url}/list/{list_id}/field"
+
+        async with self._client() as client:
+            try:
+                response = await self._request(client, "GET", url, "get_list_fields", timeout=10.0)
+                return response.json().get("fields", [])
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Error obteniendo campos de la lista {list_id}: {e}")
+                return None
+
+    async def get_team_id(self) -> Optional[str]:
+        """CLICKUP_TEAM_ID, o el primer workspace del token (GET /team)."""
+        if settings.clickup_team_id:
+            return settings.clickup_team_id
+        teams = await self._get_collection("/team", "get_teams", "teams")
+        return str(teams[0]["id"]) if teams else None
+
+    async def get_spaces(self, team_id: str) -> Optional[List[Dict]]:
+        """Espacios del workspace (GET /team/{id}/space). None si error."""
+        return await self._get_collection(f"/team/{team_id}/space", "get_spaces", "spaces")
+
+    async def get_folders(self, space_id: str) -> Optional[List[Dict]]:
+        """Carpetas de un espacio, cada una con sus listas (GET /space/{id}/folder). None si error."""
+        return await self._get_collection(f"/space/{space_id}/folder", "get_folders", "folders")
+
+    async def get_folderless_lists(self, space_id: str) -> Optional[List[Dict]]:
+        """Listas sueltas de un espacio (GET /space/{id}/list). None si error."""
+        return await self._get_collection(f"/space/{space_id}/list", "get_folderless_lists", "lists")
+
+    async def get_list(self, list_id: str) -> Optional[Dict]:
+        """Una lista con su carpeta y espacio (GET /list/{id}). None si error."""
+        url = f"{self.base_url}/list/{list_id}"
+
+        async with self._client() as client:
+            try:
+                response = await self._request(client, "GET", url, "get_list", timeout=10.0)
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Error obteniendo la lista {list_id}: {e}")
+                return None
+
+    async def _get_collection(self, path: str, operation: str, key: str) -> Optional[List[Dict]]:
+        url = f"{self.base_url}{path}"
+
+        async with self._client() as client:
+            try:
+                response = await self._request(client, "GET", url, operation, timeout=10.0)
+                return response.json().get(key, [])
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Error en {operation} ({path}): {e}")
+                return None
+
     async def get_tasks_updated_since(
         self, list_id: str, date_updated_gt: datetime, limit: int = 100
     ) -> List[Dict]:
@@ -58,7 +165,7 @@ class ClickUpService:
         Returns:
             Lista de tareas
         """
-        url = f"{self.BASE_URL}/list/{list_id}/task"
+        url = f"{self.base_url}/list/{list_id}/task"
 
         # Convertir datetime a Unix timestamp en milisegundos
         timestamp_ms = int(date_updated_gt.timestamp() * 1000)
@@ -69,12 +176,11 @@ class ClickUpService:
             "page": 0
         }
 
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
-                response = await client.get(
-                    url, headers=self.headers, params=params, timeout=30.0
+                response = await self._request(
+                    client, "GET", url, "get_tasks_updated_since", params=params, timeout=30.0
                 )
-                response.raise_for_status()
                 data = response.json()
                 tasks = data.get("tasks", [])
                 return tasks[:limit]
@@ -84,7 +190,7 @@ class ClickUpService:
 
     async def get_task_comments(self, task_id: str) -> List[Dict]:
         """
-        Obtiene comentarios de una tarea.
+        Obtiene comentarios de una tarea (solo la página más reciente).
 
         Args:
             task_id: ID de la tarea
@@ -92,39 +198,52 @@ class ClickUpService:
         Returns:
             Lista de comentarios
         """
-        url = f"{self.BASE_URL}/task/{task_id}/comment"
+        comments = await self._fetch_comments_page(task_id)
+        return comments if comments is not None else []
+
+    async def get_all_task_comments(self, task_id: str) -> Optional[List[Dict]]:
+        """
+        Obtiene todos los comentarios de una tarea, paginando hacia atrás
+        (start/start_id = fecha e id del más antiguo de la página anterior).
 
-        async with httpx.AsyncClient() as client:
+        Returns:
+            Lista de comentarios (más recientes primero) o None si error,
+            para no confundir un fallo con "sin comentarios".
+        """
+        comments: List[Dict] = []
+        params: Optional[Dict] = None
+        while True:
+            page = await self._fetch_comments_page(task_id, params)
+            if page is None:
+                return None
+            comments.extend(page)
+            if len(page) < COMMENTS_PAGE_SIZE:
+                return comments
+            oldest = page[-1]
+            params = {"start": oldest.get("date"), "start_id": oldest.get("id")}
+
+    async def _fetch_comments_page(self, task_id: str, params: Optional[Dict] = None) -> Optional[List[Dict]]:
+        url = f"{self.base_url}/task/{task_id}/comment"
+
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=self.headers, timeout=10.0)
-                response.raise_for_status()
+                response = await self._request(
+                    client, "GET", url, "get_task_comments", params=params, timeout=10.0
+                )
                 data = response.json()
                 return data.get("comments", [])
             except httpx.HTTPError as e:
                 print(f"Error obteniendo comentarios de {task_id}: {e}")
-                return []
+                return None
 
-    def verify_webhook_signature(self, payload: str, signature: str, secret: Optional[str] = None) -> bool:
+    def verify_webhook_signature(self, payload: Union[bytes, str], signature: str, secret: Optional[str] = None) -> bool:
         """
         Verifica la firma HMAC-SHA256 permitiendo elegir el secreto.
+        Acepta el body en bytes tal cual llegó (sin decodificar).
         """
         # Si no se provee un secreto específico, usamos el de leads por defecto
-        webhook_secret = secret or settings.clickup_webhook_secret
-        
-        if not signature or not webhook_secret:
-            return False
-
-        try:
-            secret_bytes = webhook_secret.encode('utf-8')
-            payload_bytes = payload.encode('utf-8')
-            
-            expected_hash = hmac.new(secret_bytes, payload_bytes, hashlib.sha256).hexdigest()
-            return hmac.compare_digest(signature, expected_hash)
-            
-        except Exception as e:
-            print(f"❌ Error validando firma: {e}")
-            return False
-        
+        return verify_signature(payload, signature, secret or settings.clickup_webhook_secret)
+
     async def set_custom_field_value(self, task_id: str, field_id: str, value: str) -> bool:
             """
             Establece el valor de un campo personalizado en una tarea.
@@ -137,25 +256,34 @@ class ClickUpService:
             Returns:
                 True si fue exitoso, False si falló
             """
-            # Endpoint oficial de ClickUp para setear campos
-            url = f"{self.BASE_URL}/task/{task_id}/field/{field_id}"
-            
-            payload = {
-                "value": value
-            }
+            try:
+                await self.write_custom_field(task_id, field_id, value)
+                return True
+            except httpx.HTTPError as e:
+                print(f"❌ Error actualizando campo {field_id} en tarea {task_id}: {e}")
+                # Si quieres ver el detalle del error de ClickUp:
+                # print(e.response.text if hasattr(e, 'response') else str(e))
+                return False
 
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.post(
-                        url, 
-                        headers=self.headers, 
-                        json=payload, 
-                        timeout=10.0
-                    )
-                    response.raise_for_status()
-                    return True
-                except httpx.HTTPError as e:
-                    print(f"❌ Error actualizando campo {field_id} en tarea {task_id}: {e}")
-                    # Si quieres ver el detalle del error de ClickUp:
-                    # print(e.response.text if hasattr(e, 'response') else str(e))
-                    return False
\ No newline at end of file
+    async def write_custom_field(self, task_id: str, field_id: str, value: str) -> None:
+        """
+        Como set_custom_field_value, pero propaga el error de httpx para que
+        quien llama decida si reintentar (app.services.write_back_queue).
+        """
+        # Endpoint oficial de ClickUp para setear campos
+        url = f"{self.base_url}/task/{task_id}/field/{field_id}"
+
+        async with self._client() as client:
+            await self._request(
+                client, "POST", url, "set_custom_field_value", json={"value": value}, timeout=10.0
+            )
+        task_cache.invalidate(task_id)
+
+
+def _retry_after(response: httpx.Response, default: float = 10.0) -> float:
+    """Segundos hasta el reset del límite (X-RateLimit-Reset, epoch en segundos)."""
+    reset = response.headers.get("X-RateLimit-Reset")
+    try:
+        return min(max(float(reset) - time.time(), 0.0), 60.0)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,118 @@
+# app/services/comment_sync_service.py
+"""
+Sincronización de comentarios de ClickUp -> latest_comment / comment_count.
+
+El endpoint de tarea no trae comentarios, así que se piden aparte, solo cuando
+llega un webhook de comentario (taskCommentPosted / taskCommentUpdated) o en
+el backfill (scripts/sync_comments.py). Nada de sondeo periódico.
+
+Un lote de tareas se pide en paralelo; el limitador compartido de ClickUp
+(app.core.rate_limit) acota tasa y concurrencia. Las escrituras saltan las
+filas sin cambios y corren en un hilo con su propia sesión de DB: el loop
+(limitador, cola de write-back) no se bloquea mientras se escribe.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import httpx
+
+from app.core import tracing
+from app.core.instrumentation import stage, track_background
+from app.database import SessionLocal
+from app.repositories.assignment_repository import AssignmentRepository
+from app.repositories.lead_repository import LeadRepository
+from app.services.clickup_service import ClickUpService
+
+logger = logging.getLogger(__name__)
+
+COMMENT_EVENTS = ("taskCommentPosted", "taskCommentUpdated")
+TARGETS = ("leads", "assignments")
+
+
+@dataclass(frozen=True)
+class CommentSummary:
+    task_id: str
+    latest_comment: Optional[str]
+    comment_count: int
+
+
+def summarize(task_id: str, comments: List[Dict]) -> CommentSummary:
+    """Último comentario (por fecha) y total de comentarios de una tarea."""
+    latest = max(comments, key=lambda c: int(c.get("date") or 0), default=None)
+    text = (latest.get("comment_text") or "").strip() if latest else ""
+    return CommentSummary(task_id=task_id, latest_comment=text or None, comment_count=len(comments))
+
+
+class CommentSyncService:
+    """Pide los comentarios de un lote de tareas y actualiza leads_cache / case_assignments."""
+
+    def __init__(self, clickup_service: ClickUpService):
+        self.clickup_service = clickup_service
+
+    async def fetch(self, task_ids: Sequence[str]) -> Dict[str, Optional[CommentSummary]]:
+        """
+        Comentarios de todas las tareas en paralelo (el limitador decide cuántas
+        a la vez). None para las tareas cuya consulta falló.
+        """
+        async def one(task_id: str) -> Optional[CommentSummary]:
+            comments = await self.clickup_service.get_all_task_comments(task_id)
+            return summarize(task_id, comments) if comments is not None else None
+
+        summaries = await asyncio.gather(*(one(task_id) for task_id in task_ids))
+        return dict(zip(task_ids, summaries))
+
+    @staticmethod
+    def store(db, summaries: Iterable[CommentSummary], targets: Sequence[str] = TARGETS) -> Dict[str, int]:
+        """Escribe los resúmenes; devuelve cuántas filas cambiaron por tabla."""
+        written = {target: 0 for target in targets}
+        leads = LeadRepository(db) if "leads" in targets else None
+        assignments = AssignmentRepository(db) if "assignments" in targets else None
+        for summary in summaries:
+            if leads and leads.update_comments(summary.task_id, summary.latest_comment, summary.comment_count):
+                written["leads"] += 1
+            if assignments and assignments.update_latest_comment(summary.task_id, summary.latest_comment):
+                written["assignments"] += 1
+        return written
+
+    @classmethod
+    def _store_with_session(cls, summaries: List[CommentSummary], targets: Sequence[str]) -> Dict[str, int]:
+        """store() con una sesión propia (corre en un hilo de asyncio.to_thread)."""
+        db = SessionLocal()
+        try:
+            return cls.store(db, summaries, targets)
+        finally:
+            db.close()
+
+    async def sync(self, task_ids: Sequence[str], targets: Sequence[str] = TARGETS) -> Dict[str, int]:
+        """fetch + store de un lote. Las tareas con error se cuentan en 'failed'."""
+        with stage("comments", "fetch"):
+            summaries = await self.fetch(task_ids)
+        ok = [summary for summary in summaries.values() if summary is not None]
+        with stage("comments", "store"):
+            written = await asyncio.to_thread(self._store_with_session, ok, targets)
+        written["failed"] = len(task_ids) - len(ok)
+        return written
+
+
+@track_background("comment_sync")
+async def sync_comments_background(
+    task_ids: List[str],
+    targets: Sequence[str] = TARGETS,
+    trace_parent: Optional[tracing.SpanContext] = None,
+) -> None:
+    """BackgroundTask de los webhooks de comentarios (sesión de DB propia)."""
+    with tracing.start_span(
+        "background.comment_sync", parent=trace_parent, attributes={"clickup.task_ids": ",".join(task_ids)}
+    ) as span:
+        try:
+            async with httpx.AsyncClient() as client:
+                result = await CommentSyncService(ClickUpService(client)).sync(task_ids, targets)
+            logger.info(f"💬 Comentarios sincronizados {task_ids}: {result}")
+            if result["failed"]:
+                span.status = "error"
+        except Exception as e:
+            span.record_error(e)
+            logger.error(f"❌ [Background] Error sincronizando comentarios de {task_ids}: {e}")
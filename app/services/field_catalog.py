@@ -0,0 +1,179 @@
+# app/services/field_catalog.py
+"""
+Catálogo de definiciones de custom fields por lista de ClickUp.
+
+En GET /task el valor de un drop_down es el orderindex de la opción (en los
+webhooks, su UUID) y el de un labels es una lista de UUIDs; sin decodificar,
+columnas como abogado_asignado, proyecto o case_review_status guardan códigos.
+
+El catálogo pide GET /list/{id}/field una vez por lista, lo refresca cada
+FIELD_CATALOG_REFRESH_SECONDS y compila por campo una tabla
+opción (orderindex / UUID) -> etiqueta. Las transformaciones (LeadService,
+AssignmentService) decodifican con una consulta a dict por campo, sin
+llamadas extra a la API: el webhook asegura el catálogo de la lista de la
+tarea (ensure) antes de transformar, y decode() es síncrono.
+
+Si una opción no está en el catálogo (se agregó después del último refresco)
+el valor queda como venía y la lista se marca para refrescar en el próximo
+ensure().
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.core.metrics import Counter
+from app.services.clickup_service import ClickUpService
+
+FIELD_CATALOG_FETCHES = Counter(
+    "clickup_field_catalog_fetches_total",
+    "Descargas de definiciones de custom fields por resultado (ok, error)",
+    ("result",),
+)
+FIELD_CATALOG_MISSES = Counter(
+    "clickup_field_catalog_decode_misses_total",
+    "Valores de drop_down / labels sin opción en el catálogo (se guardan sin decodificar)",
+)
+
+# Tras un error de ClickUp no se vuelve a intentar antes de esto (segundos)
+RETRY_AFTER_ERROR = 60.0
+
+
+def _compile_options(field: Dict) -> Optional[Dict[Any, str]]:
+    """Tabla opción -> etiqueta de un drop_down o labels; None para otros tipos."""
+    field_type = field.get("type")
+    options = (field.get("type_config") or {}).get("options") or ()
+    if field_type == "drop_down":
+        table: Dict[Any, str] = {}
+        for option in options:
+            name = option.get("name")
+            if option.get("id") is not None:
+                table[option["id"]] = name
+            orderindex = option.get("orderindex")
+            if orderindex is not None:
+                # GET /task manda el orderindex como int; algunos payloads, como string
+                table[orderindex] = name
+                table[str(orderindex)] = name
+        return table
+    if field_type == "labels":
+        return {option.get("id"): option.get("label") or option.get("name") for option in options}
+    return None
+
+
+class ListFields:
+    """Definiciones compiladas de una lista: field_id -> (tipo, tabla de opciones)."""
+
+    __slots__ = ("list_id", "decoders", "fetched_at", "stale")
+
+    def __init__(self, list_id: str, fields: List[Dict], fetched_at: Optional[float] = None):
+        self.list_id = list_id
+        self.decoders: Dict[str, tuple] = {}
+        for field in fields:
+            table = _compile_options(field)
+            if table is not None and field.get("id"):
+                self.decoders[field["id"]] = (field.get("type"), table)
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        self.stale = False
+
+    def decode(self, custom_fields: Optional[List[Dict]]) -> Optional[List[Dict]]:
+        """
+        custom_fields con los drop_down / labels decodificados a su etiqueta
+        (labels: etiquetas unidas con ", ", como los asignados). Los campos de
+        la tarea no se modifican (pueden estar en la caché de tareas): los
+        decodificados se copian.
+        """
+        if not custom_fields or not self.decoders:
+            return custom_fields
+
+        decoders_get = self.decoders.get
+        out = []
+        for field in custom_fields:
+            decoder = decoders_get(field.get("id"))
+            value = field.get("value")
+            if decoder is None or value is None:
+                out.append(field)
+                continue
+
+            field_type, table = decoder
+            if field_type == "labels":
+                labels = [table.get(v) for v in value] if isinstance(value, list) else [table.get(value)]
+                decoded = ", ".join(labels) if None not in labels else None
+            else:
+                decoded = table.get(value)
+
+            if decoded is None:
+                FIELD_CATALOG_MISSES.inc()
+                self.stale = True
+                out.append(field)
+            else:
+                out.append({**field, "value": decoded})
+        return out
+
+
+class FieldCatalog:
+    """Catálogo en memoria (por proceso) de las listas vistas por la app."""
+
+    def __init__(self, refresh_seconds: float = 3600.0, enabled: bool = True):
+        self.refresh_seconds = refresh_seconds
+        self.enabled = enabled
+        self._lists: Dict[str, ListFields] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, list_id: Optional[str]) -> Optional[ListFields]:
+        """Definiciones ya cargadas (sin llamar a ClickUp)."""
+        if not self.enabled or not list_id:
+            return None
+        return self._lists.get(list_id)
+
+    def _fresh(self, list_id: str, now: float) -> bool:
+        fields = self._lists.get(list_id)
+        if fields is not None and not fields.stale and now - fields.fetched_at < self.refresh_seconds:
+            return True
+        failed_at = self._failed_at.get(list_id)
+        return failed_at is not None and now - failed_at < RETRY_AFTER_ERROR
+
+    async def ensure(
+        self, list_id: Optional[str], clickup_service: Optional[ClickUpService] = None
+    ) -> Optional[ListFields]:
+        """
+        Carga o refresca las definiciones de la lista si hace falta (una sola
+        descarga aunque haya webhooks concurrentes de la misma lista). Si
+        ClickUp falla se siguen usando las anteriores, si las hay.
+        """
+        if not self.enabled or not list_id:
+            return None
+        if self._fresh(list_id, time.monotonic()):
+            return self._lists.get(list_id)
+
+        lock = self._locks.setdefault(list_id, asyncio.Lock())
+        async with lock:
+            if self._fresh(list_id, time.monotonic()):
+                return self._lists.get(list_id)
+            fields = await (clickup_service or ClickUpService()).get_list_fields(list_id)
+            if fields is None:
+                FIELD_CATALOG_FETCHES.inc(result="error")
+                self._failed_at[list_id] = time.monotonic()
+                return self._lists.get(list_id)
+            FIELD_CATALOG_FETCHES.inc(result="ok")
+            self._failed_at.pop(list_id, None)
+            self._lists[list_id] = ListFields(list_id, fields)
+            return self._lists[list_id]
+
+    def load(self, list_id: str, fields: List[Dict]) -> ListFields:
+        """Carga definiciones ya obtenidas (scripts, pruebas)."""
+        self._lists[list_id] = ListFields(list_id, fields)
+        return self._lists[list_id]
+
+    def decode(self, list_id: Optional[str], custom_fields: Optional[List[Dict]]) -> Optional[List[Dict]]:
+        """Decodifica con el catálogo de la lista; sin catálogo, devuelve los campos tal cual."""
+        fields = self.get(list_id)
+        return fields.decode(custom_fields) if fields is not None else custom_fields
+
+
+# Singleton compartido por los webhooks y las transformaciones
+field_catalog = FieldCatalog(
+    refresh_seconds=settings.field_catalog_refresh_seconds,
+    enabled=settings.field_catalog_enabled,
+)
@@ -4,13 +4,17 @@ Servicio de lógica de negocio para Leads.
 Orquesta parsing, normalización y almacenamiento.
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from datetime import datetime
-from dateutil import parser as date_parser
 
 from app.core.parser import parse_task_content
 from app.core.normalizer import normalize_task_name
-from app.core.text_utils import remove_ordinal_suffix
+from app.core.clickup_task import ClickUpTask
+from app.core.dates import parse_date
+from app.core.field_schema import get_schema
+from app.core.instrumentation import stage
+from app.services.clickup_hierarchy import clickup_hierarchy
+from app.services.field_catalog import field_catalog
 
 
 class LeadService:
@@ -20,18 +24,27 @@ class LeadService:
     """
 
     @staticmethod
-    def transform_clickup_task(task_data: Dict) -> Dict:
+    def transform_clickup_task(
+        task_data: Union[ClickUpTask, Dict], custom_field_values: Optional[Dict] = None
+    ) -> Dict:
         """
         Transforma un objeto de tarea de ClickUp en un diccionario
         listo para insertar en leads_cache.
+
+        Args:
+            task_data: Tarea de ClickUp (ClickUpTask, o el dict de la API)
+            custom_field_values: Perfil "leads" ya extraído (el webhook lo
+                resuelve junto con el trigger); si no, se extrae aquí, con los
+                drop_down / labels decodificados por el catálogo de la lista
         """
+        task = ClickUpTask.coerce(task_data)
         result = {}
 
         # ====================================================================
         # IDENTIFICADORES
         # ====================================================================
-        result["task_id"] = task_data.get("id")
-        result["task_name"] = task_data.get("name", "")
+        result["task_id"] = task.id
+        result["task_name"] = task.name or ""
 
         # Normalizar task_name -> nombre_clickup, id_mycase, nombre_normalizado
         nombre_clickup, id_mycase_from_name, nombre_normalizado = normalize_task_name(
@@ -43,45 +56,42 @@ class LeadService:
         # ====================================================================
         # METADATOS CLICKUP
         # ====================================================================
-        result["status"] = task_data.get("status", {}).get("status")
-        result["priority"] = task_data.get("priority", {}).get("priority") if task_data.get("priority") else None
-
-        creator = task_data.get("creator", {})
-        result["created_by"] = creator.get("username") if creator else None
-
-        assignees = task_data.get("assignees", [])
-        if assignees:
-            assignee_names = [a.get("username", "") for a in assignees]
-            result["assignee"] = ", ".join(assignee_names)
-        else:
-            result["assignee"] = None
+        result["status"] = task.status
+        result["priority"] = task.priority
+        result["created_by"] = task.creator
+        result["assignee"] = task.assignee
+        result["list_name"], result["folder_name"], result["space_name"] = clickup_hierarchy.names(task)
 
         # ====================================================================
         # FECHAS
         # ====================================================================
-        result["date_created"] = LeadService._parse_clickup_date(task_data.get("date_created"))
-        result["date_updated"] = LeadService._parse_clickup_date(task_data.get("date_updated"))
-        result["due_date"] = LeadService._parse_clickup_date(task_data.get("due_date"))
+        result["date_created"] = LeadService._parse_clickup_date(task.date_created)
+        result["date_updated"] = LeadService._parse_clickup_date(task.date_updated)
+        result["due_date"] = LeadService._parse_clickup_date(task.due_date)
         
         # Agregamos fecha de cierre si existe (importante para tu modelo)
-        result["date_closed"] = LeadService._parse_clickup_date(task_data.get("date_closed"))
+        result["date_closed"] = LeadService._parse_clickup_date(task.date_closed)
 
         # ====================================================================
         # CAMPOS DE NEGOCIO (custom fields)
         # ====================================================================
-        custom_fields = task_data.get("custom_fields", [])
-        result.update(LeadService._parse_custom_fields(custom_fields))
+        if custom_field_values is None:
+            custom_field_values = LeadService._parse_custom_fields(
+                field_catalog.decode(task.list_id, task.custom_fields)
+            )
+        result.update(custom_field_values)
 
         # ====================================================================
         # CONTENIDO Y PARSING (AQUÍ ESTABA EL ERROR)
         # ====================================================================
-        task_content = task_data.get("description", "") or task_data.get("text_content", "")
-        result["task_content"] = task_content if task_content else None
+        task_content = task.content
+        result["task_content"] = task_content
 
         extracted_mycase_id = None
 
         if task_content:
-            parsed = parse_task_content(task_content)
+            with stage("leads", "parse_task_content"):
+                parsed = parse_task_content(task_content)
             
             # --- CORRECCIÓN CRÍTICA ---
             # Extraemos 'mycase_id' y lo eliminamos del diccionario 'parsed'
@@ -98,8 +108,10 @@ class LeadService:
         else:
             result["id_mycase"] = id_mycase_from_name
 
-        # Comentarios
-        result["comment_count"] = len(task_data.get("comments", []))
+        # Comentarios: GET /task no los trae; comment_count y latest_comment los
+        # mantiene CommentSyncService (webhooks de comentario y backfill)
+        if task.comment_count is not None:
+            result["comment_count"] = task.comment_count
         
         # --- LIMPIEZA FINAL DE SEGURIDAD ---
         # Aseguramos que bajo ninguna circunstancia 'mycase_id' llegue a la DB
@@ -117,43 +129,23 @@ class LeadService:
         - Fecha en formato ISO
         - Fecha con ordinales (May 21st 2024)
 
+        Ver app.core.dates.parse_date (fast paths + caché, dateutil al final).
+
         Args:
             date_value: Valor de fecha (string, int, None)
 
         Returns:
-            datetime object o None
+            datetime aware en UTC o None
         """
-        if not date_value:
-            return None
-
-        try:
-            # Si es timestamp Unix (en milisegundos)
-            if isinstance(date_value, (int, float)):
-                return datetime.fromtimestamp(int(date_value) / 1000)
-
-            if isinstance(date_value, str):
-                # Intentar parsear como timestamp
-                if date_value.isdigit():
-                    return datetime.fromtimestamp(int(date_value) / 1000)
-
-                # Eliminar ordinales (1st, 2nd, 3rd, 4th)
-                cleaned = remove_ordinal_suffix(date_value)
-
-                # Parsear con dateutil (soporta múltiples formatos)
-                return date_parser.parse(cleaned)
-
-        except (ValueError, OverflowError) as e:
-            print(f"Error parseando fecha {date_value}: {e}")
-            return None
-
-        return None
+        return parse_date(date_value)
 
     @staticmethod
     def _parse_custom_fields(custom_fields: list) -> Dict:
         """
         Extrae custom fields de ClickUp.
 
-        Mapea nombres de custom fields a columnas de la DB.
+        Mapea nombres de custom fields a columnas de la DB según el perfil
+        "leads" de app/core/custom_fields.json (esquema compilado).
 
         Args:
             custom_fields: Lista de custom fields de ClickUp
@@ -161,30 +153,4 @@ class LeadService:
         Returns:
             Diccionario con campos parseados
         """
-        result = {}
-
-        # Mapeo de nombres de custom fields a columnas
-        field_mapping = {
-            "Pipeline de Viabilidad": "pipeline_de_viabilidad",
-            "Fecha Consulta Original": "fecha_consulta_original",
-            "TIS Open": "tis_open",
-        }
-
-        for field in custom_fields:
-            field_name = field.get("name")
-            field_value = field.get("value")
-
-            if field_name in field_mapping:
-                column_name = field_mapping[field_name]
-
-                # Parsear según tipo
-                field_type = field.get("type")
-
-                if field_type == "date":
-                    result[column_name] = LeadService._parse_clickup_date(field_value)
-                elif field_type == "checkbox":
-                    result[column_name] = field_value is True
-                else:
-                    result[column_name] = field_value
-
-        return result
+        return get_schema("leads").extract(custom_fields)
@@ -0,0 +1,290 @@
+# app/services/write_back_queue.py
+"""
+Cola de escrituras a ClickUp (resultados de Filtros -> Link AI).
+
+Cuando Filtros vacía un backlog llegan cientos de callbacks seguidos; cada uno
+escribía en ClickUp dentro de la petición, con su propio cliente HTTP. Ahora
+el callback solo encola y responde, y unos pocos workers escriben:
+
+- Concurrencia: WRITE_BACK_WORKERS workers con un AsyncClient compartido;
+  tasa y 429 los controla el limitador de ClickUp (app.core.rate_limit).
+- Coalescencia: si la misma tarea/campo ya espera en la cola o un reintento,
+  se reemplaza el valor (se escribe solo el último; el reintento conserva
+  su backoff).
+- Orden por tarea/campo: nunca hay dos escrituras de la misma clave en vuelo.
+- Reintentos: errores de red, 5xx y 429 se reintentan con backoff exponencial
+  (con jitter) hasta WRITE_BACK_MAX_ATTEMPTS; los 4xx son definitivos.
+- Resultados: clickup_write_back_total{outcome}, latencia encolado -> escrito
+  y pendientes en /metrics; WriteBackJob.on_done avisa el resultado final
+  (app.services.callback_recorder lo guarda en filtros_callbacks).
+
+La cola es por proceso y en memoria, y es la única copia de la escritura:
+/callbacks/filtros responde 200 al encolar, así que Filtros ya no reintenta
+por un fallo de ClickUp. stop() espera a que se vacíe hasta un timeout; lo
+que quede (en cola, en vuelo o esperando reintento) termina con outcome
+"dropped" (on_done -> filtros_callbacks) y sus task_id quedan en el log.
+Mientras se apaga, enqueue() rechaza (503) para que Filtros reintente contra
+otra instancia.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.config import settings
+from app.core import tracing
+from app.core.metrics import Counter, Gauge, Histogram
+from app.services.clickup_service import ClickUpService
+
+logger = logging.getLogger(__name__)
+
+WRITE_BACK_RESULTS = Counter(
+    "clickup_write_back_total",
+    "Escrituras a ClickUp por resultado (queued, coalesced, rejected, success, retry, failed, superseded, dropped)",
+    ("outcome",),
+)
+WRITE_BACK_SECONDS = Histogram(
+    "clickup_write_back_seconds",
+    "Tiempo desde que se encola una escritura hasta que queda en ClickUp",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+WRITE_BACK_PENDING = Gauge(
+    "clickup_write_back_pending",
+    "Escrituras en cola, en vuelo o esperando reintento",
+)
+
+Key = Tuple[str, str]  # (task_id, field_id)
+
+
+@dataclass
+class WriteBackJob:
+    task_id: str
+    field_id: str
+    value: str
+    trace_parent: Optional[tracing.SpanContext] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    # Se llaman con (job, outcome) al terminar: success, failed o dropped (al
+    # apagar). Si la escritura se fusiona con otra (coalesced / superseded)
+    # pasan a la que queda.
+    on_done: List[Callable[["WriteBackJob", str], None]] = field(default_factory=list)
+
+    @property
+    def key(self) -> Key:
+        return (self.task_id, self.field_id)
+
+
+def _retryable(error: httpx.HTTPError) -> bool:
+    """Red, timeouts, 5xx y 429 (si persiste tras la pausa del limitador)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code == 429 or code >= 500
+    return True
+
+
+class WriteBackQueue:
+    """Cola con workers; se arranca sola al primer enqueue (o en el lifespan)."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 2.0,
+        max_pending: int = 10000,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.max_pending = max_pending
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._pending: Dict[Key, WriteBackJob] = {}  # encoladas, aún no tomadas por un worker
+        self._inflight: Dict[Key, WriteBackJob] = {}
+        self._deferred: Set[Key] = set()  # tomadas mientras la misma clave estaba en vuelo
+        self._retrying: Dict[Key, WriteBackJob] = {}  # fallidas esperando su reintento
+        self._closing = False
+
+    def pending(self) -> int:
+        return len(self._pending) + len(self._inflight) + len(self._retries)
+
+    def start(self) -> None:
+        """Crea la cola, el cliente y los workers en el loop actual (idempotente)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._closing = False
+        self._queue = asyncio.Queue()
+        self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max(self.workers, 1)))
+        self._pending.clear()
+        self._inflight.clear()
+        self._deferred.clear()
+        self._retries.clear()
+        self._retrying.clear()
+        self._tasks = [loop.create_task(self._worker(), name=f"write_back_{i}") for i in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Deja de aceptar escrituras, espera a que se vacíe (hasta timeout) y
+        cierra workers y cliente. Lo que quede termina como "dropped".
+        """
+        if not self._tasks:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        # Las en vuelo se cancelan: no se sabe si ClickUp llegó a escribirlas
+        dropped = {id(job): job for job in [*self._pending.values(), *self._inflight.values(), *self._retrying.values()]}
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        if dropped:
+            WRITE_BACK_RESULTS.inc(len(dropped), outcome="dropped")
+            logger.error(
+                f"❌ Write-back: {len(dropped)} escrituras descartadas al apagar; "
+                f"task_ids: {', '.join(sorted(job.task_id for job in dropped.values()))}"
+            )
+            for job in dropped.values():
+                self._done(job, "dropped")
+        self._tasks = []
+        self._pending.clear()
+        self._inflight.clear()
+        self._retries.clear()
+        self._retrying.clear()
+        await self._client.aclose()
+
+    async def join(self) -> None:
+        """Hasta que no quede nada en cola, en vuelo ni esperando reintento."""
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*list(self._retries), return_exceptions=True)
+
+    def enqueue(self, job: WriteBackJob) -> str:
+        """
+        Encola una escritura: "queued", "coalesced" (reemplazó un valor en
+        espera) o "rejected" (cola llena o apagándose).
+        """
+        if self._closing:
+            WRITE_BACK_RESULTS.inc(outcome="rejected")
+            return "rejected"
+        self.start()
+        # Un reintento en espera es la escritura más vieja de la clave: si se
+        # encolara aparte, al despertar pisaría el valor nuevo
+        pending = self._pending.get(job.key) or self._retrying.get(job.key)
+        if pending is not None:
+            pending.value = job.value
+            pending.trace_parent = job.trace_parent or pending.trace_parent
+            pending.on_done.extend(job.on_done)
+            outcome = "coalesced"
+        elif self.pending() >= self.max_pending:
+            outcome = "rejected"
+        else:
+            self._pending[job.key] = job
+            self._queue.put_nowait(job.key)
+            outcome = "queued"
+        WRITE_BACK_RESULTS.inc(outcome=outcome)
+        return outcome
+
+    async def _worker(self) -> None:
+        service = ClickUpService(self._client)
+        while True:
+            key = await self._queue.get()
+            try:
+                if key in self._inflight:
+                    self._deferred.add(key)
+                    continue
+                job = self._pending.pop(key, None)
+                if job is None:
+                    continue
+                self._inflight[key] = job
+                try:
+                    await self._write(service, job)
+                finally:
+                    self._inflight.pop(key, None)
+                    if key in self._deferred:
+                        self._deferred.discard(key)
+                        if key in self._pending:
+                            self._queue.put_nowait(key)
+            except Exception as e:
+                logger.error(f"❌ Write-back: error inesperado en {key}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _write(self, service: ClickUpService, job: WriteBackJob) -> None:
+        job.attempts += 1
+        with tracing.start_span(
+            "write_back.clickup",
+            parent=job.trace_parent,
+            attributes={"clickup.task_id": job.task_id, "write_back.attempt": job.attempts},
+        ) as span:
+            try:
+                await service.write_custom_field(job.task_id, job.field_id, job.value)
+            except httpx.HTTPError as e:
+                span.record_error(e)
+                newer = self._pending.get(job.key)
+                if newer is not None:
+                    # Ya hay un valor más nuevo en cola: este no se reintenta
+                    WRITE_BACK_RESULTS.inc(outcome="superseded")
+                    newer.on_done.extend(job.on_done)
+                elif _retryable(e) and job.attempts < self.max_attempts:
+                    WRITE_BACK_RESULTS.inc(outcome="retry")
+                    delay = self.retry_base_seconds * 2 ** (job.attempts - 1) * random.uniform(0.5, 1.0)
+                    logger.warning(
+                        f"🔁 Write-back {job.task_id}: intento {job.attempts} falló ({e}); reintento en {delay:.1f}s"
+                    )
+                    self._retrying[job.key] = job
+                    retry = asyncio.get_running_loop().create_task(self._retry_later(job, delay))
+                    self._retries.add(retry)
+                    retry.add_done_callback(self._retries.discard)
+                else:
+                    WRITE_BACK_RESULTS.inc(outcome="failed")
+                    logger.error(f"❌ Write-back {job.task_id}: falló tras {job.attempts} intentos: {e}")
+                    self._done(job, "failed")
+                return
+
+        WRITE_BACK_RESULTS.inc(outcome="success")
+        WRITE_BACK_SECONDS.observe(time.monotonic() - job.enqueued_at)
+        logger.info(f"✅ ClickUp actualizado: Task {job.task_id} -> {job.value}")
+        self._done(job, "success")
+
+    @staticmethod
+    def _done(job: WriteBackJob, outcome: str) -> None:
+        for callback in job.on_done:
+            try:
+                callback(job, outcome)
+            except Exception as e:
+                logger.error(f"❌ Write-back {job.task_id}: error en on_done: {e}")
+
+    async def _retry_later(self, job: WriteBackJob, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            if self._retrying.get(job.key) is job:
+                del self._retrying[job.key]
+        # enqueue() fusiona en el reintento mientras espera, así que _pending
+        # no tiene la clave; se vuelve a encolar con el valor más reciente
+        self._pending[job.key] = job
+        self._queue.put_nowait(job.key)
+
+
+# Singleton compartido por los endpoints de callbacks
+write_back_queue = WriteBackQueue(
+    workers=settings.write_back_workers,
+    max_attempts=settings.write_back_max_attempts,
+    retry_base_seconds=settings.write_back_retry_base_seconds,
+    max_pending=settings.write_back_max_pending,
+)
+
+WRITE_BACK_PENDING.set_function(write_back_queue.pending)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+ClickUpTask (decodificación selectiva, __slots__) vs el dict completo de ClickUp.
+
+Sobre N cuerpos de GET /task sintéticos (scripts/synthetic_corpus.py):
+- memoria retenida por tarea en vuelo (lo que guardan las BackgroundTasks),
+  con y sin keep_raw
+- µs por tarea de decodificación (json.loads/orjson.loads vs ClickUpTask.from_json)
+- µs por tarea de decodificación + transformación (LeadService / AssignmentService)
+
+Verifica además que las transformaciones den lo mismo con ambos formatos.
+
+Uso:
+    python scripts/bench_clickup_task.py [--tasks 500] [--repeat 5]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import orjson
+
+from app.core.clickup_task import ClickUpTask
+from app.services.assignment_service import AssignmentService
+from app.services.lead_service import LeadService
+
+from synthetic_corpus import make_task
+
+
+def retained_bytes(decode: Callable, bodies: List[bytes]) -> float:
+    """Bytes por tarea que siguen vivos mientras se retienen todas las decodificadas."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = [decode(body) for body in bodies]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current / len(bodies)
+
+
+def per_task_us(fn: Callable, bodies: List[bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            fn(body)
+        best = min(best, (time.perf_counter() - start) / len(bodies))
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas (se toma la mejor)")
+    args = parser.parse_args()
+
+    bodies = [orjson.dumps(make_task(i, trigger_field_name="Link Intake")) for i in range(args.tasks)]
+    print(f"📦 {args.tasks} tareas, {sum(map(len, bodies)) / len(bodies):,.0f} B de JSON por tarea")
+
+    for body in bodies[:50]:
+        task = orjson.loads(body)
+        struct = ClickUpTask.from_json(body, keep_raw=True)
+        assert LeadService.transform_clickup_task(task) == LeadService.transform_clickup_task(struct)
+        assert AssignmentService.transform_task(task) == AssignmentService.transform_task(struct)
+
+    print("\n🧠 Memoria retenida por tarea en vuelo")
+    memory = {
+        "dict (json.loads)": retained_bytes(json.loads, bodies),
+        "dict (orjson.loads)": retained_bytes(orjson.loads, bodies),
+        "ClickUpTask": retained_bytes(ClickUpTask.from_json, bodies),
+        "ClickUpTask keep_raw": retained_bytes(lambda b: ClickUpTask.from_json(b, keep_raw=True), bodies),
+    }
+    for name, size in memory.items():
+        print(f"   {name:<28}{size:>12,.0f} B")
+
+    print("\n⏱️  µs por tarea")
+    timings = {
+        "decode json.loads": lambda b: json.loads(b),
+        "decode orjson.loads": orjson.loads,
+        "decode ClickUpTask": ClickUpTask.from_json,
+        "lead dict (json.loads)": lambda b: LeadService.transform_clickup_task(json.loads(b)),
+        "lead ClickUpTask": lambda b: LeadService.transform_clickup_task(ClickUpTask.from_json(b)),
+        "assignment dict (json.loads)": lambda b: AssignmentService.transform_task(json.loads(b)),
+        "assignment ClickUpTask raw": lambda b: AssignmentService.transform_task(ClickUpTask.from_json(b, keep_raw=True)),
+    }
+    for name, fn in timings.items():
+        print(f"   {name:<28}{per_task_us(fn, bodies, args.repeat):>12,.1f} µs")
+
+    ratio = memory["dict (json.loads)"] / memory["ClickUpTask"]
+    print(f"\n📉 ClickUpTask retiene {ratio:.1f}x menos memoria que el dict completo")
+
+
+if __name__ == "__main__":
+    main()
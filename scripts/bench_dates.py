@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser de fechas a escala de importación: legacy vs por niveles.
+
+Corpus: N valores con la mezcla de un import de ClickUp (epoch ms de la API,
+exportaciones "Tuesday, January 9th 2024, 3:36:42 pm -06:00", MM/DD/YYYY,
+ISO, ordinales) y la repetición típica de un CSV (muchas filas comparten fecha).
+
+Además de la velocidad verifica equivalencia: ambos parsers deben dar el
+mismo instante (el legacy devolvía naive; epoch en hora local, strings sin
+zona asumidas UTC como hacía import_history).
+
+Uso:
+    python scripts/bench_dates.py [n_valores]
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dateutil import parser as date_parser
+
+from app.core import dates
+from app.core.text_utils import remove_ordinal_suffix
+
+
+def legacy_parse(date_value):
+    """Implementación anterior de LeadService._parse_clickup_date (referencia)."""
+    if not date_value:
+        return None
+    try:
+        if isinstance(date_value, (int, float)):
+            return datetime.fromtimestamp(int(date_value) / 1000)
+        if isinstance(date_value, str):
+            if date_value.isdigit():
+                return datetime.fromtimestamp(int(date_value) / 1000)
+            cleaned = remove_ordinal_suffix(date_value)
+            return date_parser.parse(cleaned)
+    except (ValueError, OverflowError):
+        return None
+    return None
+
+
+def _ordinal(day: int) -> str:
+    if 11 <= day <= 13:
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+
+
+def _export_format(d: datetime, rng: random.Random) -> str:
+    hour = d.hour % 12 or 12
+    offset = rng.choice(["-05:00", "-06:00", "-04:00"])
+    return (
+        f"{d.strftime('%A')}, {d.strftime('%B')} {d.day}{_ordinal(d.day)} {d.year}, "
+        f"{hour}:{d.minute:02d}:{d.second:02d} {'pm' if d.hour >= 12 else 'am'} {offset}"
+    )
+
+
+def build_corpus(n: int, seed: int = 7, distinct: int = 5000):
+    rng = random.Random(seed)
+    base = datetime(2022, 1, 1)
+    pool = []
+    for _ in range(distinct):
+        d = base + timedelta(seconds=rng.randrange(0, 3 * 365 * 86400))
+        kind = rng.random()
+        if kind < 0.45:
+            pool.append(str(int(d.replace(tzinfo=timezone.utc).timestamp() * 1000)))
+        elif kind < 0.75:
+            pool.append(_export_format(d, rng))
+        elif kind < 0.85:
+            pool.append(d.strftime("%m/%d/%Y"))
+        elif kind < 0.93:
+            pool.append(f"{d.strftime('%B')} {d.day}{_ordinal(d.day)} {d.year}")
+        else:
+            pool.append(d.strftime("%Y-%m-%dT%H:%M:%S") + rng.choice(["Z", "", "+02:00"]))
+    # Repetición tipo CSV: distribución sesgada hacia pocas fechas
+    return [pool[min(int(rng.paretovariate(1.2)) - 1, distinct - 1)] for _ in range(n)] + pool
+
+
+def _same_instant(legacy, new, value) -> bool:
+    if legacy is None or new is None:
+        return legacy is new
+    if isinstance(value, str) and value.isdigit():
+        legacy = legacy.astimezone(timezone.utc)  # naive en hora local
+    elif legacy.tzinfo is None:
+        legacy = legacy.replace(tzinfo=timezone.utc)
+    return legacy == new
+
+
+def _measure(fn, values) -> float:
+    start = time.perf_counter()
+    for value in values:
+        fn(value)
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    values = build_corpus(n)
+    print(f"📅 {len(values):,} valores ({len(set(values)):,} distintos)\n")
+
+    mismatches = [v for v in set(values) if not _same_instant(legacy_parse(v), dates.parse_date(v), v)]
+
+    legacy_s = _measure(legacy_parse, values)
+    dates._parse_text.cache_clear()
+    cold_s = _measure(dates.parse_date, values)
+    warm_s = _measure(dates.parse_date, values)
+    info = dates._parse_text.cache_info()
+
+    def row(label, seconds):
+        print(f"{label:<28}{seconds:>10.3f} s{len(values) / seconds:>14,.0f} ops/s{legacy_s / seconds:>9.1f}x")
+
+    row("legacy (dateutil)", legacy_s)
+    row("por niveles (caché frío)", cold_s)
+    row("por niveles (caché caliente)", warm_s)
+    print(f"\n🧠 caché: {info.hits:,} hits / {info.misses:,} misses (max {info.maxsize})")
+    print(f"🔍 valores distintos con instante diferente: {len(mismatches)}")
+    for value in mismatches[:10]:
+        print(f"   {value!r}: legacy={legacy_parse(value)!r} nuevo={dates.parse_date(value)!r}")
+
+
+if __name__ == "__main__":
+    main()
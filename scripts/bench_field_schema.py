@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark del esquema compilado de custom fields vs los bucles anteriores.
+
+Por tamaño de tarea (número de custom fields) mide lo que extrae cada webhook
+y verifica que el resultado sea igual:
+- /webhooks/clickup: trigger (link de intake + Link AI) + perfil "leads" (por nombre)
+- /webhooks/assignments: perfil "assignments" (por ID)
+
+Uso:
+    python scripts/bench_field_schema.py [iteraciones]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Antes de importar la app: el perfil "trigger" resuelve el nombre desde Settings
+os.environ.setdefault("CLICKUP_TRIGGER_CONDICIONAL", "Link Intake")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.config import settings
+from app.core.field_schema import get_schema
+from app.services.assignment_service import AssignmentService
+from app.services.lead_service import LeadService
+
+from synthetic_corpus import make_task
+
+TRIGGER_NAME = settings.clickup_trigger_condicional
+
+
+# --- Implementaciones anteriores (referencia) -------------------------------
+
+def legacy_leads(custom_fields):
+    result = {}
+    field_mapping = {
+        "Pipeline de Viabilidad": "pipeline_de_viabilidad",
+        "Fecha Consulta Original": "fecha_consulta_original",
+        "TIS Open": "tis_open",
+    }
+    for field in custom_fields:
+        field_name = field.get("name")
+        field_value = field.get("value")
+        if field_name in field_mapping:
+            column_name = field_mapping[field_name]
+            field_type = field.get("type")
+            if field_type == "date":
+                result[column_name] = LeadService._parse_clickup_date(field_value)
+            elif field_type == "checkbox":
+                result[column_name] = field_value is True
+            else:
+                result[column_name] = field_value
+    return result
+
+
+def legacy_assignments(custom_fields):
+    result = {}
+    for field in custom_fields:
+        f_id = field.get("id")
+        if f_id in AssignmentService.ID_MAP:
+            col_name = AssignmentService.ID_MAP[f_id]
+            val = field.get("value")
+            f_type = field.get("type")
+            if f_type == "date" and val:
+                result[col_name] = LeadService._parse_clickup_date(val)
+            elif f_type == "checkbox":
+                result[col_name] = val is True or val == "true"
+            else:
+                result[col_name] = val
+    return result
+
+
+def legacy_trigger(custom_fields):
+    link_intake_value = None
+    for field in custom_fields:
+        if field.get("name") == TRIGGER_NAME:
+            link_intake_value = field.get("value")
+            break
+    ai_link_exists = False
+    for field in custom_fields:
+        if field.get("id") == settings.clickup_field_id_ai_link:
+            if field.get("value"):
+                ai_link_exists = True
+                break
+    return link_intake_value, ai_link_exists
+
+
+def legacy_leads_webhook(custom_fields):
+    return legacy_trigger(custom_fields), legacy_leads(custom_fields)
+
+
+def compiled_leads_webhook(custom_fields, schema=get_schema("trigger", "leads")):
+    values = schema.extract_profiles(custom_fields)
+    trigger = values["trigger"]
+    return (trigger.get("link_intake"), bool(trigger.get("ai_link"))), values["leads"]
+
+
+def compiled_assignments(custom_fields, schema=get_schema("assignments")):
+    return schema.extract(custom_fields)
+
+
+CASES = {
+    "leads webhook": (legacy_leads_webhook, compiled_leads_webhook),
+    "assignments webhook": (legacy_assignments, compiled_assignments),
+}
+
+
+def _per_call_us(fn, tasks, iterations) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for fields in tasks:
+            fn(fields)
+    return (time.perf_counter() - start) / (iterations * len(tasks)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"⏱️  {iterations} iteraciones x 50 tareas por tamaño\n")
+    print(f"{'caso':<22}{'custom fields':>14}{'legacy µs':>12}{'compilado µs':>14}{'speedup':>10}")
+
+    for n_fields in (30, 55, 150, 300):
+        tasks = [make_task(i, n_custom_fields=n_fields, trigger_field_name=TRIGGER_NAME)["custom_fields"] for i in range(50)]
+        for case, (legacy_fn, compiled_fn) in CASES.items():
+            for fields in tasks:
+                if legacy_fn(fields) != compiled_fn(fields):
+                    print(f"❌ {case}: resultado distinto con {n_fields} campos")
+                    return 1
+            legacy = _per_call_us(legacy_fn, tasks, iterations)
+            compiled = _per_call_us(compiled_fn, tasks, iterations)
+            print(f"{case:<22}{n_fields:>14}{legacy:>12.2f}{compiled:>14.2f}{legacy / compiled:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
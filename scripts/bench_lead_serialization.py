@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la serialización de respuestas de /leads (listado y búsqueda).
+
+Modos, sobre las mismas filas:
+- orm_pydantic  -> entidades LeadsCache (identity map) + TypeAdapter(List[LeadResponse])
+                   con from_attributes + dump_json (camino anterior)
+- rows_pydantic -> tuplas de columnas + TypeAdapter cacheado (LEADS_RESPONSE_VALIDATION=true)
+- rows_orjson   -> tuplas de columnas + orjson (camino por defecto)
+
+Dos mediciones por modo y tamaño de página (10, 100, 500 filas):
+- serialize: solo la codificación, con las filas ya en memoria
+- query+serialize: consulta + hidratación + codificación contra SQLite en
+  memoria (aísla el costo del ORM; la latencia de Postgres no entra)
+
+Verifica además que los tres modos produzcan el mismo JSON.
+
+Uso:
+    python scripts/bench_lead_serialization.py [--rows 10 100 500] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pydantic import TypeAdapter
+from sqlalchemy import MetaData, Table, create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.leads import RESPONSE_FIELDS
+from app.core.serialization import dumps, rows_dicts
+from app.models.lead import LeadsCache
+from app.schemas.lead import LeadResponse
+from app.services.lead_service import LeadService
+
+from synthetic_corpus import make_task
+
+ADAPTER = TypeAdapter(List[LeadResponse])
+COLUMNS = [getattr(LeadsCache, f) for f in RESPONSE_FIELDS]
+
+
+def orm_pydantic(leads) -> bytes:
+    return ADAPTER.dump_json(ADAPTER.validate_python(leads, from_attributes=True), exclude_unset=True)
+
+
+def rows_pydantic(rows) -> bytes:
+    return ADAPTER.dump_json(ADAPTER.validate_python(rows_dicts(rows, RESPONSE_FIELDS)), exclude_unset=True)
+
+
+def rows_orjson(rows) -> bytes:
+    return dumps(rows_dicts(rows, RESPONSE_FIELDS))
+
+
+def seed(rows: int):
+    """SQLite en memoria con una copia de leads_cache (solo columnas)."""
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table("leads_cache", metadata, *[c._copy() for c in LeadsCache.__table__.columns])
+    metadata.create_all(engine)
+    names = {c.name for c in table.columns}
+    data = []
+    for i in range(rows):
+        lead = LeadService.transform_clickup_task(make_task(i))
+        data.append({**{k: v for k, v in lead.items() if k in names}, "synced_at": datetime.now(timezone.utc)})
+    with engine.begin() as conn:
+        conn.execute(insert(table), data)
+    return sessionmaker(bind=engine)
+
+
+def _best(fn: Callable, repeat: int, min_time: float) -> float:
+    """Mejor tiempo por op (s) de `repeat` rondas de al menos min_time."""
+    best = float("inf")
+    for _ in range(repeat):
+        ops = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            fn()
+            ops += 1
+        best = min(best, (time.perf_counter() - start) / ops)
+    return best
+
+
+def run(sizes: List[int], repeat: int, min_time: float) -> Dict:
+    Session = seed(max(sizes))
+    results = {}
+    for size in sizes:
+        session = Session()
+        leads = session.query(LeadsCache).order_by(LeadsCache.date_updated.desc()).limit(size).all()
+        rows = session.query(*COLUMNS).order_by(LeadsCache.date_updated.desc()).limit(size).all()
+        outputs = {orm_pydantic(leads), rows_pydantic(rows), rows_orjson(rows)}
+        assert len(outputs) == 1, "los modos producen JSON distinto"
+
+        def query_orm():
+            s = Session()
+            try:
+                return orm_pydantic(s.query(LeadsCache).order_by(LeadsCache.date_updated.desc()).limit(size).all())
+            finally:
+                s.close()
+
+        def query_rows(encode):
+            def fn():
+                s = Session()
+                try:
+                    return encode(s.query(*COLUMNS).order_by(LeadsCache.date_updated.desc()).limit(size).all())
+                finally:
+                    s.close()
+            return fn
+
+        cases = {
+            "orm_pydantic": (lambda: orm_pydantic(leads), query_orm),
+            "rows_pydantic": (lambda: rows_pydantic(rows), query_rows(rows_pydantic)),
+            "rows_orjson": (lambda: rows_orjson(rows), query_rows(rows_orjson)),
+        }
+        print(f"\n📄 {size} filas ({len(outputs.pop()):,} B de JSON)")
+        print(f"   {'modo':<16}{'serialize µs':>14}{'query+serialize µs':>20}")
+        results[size] = {}
+        for name, (serialize, end_to_end) in cases.items():
+            session.expunge_all()
+            results[size][name] = {
+                "serialize_us": _best(serialize, repeat, min_time) * 1e6,
+                "query_serialize_us": _best(end_to_end, repeat, min_time) * 1e6,
+            }
+            r = results[size][name]
+            print(f"   {name:<16}{r['serialize_us']:>14,.1f}{r['query_serialize_us']:>20,.1f}")
+        session.close()
+
+        base = results[size]["orm_pydantic"]
+        for name in ("rows_pydantic", "rows_orjson"):
+            r = results[size][name]
+            print(f"   📉 {name} vs orm_pydantic: serialize {base['serialize_us'] / r['serialize_us']:.1f}x,"
+                  f" query+serialize {base['query_serialize_us'] / r['query_serialize_us']:.1f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas (se toma la mejor)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos por ronda")
+    args = parser.parse_args()
+    run(args.rows, args.repeat, args.min_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Compara leads_cache ancha (texto pesado en la fila) vs estrecha + leads_cache_content.
+
+Crea dos esquemas de prueba con N leads sintéticos idénticos
+(scripts/synthetic_corpus.py pasado por LeadService.transform_clickup_task):
+- bench_wide:   leads_cache con task_content, latest_comment, interview_other
+- bench_narrow: leads_cache + leads_cache_content (modelo actual)
+
+Por esquema y consulta (búsqueda trigram, listado por date_updated y un
+escaneo completo por status) reporta:
+- buffers tocados por ejecución (EXPLAIN (ANALYZE, BUFFERS): shared hit/read)
+- hit ratio del buffer cache sobre leads_cache (deltas de pg_statio_user_tables)
+- latencia p50 / p95
+
+Uso:
+    python scripts/bench_lead_split.py [--rows 100000] [--repeat 200] [--keep]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import Column, MetaData, Text, create_engine, insert, text
+from app.config import settings
+from app.models.lead import CONTENT_COLUMNS, LeadsCache, LeadsCacheContent
+from app.repositories.lead_repository import _LIGHT_SELECT
+from app.services.lead_service import LeadService
+
+from synthetic_corpus import make_comments, make_task
+
+SCHEMAS = ("bench_wide", "bench_narrow")
+# Ya normalizados, como los pasa LeadRepository.search_by_name
+SEARCH_TERMS = ["JOSE LOPEZ", "MARIA GARCIA", "ANGEL HERNANDEZ", "LUCIA MUNOZ", "SOFIA RAMIREZ", "ANDRES ZUNIGA"]
+
+QUERIES = {
+    "search": (
+        f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE nombre_normalizado % :query "
+        f"ORDER BY similarity(nombre_normalizado, :query) DESC LIMIT 10"
+    ),
+    "list": f"SELECT {_LIGHT_SELECT} FROM leads_cache ORDER BY date_updated DESC LIMIT 100",
+    "scan": "SELECT count(*) FROM leads_cache WHERE status = :status",
+}
+
+
+def _tables(schema: str):
+    metadata = MetaData()
+    lead = LeadsCache.__table__.to_metadata(metadata, schema=schema)
+    if schema == "bench_wide":
+        for column in CONTENT_COLUMNS:
+            lead.append_column(Column(column, Text, nullable=True))
+        return lead, None
+    return lead, LeadsCacheContent.__table__.to_metadata(metadata, schema=schema)
+
+
+TABLES = {schema: _tables(schema) for schema in SCHEMAS}
+
+
+def _lead_rows(rows: int):
+    for i in range(rows):
+        task = make_task(i, task_id=f"bench{i:07d}")
+        data = LeadService.transform_clickup_task(task)
+        comments = make_comments(i)
+        data["latest_comment"] = comments[0]["comment_text"] if comments else None
+        data["comment_count"] = len(comments)
+        yield data
+
+
+def seed(engine, rows: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for schema in SCHEMAS:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+            lead, content = TABLES[schema]
+            lead.metadata.create_all(conn)
+            conn.execute(text(
+                f"CREATE INDEX ON {schema}.leads_cache USING gin (nombre_normalizado gin_trgm_ops)"
+            ))
+
+    lead_columns = {c.name for c in LeadsCache.__table__.columns}
+    batch = []
+    start = time.perf_counter()
+    for i, data in enumerate(_lead_rows(rows), 1):
+        batch.append(data)
+        if len(batch) == 1000 or i == rows:
+            with engine.begin() as conn:
+                for schema in SCHEMAS:
+                    lead, content = TABLES[schema]
+                    hot = [{k: v for k, v in d.items() if k in lead_columns} for d in batch]
+                    heavy = [{"task_id": d["task_id"], **{c: d.get(c) for c in CONTENT_COLUMNS}} for d in batch]
+                    if content is None:
+                        conn.execute(insert(lead), [{**h, **c} for h, c in zip(hot, heavy)])
+                    else:
+                        conn.execute(insert(lead), hot)
+                        conn.execute(insert(content), heavy)
+            batch = []
+            print(f"   ⏳ {i:,}/{rows:,} leads ({time.perf_counter() - start:.0f}s)", end="\r")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for schema in SCHEMAS:
+            conn.execute(text(f"VACUUM ANALYZE {schema}.leads_cache"))
+    print()
+
+
+def _params(name: str, i: int) -> dict:
+    if name == "search":
+        return {"query": SEARCH_TERMS[i % len(SEARCH_TERMS)]}
+    if name == "scan":
+        return {"status": "contacted"}
+    return {}
+
+
+def _statio(conn, schema: str):
+    return conn.execute(text(
+        "SELECT heap_blks_hit, heap_blks_read, COALESCE(toast_blks_hit, 0), COALESCE(toast_blks_read, 0) "
+        "FROM pg_statio_user_tables WHERE schemaname = :schema AND relname = 'leads_cache'"
+    ), {"schema": schema}).one()
+
+
+def _buffers(conn, sql: str, params: dict) -> int:
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    root = plan[0]["Plan"]
+    return root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+
+
+def run(engine, repeat: int) -> dict:
+    results = {}
+    for schema in SCHEMAS:
+        with engine.connect() as conn:
+            conn.execute(text(f"SET search_path = {schema}, public"))
+            heap = conn.execute(text(f"SELECT pg_relation_size('{schema}.leads_cache')")).scalar()
+            results[schema] = {"heap_bytes": heap}
+            for name, sql in QUERIES.items():
+                statement = text(sql)
+                buffers = _buffers(conn, sql, _params(name, 0))
+                conn.commit()
+                before = _statio(conn, schema)
+                conn.commit()
+                latencies = []
+                for i in range(repeat):
+                    start = time.perf_counter()
+                    conn.execute(statement, _params(name, i)).all()
+                    latencies.append((time.perf_counter() - start) * 1000)
+                conn.commit()
+                time.sleep(1.1)  # pg_statio se publica al cerrar la transacción, como mucho una vez por segundo
+                after = _statio(conn, schema)
+                conn.commit()
+                hits = (after[0] - before[0]) + (after[2] - before[2])
+                reads = (after[1] - before[1]) + (after[3] - before[3])
+                latencies.sort()
+                results[schema][name] = {
+                    "buffers": buffers,
+                    "hit_ratio": hits / (hits + reads) if hits + reads else None,
+                    "p50_ms": statistics.median(latencies),
+                    "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--skip-seed", action="store_true", help="Reusar los esquemas de una ejecución anterior")
+    parser.add_argument("--keep", action="store_true", help="No borrar los esquemas al terminar")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_dsn)
+    if not args.skip_seed:
+        print(f"🌱 Sembrando {args.rows:,} leads en {', '.join(SCHEMAS)}...")
+        seed(engine, args.rows)
+
+    results = run(engine, args.repeat)
+    for schema in SCHEMAS:
+        print(f"\n📦 {schema}: leads_cache heap {results[schema]['heap_bytes'] / 1024 / 1024:,.1f} MB")
+        print(f"   {'consulta':<10}{'buffers':>10}{'hit ratio':>12}{'p50 ms':>10}{'p95 ms':>10}")
+        for name in QUERIES:
+            r = results[schema][name]
+            ratio = f"{r['hit_ratio']:.4f}" if r["hit_ratio"] is not None else "-"
+            print(f"   {name:<10}{r['buffers']:>10,}{ratio:>12}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}")
+
+    wide, narrow = results["bench_wide"], results["bench_narrow"]
+    print("\n📉 estrecha vs ancha:")
+    for name in QUERIES:
+        print(f"   {name:<10} buffers {narrow[name]['buffers'] / max(wide[name]['buffers'], 1):.2f}x"
+              f" | p50 {wide[name]['p50_ms'] / narrow[name]['p50_ms']:.2f}x más rápida")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            for schema in SCHEMAS:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
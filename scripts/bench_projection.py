@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Mide el efecto de la proyección de columnas en las lecturas de leads_cache.
+
+Compara tres modos sobre la misma página de leads:
+1. full    -> SELECT de todas las columnas (comportamiento anterior)
+2. default -> entidad ORM (task_content/latest_comment/interview_other viven en
+              leads_cache_content y no se leen)
+3. fields  -> SELECT explícito de unas pocas columnas (?fields=...)
+
+Reporta bytes leídos desde Postgres (pg_column_size) y tiempo de
+consulta + serialización con LeadResponse.
+
+Uso:
+    python scripts/bench_projection.py [limit] [repeticiones]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.models.lead import LeadsCache
+from app.repositories.lead_repository import LeadRepository, HEAVY_COLUMNS
+from app.schemas.lead import LeadResponse
+
+FIELDS = ["task_id", "task_name", "status", "id_mycase", "phone_number"]
+
+
+def column_bytes(session, columns, limit: int) -> int:
+    """Suma pg_column_size de las columnas dadas sobre la página más reciente."""
+    sizes = " + ".join(f"COALESCE(pg_column_size({c}), 0)" for c in columns)
+    sql = text(f"""
+        SELECT COALESCE(SUM({sizes}), 0) FROM (
+            SELECT * FROM leads_cache LEFT JOIN leads_cache_content USING (task_id)
+            ORDER BY date_updated DESC LIMIT :limit
+        ) page
+    """)
+    return session.execute(sql, {"limit": limit}).scalar()
+
+
+def timed(session, mode: str, limit: int, repeat: int) -> float:
+    """Tiempo medio (ms) de consulta + validación + dump JSON."""
+    repo = LeadRepository(session)
+    total = 0.0
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.perf_counter()
+        if mode == "full":
+            rows = repo._query(full=True).order_by(LeadsCache.date_updated.desc()).limit(limit).all()
+        elif mode == "fields":
+            rows = repo.get_all(limit=limit, columns=FIELDS)
+        else:
+            rows = repo.get_all(limit=limit)
+        for row in rows:
+            LeadResponse.model_validate(row, from_attributes=True).model_dump_json(exclude_unset=True)
+        total += time.perf_counter() - start
+    return total / repeat * 1000
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    engine = create_engine(settings.database_dsn)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    light_columns = [c.name for c in LeadsCache.__table__.columns]
+    all_columns = light_columns + list(HEAVY_COLUMNS)
+
+    print(f"📏 Página de {limit} leads, {repeat} repeticiones\n")
+    print(f"{'modo':<10}{'bytes':>14}{'ms/página':>14}")
+    try:
+        for mode, columns in (("full", all_columns), ("default", light_columns), ("fields", FIELDS)):
+            size = column_bytes(session, columns, limit)
+            elapsed = timed(session, mode, limit, repeat)
+            print(f"{mode:<10}{size:>14,}{elapsed:>14.2f}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
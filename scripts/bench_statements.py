@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las consultas calientes de LeadRepository: antes / después.
+
+Modos:
+1. sin_cache  -> engine con query_cache_size=0 (SQLAlchemy compila cada vez)
+2. cache      -> caché de SQL compilado, sin PREPARE en el servidor
+3. preparada  -> caché de SQL compilado + PREPARE/EXECUTE (DB_SERVER_SIDE_PREPARE)
+
+Por consulta reporta CPU del proceso (µs/llamada, time.process_time) y el
+"Planning Time" que devuelve EXPLAIN ANALYZE en Postgres.
+
+Uso:
+    python scripts/bench_statements.py [iteraciones]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.repositories.lead_repository import (
+    LeadRepository, PREPARED_BY_TASK_ID, PREPARED_BY_MYCASE_ID, PREPARED_SEARCH, _LIGHT_SELECT
+)
+
+BENCH_TASK_ID = "bench-upsert-0"
+
+
+def _sample(session) -> dict:
+    row = session.execute(text(
+        "SELECT task_id, id_mycase, nombre_normalizado FROM leads_cache "
+        "WHERE id_mycase IS NOT NULL AND nombre_normalizado <> '' LIMIT 1"
+    )).one()
+    return {"task_id": row[0], "mycase_id": row[1], "query": row[2]}
+
+
+def _cpu_per_call(fn, iterations: int) -> float:
+    fn()  # calentamiento (PREPARE, caché de compilado)
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def _planning_ms(session, sql: str, params: dict) -> float:
+    plan = session.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Planning Time"]
+
+
+def _planning_prepared(session, prepared, params: dict) -> float:
+    prepared.ensure(session)
+    # Tras 5 ejecuciones Postgres puede pasar al plan genérico (sin replanificar)
+    for _ in range(6):
+        session.execute(prepared.statement(), params).all()
+    binds = ", ".join(f":{b}" for b, _ in prepared.params)
+    return _planning_ms(session, f"EXECUTE {prepared.name}({binds})", params)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sample = None
+
+    raw_sql = {
+        "get_by_task_id": (f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE task_id = :task_id LIMIT 1", PREPARED_BY_TASK_ID),
+        "get_by_mycase_id": (f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE id_mycase = :mycase_id LIMIT 1", PREPARED_BY_MYCASE_ID),
+        "search_by_name": (
+            f"SELECT {_LIGHT_SELECT} FROM leads_cache WHERE nombre_normalizado % :query "
+            f"ORDER BY similarity(nombre_normalizado, :query) DESC LIMIT :limit",
+            PREPARED_SEARCH,
+        ),
+    }
+
+    results = {}
+    for mode in ("sin_cache", "cache", "preparada"):
+        engine = create_engine(
+            settings.database_dsn,
+            query_cache_size=0 if mode == "sin_cache" else settings.db_query_cache_size,
+        )
+        session = sessionmaker(bind=engine)()
+        settings.db_server_side_prepare = mode == "preparada"
+        repo = LeadRepository(session)
+        sample = sample or _sample(session)
+
+        calls = {
+            "get_by_task_id": lambda: repo.get_by_task_id(sample["task_id"]),
+            "get_by_mycase_id": lambda: repo.get_by_mycase_id(sample["mycase_id"]),
+            "search_by_name": lambda: repo.search_by_name(sample["query"], limit=10),
+            "upsert": lambda: repo.upsert({"task_id": BENCH_TASK_ID, "task_name": "BENCH | 00000000", "status": "bench"}),
+        }
+
+        for name, fn in calls.items():
+            session.expunge_all()
+            cpu = _cpu_per_call(fn, iterations)
+            planning = None
+            if name in raw_sql:
+                sql, prepared = raw_sql[name]
+                params = {**sample, "limit": 10}
+                planning = (
+                    _planning_prepared(session, prepared, params)
+                    if mode == "preparada" else _planning_ms(session, sql, params)
+                )
+            results.setdefault(name, {})[mode] = (cpu, planning)
+
+        session.execute(text("DELETE FROM leads_cache WHERE task_id = :t"), {"t": BENCH_TASK_ID})
+        session.commit()
+        session.close()
+        engine.dispose()
+
+    print(f"⏱️  {iterations} iteraciones por consulta\n")
+    print(f"{'consulta':<18}{'modo':<12}{'cpu µs/llamada':>16}{'planning ms':>14}")
+    for name, modes in results.items():
+        for mode, (cpu, planning) in modes.items():
+            plan = f"{planning:.3f}" if planning is not None else "-"
+            print(f"{name:<18}{mode:<12}{cpu:>16.1f}{plan:>14}")
+
+
+if __name__ == "__main__":
+    main()
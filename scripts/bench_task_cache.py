@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Simulación de la caché de tareas (app.core.task_cache) ante ráfagas de webhooks.
+
+Cada tarea recibe --events eventos (los webhooks de leads y de Case
+Assignment reciben cada cambio por separado) repartidos en --window segundos, contra un ClickUp falso (httpx.MockTransport) con
+--latency-ms de latencia. Algunos eventos son cambios reales (fecha nueva en
+history_items) y el resto duplicados del mismo cambio.
+
+Compara llamadas GET /task y latencia total con la caché desactivada y
+activada, y muestra hit/miss/coalesced.
+
+Uso:
+    python scripts/bench_task_cache.py [--tasks 100] [--events 6] [--changes 2]
+        [--latency-ms 150] [--window 1.0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Sin el limitador de ClickUp: se mide cuántas llamadas se ahorran, no la cola
+os.environ.setdefault("CLICKUP_RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ.setdefault("CLICKUP_MAX_CONCURRENCY", "1000")
+
+import httpx
+import orjson
+
+from app.core.cache import MemoryStore
+from app.core.task_cache import TASK_CACHE_REQUESTS, TaskCache
+from app.services import clickup_service as clickup_service_module
+from app.services.clickup_service import ClickUpService
+
+from synthetic_corpus import make_task
+
+
+async def simulate(args, enabled: bool):
+    cache = TaskCache(MemoryStore(max_entries=10_000), ttl=30, enabled=enabled)
+    # El servicio usa el singleton del módulo: se reemplaza solo para la simulación
+    clickup_service_module.task_cache = cache
+
+    bodies = {f"t{i}": make_task(i, task_id=f"t{i}") for i in range(args.tasks)}
+    calls = 0
+
+    async def handler(request: httpx.Request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(args.latency_ms / 1000)
+        task = bodies[request.url.path.rsplit("/", 1)[-1]]
+        return httpx.Response(200, content=orjson.dumps(task))
+
+    rng = random.Random(42)
+    schedule = []
+    for task_id, task in bodies.items():
+        updated = int(task["date_updated"])
+        # Cada cambio real genera varios eventos (duplicados del mismo cambio)
+        change_times = sorted(rng.uniform(0, args.window) for _ in range(args.changes))
+        for n in range(args.events):
+            change = n % args.changes
+            at = change_times[change] + rng.uniform(0, 0.05)
+            schedule.append((at, task_id, updated + change + 1))
+
+    async def event(at, task_id, changed_ms, service):
+        await asyncio.sleep(at)
+        # La tarea en ClickUp ya refleja el cambio
+        bodies[task_id]["date_updated"] = str(max(int(bodies[task_id]["date_updated"]), changed_ms))
+        cache.note_webhook("taskUpdated", task_id, [{"date": str(changed_ms)}])
+        await service.get_task(task_id)
+
+    before = {k: TASK_CACHE_REQUESTS.value(result=k) for k in ("hit", "miss", "coalesced")}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        service = ClickUpService(client)
+        start = time.perf_counter()
+        await asyncio.gather(*(event(at, tid, ms, service) for at, tid, ms in schedule))
+        elapsed = time.perf_counter() - start
+    counts = {k: TASK_CACHE_REQUESTS.value(result=k) - v for k, v in before.items()}
+    return calls, len(schedule), elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--events", type=int, default=6, help="Eventos por tarea")
+    parser.add_argument("--changes", type=int, default=2, help="Cambios reales por tarea")
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--window", type=float, default=1.0, help="Segundos en los que llegan los eventos")
+    args = parser.parse_args()
+
+    print(f"📦 {args.tasks} tareas x {args.events} eventos ({args.changes} cambios reales por tarea)")
+    for enabled in (False, True):
+        calls, events, elapsed, counts = asyncio.run(simulate(args, enabled))
+        label = "con caché" if enabled else "sin caché"
+        print(f"\n{'🟢' if enabled else '⚪'} {label}: {calls} GET /task para {events} eventos ({elapsed:.2f}s)")
+        if enabled:
+            print(f"   hit={counts['hit']:.0f} miss={counts['miss']:.0f} coalesced={counts['coalesced']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de la capa de transformación (CPU puro, sin red ni DB).
+
+Funciones medidas sobre el corpus sintético de scripts/synthetic_corpus.py:
+parse_task_content, normalize_task_name, normalize_name, clean_phone,
+LeadService._parse_clickup_date, LeadService.transform_clickup_task y
+AssignmentService.transform_task (tareas con 50+ custom fields).
+
+Por función: ops/s (mejor de --repeat rondas), µs/op, bytes asignados en
+pico por op y bloques retenidos (tracemalloc, en una pasada aparte para no
+contaminar el tiempo).
+
+Los resultados se guardan en JSON (con el commit) para comparar entre commits:
+    python scripts/bench_transforms.py --out bench/transforms-$(git rev-parse --short HEAD).json
+    python scripts/bench_transforms.py --compare bench/transforms-abc123.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.parser import parse_task_content
+from app.core.normalizer import normalize_task_name
+from app.core.text_utils import normalize_name, clean_phone
+from app.services.lead_service import LeadService
+from app.services.assignment_service import AssignmentService
+
+from synthetic_corpus import make_date_value, make_intake_description, make_task, make_full_name, _rng
+
+
+def build_corpus(size: int, seed: int) -> Dict[str, List]:
+    tasks = [make_task(i, seed=seed) for i in range(size)]
+    return {
+        "descriptions": [make_intake_description(i, seed=seed) for i in range(size)],
+        "task_names": [t["name"] for t in tasks],
+        "names": [make_full_name(_rng(i, seed)) for i in range(size)],
+        "phones": [
+            f["value"] for t in tasks for f in t["custom_fields"] if f["type"] == "phone" and f.get("value")
+        ][:size],
+        "dates": [make_date_value(i, seed=seed) for i in range(size)],
+        "tasks": tasks,
+    }
+
+
+def benchmarks(corpus: Dict[str, List]) -> Dict[str, Tuple[Callable, List]]:
+    """Cada benchmark procesa el corpus completo de su tipo (un op = un elemento)."""
+    return {
+        "parse_task_content": (parse_task_content, corpus["descriptions"]),
+        "normalize_task_name": (normalize_task_name, corpus["task_names"]),
+        "normalize_name": (normalize_name, corpus["names"]),
+        "clean_phone": (clean_phone, corpus["phones"]),
+        "LeadService._parse_clickup_date": (LeadService._parse_clickup_date, corpus["dates"]),
+        "LeadService.transform_clickup_task": (LeadService.transform_clickup_task, corpus["tasks"]),
+        "AssignmentService.transform_task": (AssignmentService.transform_task, corpus["tasks"]),
+    }
+
+
+def _time_round(fn: Callable, items: List, min_time: float) -> float:
+    """Segundos por op en una ronda de al menos min_time segundos."""
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            fn(item)
+        ops += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / ops
+
+
+def _allocations(fn: Callable, items: List) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        before_blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+        for item in items:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn(item)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+        after_blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_alloc_bytes_per_op": round(sum(peaks) / len(peaks), 1),
+        "retained_blocks": after_blocks - before_blocks,
+    }
+
+
+def run(size: int, seed: int, repeat: int, min_time: float, only: Optional[List[str]]) -> Dict:
+    corpus = build_corpus(size, seed)
+    results = {}
+    for name, (fn, items) in benchmarks(corpus).items():
+        if only and name not in only:
+            continue
+        for item in items[:10]:  # calentamiento (cachés de re, imports perezosos)
+            fn(item)
+        best = min(_time_round(fn, items, min_time) for _ in range(repeat))
+        results[name] = {
+            "ops_per_s": round(1 / best, 1),
+            "us_per_op": round(best * 1e6, 3),
+            **_allocations(fn, items),
+        }
+        print(f"  {name:<38}{results[name]['ops_per_s']:>14,.0f} ops/s"
+              f"{results[name]['us_per_op']:>12.2f} µs"
+              f"{results[name]['peak_alloc_bytes_per_op']:>12,.0f} B/op")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict, baseline_path: str) -> None:
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\n🔍 Comparación contra {baseline_path} (commit {baseline.get('commit')})")
+    print(f"{'función':<38}{'antes ops/s':>14}{'ahora ops/s':>14}{'Δ':>9}{'Δ B/op':>10}")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"{name:<38}{'-':>14}{now['ops_per_s']:>14,.0f}")
+            continue
+        delta = (now["ops_per_s"] / before["ops_per_s"] - 1) * 100
+        alloc = now["peak_alloc_bytes_per_op"] - before["peak_alloc_bytes_per_op"]
+        print(f"{name:<38}{before['ops_per_s']:>14,.0f}{now['ops_per_s']:>14,.0f}{delta:>8.1f}%{alloc:>10,.0f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=500, help="Elementos del corpus por tipo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas (se toma la mejor)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos por ronda")
+    parser.add_argument("--only", nargs="*", help="Solo estas funciones")
+    parser.add_argument("--out", help="Guardar resultados en JSON")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    print(f"⏱️  Corpus de {args.size} elementos (seed={args.seed}), mejor de {args.repeat} rondas\n")
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"size": args.size, "seed": args.seed, "repeat": args.repeat, "min_time": args.min_time},
+        "results": run(args.size, args.seed, args.repeat, args.min_time, args.only),
+    }
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2, sort_keys=True))
+        print(f"\n💾 Resultados guardados en {out}")
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
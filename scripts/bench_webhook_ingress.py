@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la entrada de los webhooks: ingress anterior vs app.core.webhook_ingress.
+
+Por request (un op = un body firmado) mide CPU y asignaciones de:
+- legacy_leads:        decode a str -> encode para HMAC -> json.loads (request.json())
+- legacy_assignments:  json.loads + CaseAssignmentWebhook (inyección de FastAPI,
+                       antes de la firma) -> decode -> encode -> HMAC
+- ingress:             HMAC sobre bytes -> orjson -> WebhookEnvelope
+- *_bad_signature:     firma inválida (el ingress no parsea nada)
+
+Cuerpos de scripts/synthetic_corpus.make_webhook_payload con --history-items
+cambios (1 = webhook típico, 20+ = ediciones masivas).
+
+Uso:
+    python scripts/bench_webhook_ingress.py [--size 500] [--history-items 1 5 20]
+        [--out bench/ingress-$(git rev-parse --short HEAD).json]
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.webhook_ingress import parse_envelope, verify_signature
+from app.schemas.case_assignment import CaseAssignmentWebhook
+
+from bench_transforms import _allocations, _git_commit, _time_round
+from synthetic_corpus import make_webhook_payload
+
+SECRET = "bench-secret"
+
+
+def _sign(body: bytes) -> str:
+    return hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+# --- Ingress anterior (referencia) ------------------------------------------
+
+def _legacy_verify(payload: str, signature: str) -> bool:
+    expected = hmac.new(SECRET.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected)
+
+
+def legacy_leads(request: Tuple[bytes, str]):
+    body, signature = request
+    if not _legacy_verify(body.decode("utf-8"), signature):
+        return None
+    return json.loads(body)
+
+
+def legacy_assignments(request: Tuple[bytes, str]):
+    body, signature = request
+    payload = CaseAssignmentWebhook(**json.loads(body))
+    if not _legacy_verify(body.decode("utf-8"), signature):
+        return None
+    return payload
+
+
+# --- Ingress actual -----------------------------------------------------------
+
+def ingress(request: Tuple[bytes, str]):
+    body, signature = request
+    if not verify_signature(body, signature, SECRET):
+        return None
+    return parse_envelope(body)
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "legacy_leads": legacy_leads,
+    "legacy_assignments": legacy_assignments,
+    "ingress": ingress,
+}
+
+
+def build_requests(size: int, seed: int, history_items: int) -> Tuple[List, List]:
+    bodies = [json.dumps(make_webhook_payload(i, seed, history_items)).encode("utf-8") for i in range(size)]
+    return [(b, _sign(b)) for b in bodies], [(b, "0" * 64) for b in bodies]
+
+
+def run(size: int, seed: int, repeat: int, min_time: float, history_items: List[int]) -> Dict:
+    results = {}
+    for n in history_items:
+        valid, invalid = build_requests(size, seed, n)
+        avg = sum(len(b) for b, _ in valid) / len(valid)
+        print(f"\n📨 {n} history_items ({avg:,.0f} B/body)")
+        assert all(ingress(r).task_id == legacy_leads(r)["task_id"] for r in valid[:20])
+        for name, fn in BENCHMARKS.items():
+            for label, items in ((name, valid), (f"{name}_bad_signature", invalid)):
+                for item in items[:10]:
+                    fn(item)
+                best = min(_time_round(fn, items, min_time) for _ in range(repeat))
+                key = f"{label}[{n}]"
+                results[key] = {
+                    "ops_per_s": round(1 / best, 1),
+                    "us_per_op": round(best * 1e6, 3),
+                    **_allocations(fn, items),
+                }
+                print(f"  {label:<34}{results[key]['ops_per_s']:>12,.0f} ops/s"
+                      f"{results[key]['us_per_op']:>10.2f} µs"
+                      f"{results[key]['peak_alloc_bytes_per_op']:>12,.0f} B/op")
+
+        for legacy in ("legacy_leads", "legacy_assignments"):
+            old, new = results[f"{legacy}[{n}]"], results[f"ingress[{n}]"]
+            print(f"  📉 ingress vs {legacy}: {old['us_per_op'] / new['us_per_op']:.2f}x más rápido,"
+                  f" {new['peak_alloc_bytes_per_op'] / max(old['peak_alloc_bytes_per_op'], 1):.2f}x B/op")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=500, help="Bodies distintos por ronda")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history-items", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=5, help="Rondas (se toma la mejor)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos por ronda")
+    parser.add_argument("--out", help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": run(args.size, args.seed, args.repeat, args.min_time, args.history_items),
+    }
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2, sort_keys=True))
+        print(f"\n💾 Resultados guardados en {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Verificación de los conteos de dashboards (lead_daily_counts, assignment_counts).
+
+Recalcula desde cero sobre leads_cache y case_assignments (mismas
+expresiones que los triggers) y compara con lo mantenido incrementalmente.
+Sale con código 1 si hay diferencias (apto para un job programado).
+
+- --install: (re)instala funciones y triggers con DASHBOARD_TIMEZONE
+- --fix: si hay diferencias, reconstruye las tablas de conteos (bloquea las
+  escrituras en el origen mientras dura; las lecturas siguen)
+
+Uso:
+    python scripts/check_dashboard_counts.py [--install] [--fix] [--limit 50]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories.dashboard_repository import DashboardRepository
+
+
+def _print_diffs(name: str, diffs, limit: int) -> None:
+    if not diffs:
+        print(f"✅ {name}: conteos consistentes")
+        return
+    print(f"❌ {name}: {len(diffs)}{'+' if len(diffs) >= limit else ''} claves distintas")
+    for row in diffs[:20]:
+        key = " / ".join(str(row[k]) for k in ("day", "dimension", "value") if k in row)
+        print(f"   {key}: esperado {row['expected']}, tabla {row['actual']}")
+    if len(diffs) > 20:
+        print(f"   ... y {len(diffs) - 20} más")
+
+
+def main(args) -> int:
+    timezone = settings.dashboard_timezone
+    print(f"📊 Verificando conteos de dashboards (zona horaria: {timezone})")
+    db = SessionLocal()
+    try:
+        repo = DashboardRepository(db)
+        if args.install:
+            repo.install_triggers(timezone)
+            print("🔧 Triggers instalados")
+
+        start = time.perf_counter()
+        diffs = repo.check(timezone, limit=args.limit)
+        print(f"⏱️  Recalculado en {time.perf_counter() - start:.2f}s")
+        for name, rows in diffs.items():
+            _print_diffs(name, rows, args.limit)
+
+        if not any(diffs.values()):
+            return 0
+        if not args.fix:
+            print("ℹ️  Ejecutar con --fix para reconstruir")
+            return 1
+
+        written = repo.rebuild(timezone)
+        print(f"🛠️  Reconstruido: {', '.join(f'{name}={rows} filas' for name, rows in written.items())}")
+        remaining = repo.check(timezone, limit=args.limit)
+        ok = not any(remaining.values())
+        print("✅ Conteos consistentes tras reconstruir" if ok else "❌ Siguen las diferencias")
+        return 0 if ok else 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--install", action="store_true", help="(Re)instalar funciones y triggers")
+    parser.add_argument("--fix", action="store_true", help="Reconstruir si hay diferencias")
+    parser.add_argument("--limit", type=int, default=1000, help="Máximo de diferencias a listar por tabla")
+    sys.exit(main(parser.parse_args()))
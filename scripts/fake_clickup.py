@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+API de ClickUp falsa para pruebas de carga (sirve tareas sintéticas).
+
+Rutas (mismo formato que https://api.clickup.com/api/v2):
+- GET  /api/v2/task/{task_id}                 -> make_task(índice derivado del id)
+- GET  /api/v2/task/{task_id}/comment         -> comentarios sintéticos
+- GET  /api/v2/list/{list_id}/task            -> una página de tareas
+- POST /api/v2/task/{task_id}/field/{field_id} -> {} (write-back del callback)
+- POST /enqueue                               -> Enqueuer falso (EXTERNAL_DISPATCH_URL)
+
+Los IDs "missing*" devuelven 404. FAKE_CLICKUP_LATENCY_MS añade latencia
+artificial a cada respuesta. La app se apunta aquí con CLICKUP_API_BASE_URL.
+
+Uso:
+    python scripts/fake_clickup.py [puerto]
+"""
+
+import asyncio
+import os
+import sys
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, HTTPException, Response
+
+from synthetic_corpus import make_comments, make_task
+
+LATENCY_S = float(os.getenv("FAKE_CLICKUP_LATENCY_MS", "0")) / 1000
+TRIGGER_FIELD = os.getenv("CLICKUP_TRIGGER_CONDICIONAL")
+SEED = int(os.getenv("FAKE_CLICKUP_SEED", "42"))
+
+app = FastAPI(title="Fake ClickUp API")
+_task_cache = {}
+
+
+def _index(task_id: str) -> int:
+    digits = "".join(c for c in task_id if c.isdigit())
+    return int(digits) if digits else zlib.crc32(task_id.encode())
+
+
+async def _latency():
+    if LATENCY_S:
+        await asyncio.sleep(LATENCY_S)
+
+
+def _task_bytes(task_id: str) -> bytes:
+    # Serializado una vez: el costo medido debe ser el de la app, no el del fake
+    body = _task_cache.get(task_id)
+    if body is None:
+        body = orjson.dumps(make_task(_index(task_id), seed=SEED, trigger_field_name=TRIGGER_FIELD, task_id=task_id))
+        _task_cache[task_id] = body
+    return body
+
+
+@app.get("/api/v2/task/{task_id}")
+async def get_task(task_id: str):
+    await _latency()
+    if task_id.startswith("missing"):
+        raise HTTPException(status_code=404, detail="Task not found")
+    return Response(content=_task_bytes(task_id), media_type="application/json")
+
+
+@app.get("/api/v2/task/{task_id}/comment")
+async def get_comments(task_id: str):
+    await _latency()
+    return {"comments": make_comments(_index(task_id), seed=SEED)}
+
+
+@app.get("/api/v2/list/{list_id}/task")
+async def get_list_tasks(list_id: str, page: int = 0):
+    await _latency()
+    start = page * 100
+    return {"tasks": [make_task(i, seed=SEED, trigger_field_name=TRIGGER_FIELD) for i in range(start, start + 100)]}
+
+
+@app.post("/api/v2/task/{task_id}/field/{field_id}")
+async def set_field(task_id: str, field_id: str):
+    await _latency()
+    return {}
+
+
+@app.post("/enqueue")
+async def enqueue():
+    await _latency()
+    return {"ok": True, "task": "fake-cloud-task"}
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8099
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
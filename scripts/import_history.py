@@ -10,7 +10,6 @@ import re
 import traceback
 from pathlib import Path
 from datetime import datetime, timezone
-from dateutil import parser as date_parser
 
 # Aumentar el límite de tamaño de campo
 csv.field_size_limit(sys.maxsize)
@@ -21,8 +20,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
-from app.models.lead import LeadsCache
+from app.models.lead import CONTENT_COLUMNS, LeadsCache, LeadsCacheContent
 from app.core.parser import parse_task_content
+from app.core.dates import parse_date
+from app.core.normalizer import normalize_task_name
 
 # ============================================================================
 # 1. EL MAPA DE LA VERDAD
@@ -98,17 +99,8 @@ def clean_header(header: str) -> str:
 
 def parse_messy_date(date_str: str) -> datetime:
     if not date_str or not isinstance(date_str, str) or not date_str.strip(): return None
-    try:
-        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except ValueError:
-        pass
-    try:
-        clean = re.sub(r'(?<=\d)(st|nd|rd|th)', '', date_str)
-        dt = date_parser.parse(clean)
-        if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
-        return None
+    # Mismo parser que los webhooks (ISO, formatos de export, caché; UTC aware)
+    return parse_date(date_str)
 
 def normalize_boolean(val: str) -> str:
     if not val: return None
@@ -118,13 +110,10 @@ def normalize_boolean(val: str) -> str:
     return v
 
 def normalize_task_name_for_search(name: str):
-    if not name: return "", ""
-    parts = name.split('|')
-    clean_name = parts[0].strip()
-    normalized = clean_name.upper()
-    import unicodedata
-    normalized = ''.join(c for c in unicodedata.normalize('NFD', normalized) if unicodedata.category(c) != 'Mn')
-    normalized = re.sub(r'[^A-Z0-9\s]', '', normalized)
+    # Misma normalización que los webhooks (app.core.text_utils.normalize_name).
+    # Las filas importadas con la versión anterior (unicodedata) se corrigen con
+    # scripts/renormalize_names.py
+    clean_name, _, normalized = normalize_task_name(name)
     return clean_name, normalized
 
 # ============================================================================
@@ -223,7 +212,12 @@ def process_file(file_path: str, session):
                 lead_dict = process_row(row, file_header_map)
                 lead_dict['task_id'] = task_id
                 
+                # El texto pesado va a leads_cache_content; con la PK puesta,
+                # merge() actualiza la fila existente en vez de insertar otra
+                content = {k: lead_dict.pop(k) for k in CONTENT_COLUMNS if k in lead_dict}
                 lead_obj = LeadsCache(**lead_dict)
+                if content:
+                    lead_obj.content = LeadsCacheContent(task_id=task_id, **content)
                 batch.append(lead_obj)
                 
             except Exception as e:
@@ -6,6 +6,7 @@ Ejecuta:
 1. Creación de tablas (Base.metadata.create_all)
 2. Habilita extensión pg_trgm (para búsqueda fuzzy)
 3. Crea índice GIN en nombre_normalizado
+4. Instala los triggers de conteos de dashboards y los recalcula
 
 Uso:
     python scripts/init_db.py
@@ -18,8 +19,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
 from app.config import settings
 from app.models import Base
+from app.repositories.dashboard_repository import DashboardRepository
 
 
 def init_database():
@@ -34,7 +37,7 @@ def init_database():
     engine = create_engine(settings.database_dsn)
 
     # 1. Crear extensión pg_trgm (requerida para búsqueda fuzzy)
-    print("[1/3] Habilitando extensión pg_trgm...")
+    print("[1/4] Habilitando extensión pg_trgm...")
     with engine.connect() as conn:
         try:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
@@ -45,7 +48,7 @@ def init_database():
             print("    (Puede que ya esté habilitada o que no tengas permisos)")
 
     # 2. Crear todas las tablas
-    print("\n[2/3] Creando tablas...")
+    print("\n[2/4] Creando tablas...")
     try:
         Base.metadata.create_all(bind=engine)
         print("✅ Tablas creadas exitosamente")
@@ -54,7 +57,7 @@ def init_database():
         sys.exit(1)
 
     # 3. Crear índice GIN para búsqueda trigram
-    print("\n[3/3] Creando índice GIN para búsqueda fuzzy...")
+    print("\n[3/4] Creando índice GIN para búsqueda fuzzy...")
     with engine.connect() as conn:
         try:
             # Verificar si el índice ya existe
@@ -79,6 +82,18 @@ def init_database():
             print(f"❌ Error creando índice GIN: {e}")
             print("    La búsqueda fuzzy podría ser lenta sin este índice")
 
+    # 4. Triggers de conteos incrementales (dashboards) + recálculo inicial
+    print(f"\n[4/4] Instalando triggers de dashboards ({settings.dashboard_timezone})...")
+    with Session(engine) as session:
+        try:
+            repo = DashboardRepository(session)
+            repo.install_triggers(settings.dashboard_timezone)
+            written = repo.rebuild(settings.dashboard_timezone)
+            print(f"✅ Triggers instalados; conteos recalculados ({written})")
+        except Exception as e:
+            print(f"❌ Error instalando triggers de dashboards: {e}")
+            print("    /dashboards devolverá conteos vacíos o desactualizados")
+
     print("\n🎉 Base de datos inicializada correctamente!")
     print("\nPróximos pasos:")
     print("1. Usar Alembic para migraciones futuras: alembic revision --autogenerate -m 'descripción'")
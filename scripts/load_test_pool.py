@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del pool de conexiones (app.database.engine).
+
+Fase 1 (saturación): N threads piden conexiones y ejecutan pg_sleep(hold),
+más threads de los que caben en pool_size + max_overflow.
+Fase 2 (recuperación): se detiene la carga y se espera a que el pool
+vuelva a quedar sin conexiones en uso.
+
+Cada intervalo imprime in_use / idle / overflow, timeouts y la espera
+de checkout (p50/p99) tomada de las métricas del pool.
+
+Uso:
+    python scripts/load_test_pool.py [threads] [hold_s] [duracion_s]
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import exc, text
+from app.config import settings
+from app.database import engine, DB_POOL_CHECKOUT_WAIT, DB_POOL_TIMEOUTS
+
+INTERVAL = 0.5
+
+
+def _percentile(q: float) -> float:
+    """Percentil aproximado desde los buckets del histograma de espera."""
+    samples = [s for s in DB_POOL_CHECKOUT_WAIT.samples() if s[0].endswith("_bucket")]
+    total = samples[-1][2] if samples else 0
+    if not total:
+        return 0.0
+    for _, pairs, cumulative in samples:
+        if cumulative >= q * total:
+            le = dict(pairs)["le"]
+            return float("inf") if le == "+Inf" else float(le)
+    return float("inf")
+
+
+def _snapshot(label: str, started: float) -> int:
+    pool = engine.pool
+    in_use = pool.checkedout()
+    print(
+        f"[{label:<8}] t={time.monotonic() - started:6.1f}s "
+        f"in_use={in_use:>3} idle={pool.checkedin():>3} overflow={max(pool.overflow(), 0):>3} "
+        f"timeouts={int(DB_POOL_TIMEOUTS.value()):>4} "
+        f"wait_p50<={_percentile(0.5):.4f}s wait_p99<={_percentile(0.99):.4f}s"
+    )
+    return in_use
+
+
+def _worker(stop: threading.Event, hold: float, stats: dict):
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT pg_sleep(:s)"), {"s": hold})
+            stats["ok"] += 1
+        except exc.TimeoutError:
+            stats["timeout"] += 1
+        except Exception as e:
+            stats["error"] += 1
+            print(f"❌ {e}")
+
+
+def main():
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else capacity * 2
+    hold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    print(f"🔥 Pool: size={settings.db_pool_size} overflow={settings.db_max_overflow} "
+          f"timeout={settings.db_pool_timeout}s lifo={settings.db_pool_use_lifo}")
+    print(f"   {threads} threads, pg_sleep({hold}), {duration}s de carga\n")
+
+    stop = threading.Event()
+    stats = {"ok": 0, "timeout": 0, "error": 0}
+    workers = [threading.Thread(target=_worker, args=(stop, hold, stats), daemon=True) for _ in range(threads)]
+
+    started = time.monotonic()
+    for w in workers:
+        w.start()
+
+    # Fase 1: saturación
+    while time.monotonic() - started < duration:
+        time.sleep(INTERVAL)
+        _snapshot("carga", started)
+
+    # Fase 2: recuperación
+    stop.set()
+    recovery_started = time.monotonic()
+    while True:
+        time.sleep(INTERVAL)
+        if _snapshot("recupera", started) == 0:
+            break
+
+    for w in workers:
+        w.join(timeout=settings.db_pool_timeout)
+
+    print(f"\n✅ Pool recuperado en {time.monotonic() - recovery_started:.2f}s")
+    print(f"   queries ok={stats['ok']} timeouts={stats['timeout']} errores={stats['error']}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga por replay para /webhooks/clickup y /webhooks/assignments.
+
+Un solo comando:
+1. Levanta scripts/fake_clickup.py (tareas sintéticas + Enqueuer falso).
+2. Levanta la app con uvicorn apuntando al fake (CLICKUP_API_BASE_URL) y a
+   la Postgres local de .env / DATABASE_*.
+3. Pre-genera payloads firmados con HMAC-SHA256 (un secreto por endpoint)
+   y los reproduce en lazo abierto a una tasa fija (req/s).
+4. Reporta throughput, p50/p95/p99 por endpoint y desglose de errores.
+
+Con --target se usa una app ya levantada (los secretos deben coincidir).
+--max-error-rate / --max-p95-ms hacen que el comando salga con código 1,
+para detectar regresiones en la ingesta.
+
+Uso:
+    python scripts/load_test_webhooks.py --rate 50 --duration 30
+    python scripts/load_test_webhooks.py --target http://127.0.0.1:8000 --json-out results.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+
+LEADS_SECRET = os.getenv("CLICKUP_WEBHOOK_SECRET", "bench-leads-secret")
+ASSIGNMENTS_SECRET = os.getenv("CLICKUP_WEBHOOK_SECRET_ASSIGNMENTS", "bench-assignments-secret")
+TRIGGER_FIELD = os.getenv("CLICKUP_TRIGGER_CONDICIONAL", "Link Intake")
+
+
+def sign(body: bytes, secret: str) -> str:
+    return hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def build_requests(total: int, n_tasks: int, leads_ratio: float, invalid_ratio: float, seed: int) -> List[Tuple[str, bytes, Dict]]:
+    """Payloads firmados de antemano: el costo del cliente no entra en la medición."""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(total):
+        task_id = f"bench{rng.randrange(n_tasks):07d}"
+        if rng.random() < leads_ratio:
+            path, secret = "/webhooks/clickup", LEADS_SECRET
+            payload = {
+                "event": rng.choice(["taskUpdated", "taskUpdated", "taskCreated"]),
+                "task_id": task_id,
+                "webhook_id": "bench-webhook-leads",
+                "history_items": [{"id": str(i), "field": "status", "date": str(int(time.time() * 1000))}],
+            }
+        else:
+            path, secret = "/webhooks/assignments", ASSIGNMENTS_SECRET
+            payload = {"event": "taskUpdated", "task_id": task_id, "webhook_id": "bench-webhook-assignments"}
+
+        body = json.dumps(payload).encode("utf-8")
+        signature = sign(body, secret)
+        if rng.random() < invalid_ratio:
+            signature = "0" * 64
+        requests.append((path, body, {"Content-Type": "application/json", "X-Signature": signature}))
+    return requests
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+async def replay(base_url: str, requests, rate: float, max_inflight: int, timeout: float) -> Dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    statuses: Counter = Counter()
+    dropped = 0
+    inflight = 0
+
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def fire(path: str, body: bytes, headers: Dict):
+            nonlocal inflight
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, content=body, headers=headers)
+                statuses[f"{path} {response.status_code}"] += 1
+                if response.status_code >= 400:
+                    errors[f"{path} http_{response.status_code}"] += 1
+                else:
+                    latencies[path].append(time.perf_counter() - start)
+            except httpx.HTTPError as e:
+                errors[f"{path} {type(e).__name__}"] += 1
+            finally:
+                inflight -= 1
+
+        tasks = []
+        start = time.perf_counter()
+        for i, (path, body, headers) in enumerate(requests):
+            # Lazo abierto: la tasa no baja si la app se degrada
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if inflight >= max_inflight:
+                dropped += 1
+                errors[f"{path} client_dropped"] += 1
+                continue
+            inflight += 1
+            tasks.append(asyncio.create_task(fire(path, body, headers)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    ok = sum(len(v) for v in latencies.values())
+    failed = sum(errors.values())
+    report = {
+        "sent": len(requests),
+        "ok": ok,
+        "errors": failed,
+        "dropped": dropped,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "target_rps": rate,
+        "error_rate": round(failed / len(requests), 4) if requests else 0.0,
+        "endpoints": {},
+        "error_breakdown": dict(errors.most_common()),
+        "status_codes": dict(statuses.most_common()),
+    }
+    all_latencies = sorted(v for values in latencies.values() for v in values)
+    for path, values in list(latencies.items()) + [("all", all_latencies)]:
+        values = sorted(values)
+        report["endpoints"][path] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+        }
+    return report
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"El proceso terminó antes de estar listo ({url})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timeout esperando {url}")
+
+
+def launch(args) -> Tuple[str, List[subprocess.Popen]]:
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "CLICKUP_API_TOKEN": os.getenv("CLICKUP_API_TOKEN", "pk_bench"),
+        "CLICKUP_FIELD_ID_AI_LINK": os.getenv("CLICKUP_FIELD_ID_AI_LINK", "bench-ai-link-field"),
+        "CLICKUP_WEBHOOK_SECRET": LEADS_SECRET,
+        "CLICKUP_WEBHOOK_SECRET_ASSIGNMENTS": ASSIGNMENTS_SECRET,
+        "CLICKUP_TRIGGER_CONDICIONAL": TRIGGER_FIELD,
+        "CLICKUP_API_BASE_URL": f"{fake_url}/api/v2",
+        # El ClickUp falso no limita: se mide la app, no el limitador
+        "CLICKUP_RATE_LIMIT_PER_MINUTE": os.getenv("CLICKUP_RATE_LIMIT_PER_MINUTE", "0"),
+        "CLICKUP_MAX_CONCURRENCY": os.getenv("CLICKUP_MAX_CONCURRENCY", "1000"),
+        "EXTERNAL_DISPATCH_ENABLED": "true",
+        "EXTERNAL_DISPATCH_URL": f"{fake_url}/enqueue",
+        "EXTERNAL_DISPATCH_CALLBACK_BASE_URL": app_url,
+        "GOOGLE_SHEETS_ENABLED": "false",
+        "FAKE_CLICKUP_LATENCY_MS": str(args.clickup_latency_ms),
+    }
+    procs = []
+    fake = subprocess.Popen([sys.executable, str(ROOT / "scripts" / "fake_clickup.py"), str(args.fake_port)], cwd=ROOT, env=env)
+    procs.append(fake)
+    _wait_ready(f"{fake_url}/api/v2/task/bench0000000", fake)
+
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    procs.append(app)
+    _wait_ready(f"{app_url}/health", app)
+    return app_url, procs
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n📊 {report['sent']} peticiones en {report['elapsed_s']}s "
+          f"(objetivo {report['target_rps']} req/s)")
+    print(f"   throughput: {report['throughput_rps']} req/s | errores: {report['errors']} "
+          f"({report['error_rate']:.2%}) | descartadas: {report['dropped']}")
+    print(f"\n{'endpoint':<24}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for path, stats in report["endpoints"].items():
+        print(f"{path:<24}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+    if report["error_breakdown"]:
+        print("\n❌ Errores:")
+        for key, count in report["error_breakdown"].items():
+            print(f"   {key}: {count}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=50.0, help="Peticiones por segundo")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de replay")
+    parser.add_argument("--leads-ratio", type=float, default=0.8, help="Fracción al webhook de leads (resto: assignments)")
+    parser.add_argument("--invalid-ratio", type=float, default=0.0, help="Fracción con firma inválida (espera 401)")
+    parser.add_argument("--tasks", type=int, default=1000, help="Task IDs distintos")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", help="URL de una app ya levantada (no lanza procesos)")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--fake-port", type=int, default=8099)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--clickup-latency-ms", type=float, default=0.0)
+    parser.add_argument("--json-out", help="Guardar el reporte en JSON")
+    parser.add_argument("--max-error-rate", type=float, help="Falla (exit 1) si se supera")
+    parser.add_argument("--max-p95-ms", type=float, help="Falla (exit 1) si el p95 global lo supera")
+    args = parser.parse_args(argv)
+
+    total = int(args.rate * args.duration)
+    requests = build_requests(total, args.tasks, args.leads_ratio, args.invalid_ratio, args.seed)
+
+    procs: List[subprocess.Popen] = []
+    try:
+        base_url = args.target
+        if not base_url:
+            base_url, procs = launch(args)
+        print(f"🚀 Replay de {total} webhooks a {base_url} ({args.rate} req/s)")
+        report = asyncio.run(replay(base_url, requests, args.rate, args.max_inflight, args.timeout))
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json_out"}
+    print_report(report)
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Reporte guardado en {args.json_out}")
+
+    # Los 401 buscados con --invalid-ratio no cuentan como regresión
+    expected_401 = sum(v for k, v in report["error_breakdown"].items() if k.endswith("http_401")) if args.invalid_ratio else 0
+    error_rate = (report["errors"] - expected_401) / report["sent"] if report["sent"] else 0.0
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        print(f"\n🚨 Tasa de error {error_rate:.2%} > {args.max_error_rate:.2%}")
+        return 1
+    if args.max_p95_ms is not None and report["endpoints"]["all"]["p95_ms"] > args.max_p95_ms:
+        print(f"\n🚨 p95 {report['endpoints']['all']['p95_ms']} ms > {args.max_p95_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Migra case_assignments.raw_data de json a jsonb podado (app/core/raw_data.py).
+
+ALTER COLUMN ... TYPE jsonb reescribiría la tabla entera bajo un lock
+exclusivo. En su lugar:
+
+1. Mide el almacenamiento (tabla, TOAST, suma de pg_column_size(raw_data)).
+2. Añade la columna raw_data_jsonb (opcional: SET COMPRESSION lz4, PG >= 14).
+3. La rellena por lotes con paginación keyset, podando en Python con el mismo
+   perfil que el webhook (commit por lote, pausa entre lotes).
+4. En una transacción corta con LOCK TABLE: repasa las filas que el webhook
+   tocó durante el relleno (synced_at >= inicio), borra raw_data y renombra
+   raw_data_jsonb -> raw_data.
+5. Vuelve a medir.
+
+Si la columna ya es jsonb, solo vuelve a podar por lotes las filas que
+cambian (útil tras editar el perfil). Es idempotente y se puede relanzar.
+
+Ejecutar ANTES de desplegar el código que compara raw_data en el upsert
+(json no tiene operador de igualdad).
+
+El espacio de la columna antigua no vuelve al sistema hasta reescribir la
+tabla (VACUUM FULL o pg_repack); --vacuum solo hace VACUUM ANALYZE.
+
+Uso:
+    python scripts/migrate_raw_data_jsonb.py [--batch-size 500] [--pause 0.2]
+        [--compression lz4] [--dry-run] [--measure-only] [--vacuum]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from sqlalchemy import text
+from app.core.raw_data import prune_raw
+from app.database import SessionLocal, engine
+
+
+TABLE = "case_assignments"
+TEMP_COLUMN = "raw_data_jsonb"
+
+COLUMN_TYPE = text(
+    "SELECT data_type FROM information_schema.columns "
+    "WHERE table_name = :table AND column_name = :column"
+)
+STORAGE = text(
+    f"SELECT pg_total_relation_size('{TABLE}'), pg_relation_size('{TABLE}'), "
+    f"COALESCE(pg_total_relation_size(NULLIF(reltoastrelid, 0)), 0), pg_indexes_size('{TABLE}') "
+    f"FROM pg_class WHERE relname = '{TABLE}'"
+)
+COLUMN_SIZE = text(
+    f"SELECT count(*), count(raw_data), COALESCE(sum(pg_column_size(raw_data)), 0), "
+    f"COALESCE(sum(octet_length(raw_data::text)), 0) FROM {TABLE}"
+)
+SELECT_BATCH = text(
+    f"SELECT task_id, raw_data FROM {TABLE} WHERE task_id > :after ORDER BY task_id LIMIT :limit"
+)
+SELECT_TOUCHED = text(
+    f"SELECT task_id, raw_data FROM {TABLE} "
+    f"WHERE synced_at >= :since OR ({TEMP_COLUMN} IS NULL AND raw_data IS NOT NULL)"
+)
+FILL_TEMP = text(f"UPDATE {TABLE} SET {TEMP_COLUMN} = CAST(:raw AS JSONB) WHERE task_id = :task_id")
+REPRUNE = text(f"UPDATE {TABLE} SET raw_data = CAST(:raw AS JSONB) WHERE task_id = :task_id")
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:,.1f} MB"
+
+
+def measure(session, label: str) -> dict:
+    total, heap, toast, indexes = session.execute(STORAGE).one()
+    rows, with_raw, stored, logical = session.execute(COLUMN_SIZE).one()
+    session.rollback()
+    print(f"\n📏 {label}")
+    print(f"   Tabla total {_mb(total)} | heap {_mb(heap)} | TOAST {_mb(toast)} | índices {_mb(indexes)}")
+    print(f"   raw_data: {with_raw}/{rows} filas | almacenado {_mb(stored)} | texto {_mb(logical)}"
+          f" | media {stored / max(with_raw, 1):,.0f} B/fila")
+    return {"total": total, "stored": stored, "logical": logical}
+
+
+def _dump(raw) -> str:
+    return orjson.dumps(prune_raw(raw)).decode("utf-8")
+
+
+def _batches(session, batch_size: int, pause: float):
+    after = ""
+    while True:
+        rows = session.execute(SELECT_BATCH, {"after": after, "limit": batch_size}).all()
+        if not rows:
+            return
+        after = rows[-1][0]
+        yield after, rows
+        if pause:
+            time.sleep(pause)
+
+
+def backfill(session, args, statement, only_changed: bool) -> int:
+    scanned = written = 0
+    after = ""
+    try:
+        for after, rows in _batches(session, args.batch_size, args.pause):
+            updates = [
+                {"task_id": task_id, "raw": _dump(raw)}
+                for task_id, raw in rows
+                if raw is not None and not (only_changed and prune_raw(raw) == raw)
+            ]
+            scanned += len(rows)
+            if updates and not args.dry_run:
+                session.execute(statement, updates)
+                session.commit()
+            else:
+                session.rollback()  # cierra la transacción de lectura entre lotes
+            written += len(updates)
+            print(f"   ⏳ Revisadas {scanned} | Escritas {written} | último task_id {after}", end="\r")
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ Error: {e} (último task_id {after}); relanzar es seguro")
+        raise
+    print()
+    return written
+
+
+def swap_columns(session, since) -> int:
+    """Transacción corta: repasa lo tocado durante el relleno y cambia las columnas."""
+    session.execute(text("SET LOCAL lock_timeout = '5s'"))
+    session.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    touched = session.execute(SELECT_TOUCHED, {"since": since}).all()
+    updates = [{"task_id": task_id, "raw": _dump(raw)} for task_id, raw in touched if raw is not None]
+    if updates:
+        session.execute(FILL_TEMP, updates)
+    session.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN raw_data"))
+    session.execute(text(f"ALTER TABLE {TABLE} RENAME COLUMN {TEMP_COLUMN} TO raw_data"))
+    session.execute(text(f"COMMENT ON COLUMN {TABLE}.raw_data IS 'Copia podada del JSON de ClickUp'"))
+    session.commit()
+    return len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.2, help="Segundos entre lotes")
+    parser.add_argument("--compression", choices=["pglz", "lz4"], help="Compresión TOAST de la columna nueva (PG >= 14)")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    parser.add_argument("--measure-only", action="store_true", help="Solo medir el almacenamiento")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM ANALYZE al terminar")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    start = time.perf_counter()
+    try:
+        before = measure(session, "Antes")
+        if args.measure_only:
+            return
+
+        column_type = session.execute(COLUMN_TYPE, {"table": TABLE, "column": "raw_data"}).scalar()
+        session.rollback()
+
+        if column_type == "jsonb":
+            print("\n🔁 raw_data ya es jsonb: se vuelve a podar lo que cambie con el perfil actual")
+            written = backfill(session, args, REPRUNE, only_changed=True)
+            print(f"✅ {written} filas {'a podar (dry-run)' if args.dry_run else 'podadas'}")
+        else:
+            print(f"\n🔄 raw_data es {column_type}: relleno de {TEMP_COLUMN} por lotes")
+            since = session.execute(text("SELECT now()")).scalar()
+            if not args.dry_run:
+                session.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS {TEMP_COLUMN} JSONB"))
+                if args.compression:
+                    version = session.execute(text("SHOW server_version_num")).scalar()
+                    if int(version) >= 140000:
+                        session.execute(text(f"ALTER TABLE {TABLE} ALTER COLUMN {TEMP_COLUMN} SET COMPRESSION {args.compression}"))
+                    else:
+                        print(f"⚠️  PostgreSQL {version} no admite SET COMPRESSION; se usa la compresión por defecto")
+            session.commit()
+
+            written = backfill(session, args, FILL_TEMP, only_changed=False)
+            if args.dry_run:
+                print(f"✅ {written} filas a convertir (dry-run)")
+                return
+            caught_up = swap_columns(session, since)
+            print(f"✅ {written} filas convertidas; {caught_up} repasadas durante el cambio de columna")
+
+        after = measure(session, "Después")
+        if before["stored"]:
+            print(f"\n📉 raw_data almacenado: {_mb(before['stored'])} -> {_mb(after['stored'])}"
+                  f" ({after['stored'] / before['stored']:.0%})")
+        print("   El espacio de la columna anterior se libera con VACUUM FULL / pg_repack")
+    finally:
+        session.close()
+
+    if args.vacuum and not args.dry_run:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM ANALYZE {TABLE}"))
+        print("🧹 VACUUM ANALYZE completado")
+
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
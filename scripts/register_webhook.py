@@ -35,7 +35,9 @@ def register_and_show_secret():
             "taskCreated",
             "taskUpdated",
             "taskMoved",
-            "taskStatusUpdated"
+            "taskStatusUpdated",
+            "taskCommentPosted",
+            "taskCommentUpdated"
         ],
         "list_id": int(CLICKUP_LIST_ID)
     }
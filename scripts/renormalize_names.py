@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Recalcula nombre_normalizado con el motor único (app.core.text_utils.normalize_name).
+
+El importador histórico usaba su propia normalización (unicodedata, sin
+squish de espacios ni transliteración de ß/Ø/đ...), así que esas filas no
+coinciden con lo que busca /leads/search. Este job:
+
+- Recorre leads_cache por task_id con paginación keyset (sin OFFSET).
+- Recalcula desde task_name (igual que el webhook) o nombre_clickup.
+- Actualiza solo las filas que cambian, un UPDATE por lote y commit por lote.
+- Pausa entre lotes para no competir con el tráfico en línea.
+- Invalida el caché de respuestas de las filas corregidas.
+
+Es idempotente: se puede cortar y relanzar (--start-after retoma).
+
+Uso:
+    python scripts/renormalize_names.py [--batch-size 1000] [--pause 0.2] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.core.cache import COLLECTION_TAG, response_cache
+from app.core.normalizer import normalize_task_name
+from app.core.text_utils import normalize_name
+from app.database import SessionLocal
+
+
+SELECT_BATCH = text(
+    "SELECT task_id, task_name, nombre_clickup, nombre_normalizado FROM leads_cache "
+    "WHERE task_id > :after ORDER BY task_id LIMIT :limit"
+)
+UPDATE_ROW = text("UPDATE leads_cache SET nombre_normalizado = :normalized WHERE task_id = :task_id")
+
+
+def expected_normalized(task_name, nombre_clickup) -> str:
+    if task_name:
+        return normalize_task_name(task_name)[2]
+    return normalize_name(nombre_clickup or "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.2, help="Segundos entre lotes")
+    parser.add_argument("--start-after", default="", help="Retomar después de este task_id")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    after = args.start_after
+    scanned = changed = 0
+    start = time.perf_counter()
+
+    try:
+        while True:
+            rows = session.execute(SELECT_BATCH, {"after": after, "limit": args.batch_size}).all()
+            if not rows:
+                break
+
+            updates = [
+                {"task_id": task_id, "normalized": normalized}
+                for task_id, task_name, nombre_clickup, current in rows
+                for normalized in [expected_normalized(task_name, nombre_clickup)]
+                if normalized != (current or "")
+            ]
+            scanned += len(rows)
+            after = rows[-1][0]
+
+            if updates and not args.dry_run:
+                session.execute(UPDATE_ROW, updates)
+                session.commit()
+                for update in updates:
+                    response_cache.invalidate_task(update["task_id"])
+            else:
+                session.rollback()  # cierra la transacción de lectura entre lotes
+            changed += len(updates)
+
+            print(f"   ⏳ Revisadas {scanned} | A corregir {changed} | último task_id {after}", end="\r")
+            if args.pause:
+                time.sleep(args.pause)
+
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ Error: {e}. Retomar con --start-after {after}")
+        raise
+    finally:
+        session.close()
+
+    if changed and not args.dry_run:
+        response_cache.invalidate(COLLECTION_TAG)
+
+    action = "a corregir (dry-run)" if args.dry_run else "corregidas"
+    print(f"\n✅ {scanned} filas revisadas, {changed} {action} en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
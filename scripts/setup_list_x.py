@@ -67,7 +67,9 @@ def verify_field_and_create_webhook():
         "endpoint": WEBHOOK_URL,
         "events": [
             "taskCreated",
-            "taskUpdated"
+            "taskUpdated",
+            "taskCommentPosted",
+            "taskCommentUpdated"
         ],
         "list_id": int(LIST_ID_X)
     }
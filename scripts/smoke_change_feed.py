@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Prueba del feed de cambios (app.services.change_feed) contra un Postgres local.
+
+Arranca el listener LISTEN/NOTIFY en el proceso, se suscribe con los filtros
+dados y hace --leads upserts de leads de prueba (task_id smoke-*) y
+--assignments upserts de Case Assignments con los repositorios reales.
+Comprueba que cada cambio llega una vez al suscriptor (los que pasan el
+filtro), la latencia commit -> aviso, y que lead_changes permite retomar
+desde un seq intermedio. Al final borra las filas de prueba (salvo --keep).
+
+Requiere las tablas de scripts/init_db.py (incluida lead_changes) y
+CHANGE_FEED_ENABLED=true.
+
+Uso:
+    python scripts/smoke_change_feed.py [--leads 20] [--assignments 5]
+        [--status open] [--keep]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import CaseAssignment, LeadChange, LeadsCache
+from app.repositories.assignment_repository import AssignmentRepository
+from app.repositories.lead_repository import LeadRepository
+from app.services.change_feed import change_feed, read_changes
+
+PREFIX = "smoke-"
+
+
+def _upsert(kind: str, index: int, status: str) -> float:
+    db = SessionLocal()
+    try:
+        data = {
+            "task_id": f"{PREFIX}{kind[0]}{index}",
+            "task_name": f"Smoke {kind} {index}",
+            "status": status,
+            "list_name": "Smoke",
+            "date_updated": datetime.now(timezone.utc),
+        }
+        if kind == "lead":
+            LeadRepository(db).upsert(data)
+        else:
+            AssignmentRepository(db).upsert(data)
+        return time.perf_counter()
+    finally:
+        db.close()
+
+
+def _cleanup() -> None:
+    db = SessionLocal()
+    try:
+        for model in (LeadChange, CaseAssignment, LeadsCache):
+            db.execute(delete(model).where(model.task_id.like(f"{PREFIX}%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def main(args) -> int:
+    if not settings.change_feed_enabled:
+        print("❌ CHANGE_FEED_ENABLED=false: los upserts no escriben en lead_changes")
+        return 1
+    change_feed.start()
+    # Espera a que el LISTEN esté activo
+    for _ in range(100):
+        if change_feed.connected:
+            break
+        await asyncio.sleep(0.1)
+    if not change_feed.connected:
+        print("❌ El listener no pudo conectarse a Postgres")
+        return 1
+    print(f"📡 Escuchando desde seq {change_feed.last_seq}")
+
+    statuses = ["open", "closed"]
+    subscription = change_feed.subscribe(statuses=[args.status])
+    start_seq = change_feed.last_seq
+
+    expected, committed_at = set(), {}
+    for i in range(args.leads + args.assignments):
+        kind = "lead" if i < args.leads else "assignment"
+        status = statuses[i % 2]
+        task_id = f"{PREFIX}{kind[0]}{i}"
+        committed_at[task_id] = await asyncio.to_thread(_upsert, kind, i, status)
+        if status == args.status:
+            expected.add(task_id)
+
+    received, latencies = [], []
+    deadline = time.perf_counter() + 5
+    while len(received) < len(expected) and time.perf_counter() < deadline:
+        try:
+            event = await asyncio.wait_for(subscription.queue.get(), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        if event and event["task_id"].startswith(PREFIX):
+            received.append(event["task_id"])
+            latencies.append((time.perf_counter() - committed_at[event["task_id"]]) * 1000)
+
+    ok = sorted(received) == sorted(expected)
+    print(f"{'✅' if ok else '❌'} Avisos: {len(received)}/{len(expected)} (status={args.status})")
+    if latencies:
+        latencies.sort()
+        print(f"⏱️  commit -> aviso: p50 {latencies[len(latencies) // 2]:.1f} ms, máx {latencies[-1]:.1f} ms")
+
+    # Retomar: desde la mitad, la tabla devuelve el resto en orden
+    middle = start_seq + (args.leads + args.assignments) // 2
+    rows = await asyncio.to_thread(read_changes, middle, 1000)
+    rows = [r for r in rows if r["task_id"].startswith(PREFIX)]
+    ordered = [r["seq"] for r in rows] == sorted(r["seq"] for r in rows)
+    print(f"{'✅' if ordered else '❌'} Retomar desde seq {middle}: {len(rows)} cambios")
+
+    change_feed.unsubscribe(subscription)
+    await change_feed.stop()
+    if not args.keep:
+        await asyncio.to_thread(_cleanup)
+        print("🧹 Filas de prueba borradas")
+    return 0 if ok and ordered else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--leads", type=int, default=20)
+    parser.add_argument("--assignments", type=int, default=5)
+    parser.add_argument("--status", default="open", help="Filtro de la suscripción")
+    parser.add_argument("--keep", action="store_true", help="No borrar las filas de prueba")
+    sys.exit(asyncio.run(main(parser.parse_args())))
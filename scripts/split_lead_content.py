@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Separa el texto pesado de leads_cache en la tabla 1:1 leads_cache_content.
+
+Migración en línea, en dos pasos:
+
+1. (por defecto) Con el código anterior aún desplegado:
+   - Crea leads_cache_content (con content_hash generado).
+   - Instala un trigger en leads_cache que copia task_content, latest_comment
+     e interview_other a la tabla nueva en cada INSERT/UPDATE de esas columnas,
+     así nada se pierde mientras el código viejo siga escribiéndolas.
+   - Copia las filas existentes por lotes (keyset, INSERT ... SELECT en el
+     servidor, ON CONFLICT DO NOTHING: lo que ya copió el trigger es más nuevo).
+
+2. --finalize, después de desplegar el código que usa leads_cache_content:
+   - Verifica que ninguna fila con contenido quedó sin copiar.
+   - Elimina el trigger y las columnas pesadas de leads_cache.
+
+El código nuevo no lee ni escribe las columnas viejas, así que funciona con o
+sin ellas. Ambos pasos son idempotentes.
+
+Uso:
+    python scripts/split_lead_content.py [--batch-size 2000] [--pause 0.1]
+    python scripts/split_lead_content.py --finalize [--vacuum]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.database import SessionLocal, engine
+from app.models.lead import CONTENT_COLUMNS, LeadsCacheContent, content_hash_sql
+
+
+COLUMNS = ", ".join(CONTENT_COLUMNS)
+HAS_CONTENT = " OR ".join(f"l.{c} IS NOT NULL" for c in CONTENT_COLUMNS)
+
+CREATE_TRIGGER = [
+    text(f"""
+        CREATE OR REPLACE FUNCTION leads_cache_copy_content() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO leads_cache_content (task_id, {COLUMNS})
+            VALUES (NEW.task_id, {", ".join(f"NEW.{c}" for c in CONTENT_COLUMNS)})
+            ON CONFLICT (task_id) DO UPDATE SET
+                {", ".join(f"{c} = EXCLUDED.{c}" for c in CONTENT_COLUMNS)}, updated_at = now()
+            WHERE leads_cache_content.content_hash IS DISTINCT FROM
+                {content_hash_sql(lambda c: f"EXCLUDED.{c}")};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """),
+    text("DROP TRIGGER IF EXISTS leads_cache_content_sync ON leads_cache"),
+    text(f"""
+        CREATE TRIGGER leads_cache_content_sync
+        AFTER INSERT OR UPDATE OF {COLUMNS} ON leads_cache
+        FOR EACH ROW EXECUTE FUNCTION leads_cache_copy_content()
+    """),
+]
+
+COPY_BATCH = text(f"""
+    WITH batch AS (
+        SELECT task_id, {COLUMNS} FROM leads_cache
+        WHERE task_id > :after ORDER BY task_id LIMIT :limit
+    ), copied AS (
+        INSERT INTO leads_cache_content (task_id, {COLUMNS})
+        SELECT task_id, {COLUMNS} FROM batch
+        ON CONFLICT (task_id) DO NOTHING
+        RETURNING 1
+    )
+    SELECT (SELECT max(task_id) FROM batch), (SELECT count(*) FROM batch), (SELECT count(*) FROM copied)
+""")
+
+MISSING = text(f"""
+    SELECT count(*) FROM leads_cache l
+    LEFT JOIN leads_cache_content c ON c.task_id = l.task_id
+    WHERE c.task_id IS NULL AND ({HAS_CONTENT})
+""")
+
+TABLE_SIZES = text(
+    "SELECT relname, pg_relation_size(oid), "
+    "COALESCE(pg_total_relation_size(NULLIF(reltoastrelid, 0)), 0) "
+    "FROM pg_class WHERE relname IN ('leads_cache', 'leads_cache_content') ORDER BY relname"
+)
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1024 / 1024:,.1f} MB"
+
+
+def print_sizes(session, label: str) -> None:
+    print(f"\n📏 {label}")
+    for name, heap, toast in session.execute(TABLE_SIZES).all():
+        print(f"   {name:<22} heap {_mb(heap):>12} | TOAST {_mb(toast):>12}")
+    session.rollback()
+
+
+def _legacy_columns(session) -> int:
+    count = session.execute(
+        text(
+            "SELECT count(*) FROM information_schema.columns "
+            "WHERE table_name = 'leads_cache' AND column_name = ANY(:columns)"
+        ),
+        {"columns": list(CONTENT_COLUMNS)},
+    ).scalar()
+    session.rollback()
+    return count
+
+
+def copy_phase(session, args) -> None:
+    LeadsCacheContent.__table__.create(bind=engine, checkfirst=True)
+    for statement in CREATE_TRIGGER:
+        session.execute(statement)
+    session.commit()
+    print("✅ leads_cache_content creada y trigger de sincronización instalado")
+
+    after = ""
+    scanned = copied = 0
+    try:
+        while True:
+            last, in_batch, inserted = session.execute(
+                COPY_BATCH, {"after": after, "limit": args.batch_size}
+            ).one()
+            session.commit()
+            if not in_batch:
+                break
+            after = last
+            scanned += in_batch
+            copied += inserted
+            print(f"   ⏳ Revisadas {scanned} | Copiadas {copied} | último task_id {after}", end="\r")
+            if args.pause:
+                time.sleep(args.pause)
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ Error: {e} (último task_id {after}); relanzar es seguro")
+        raise
+
+    print(f"\n✅ {scanned} filas revisadas, {copied} copiadas (el resto ya las había copiado el trigger)")
+    print("   Siguiente paso: desplegar el código nuevo y ejecutar --finalize")
+
+
+def finalize_phase(session) -> None:
+    missing = session.execute(MISSING).scalar()
+    if missing:
+        session.rollback()
+        print(f"❌ {missing} filas con contenido sin copiar; ejecutar primero el paso de copia")
+        sys.exit(1)
+
+    session.execute(text("SET LOCAL lock_timeout = '5s'"))
+    session.execute(text("DROP TRIGGER IF EXISTS leads_cache_content_sync ON leads_cache"))
+    session.execute(text("DROP FUNCTION IF EXISTS leads_cache_copy_content()"))
+    session.execute(text(
+        "ALTER TABLE leads_cache " + ", ".join(f"DROP COLUMN IF EXISTS {c}" for c in CONTENT_COLUMNS)
+    ))
+    session.commit()
+    print("✅ Trigger eliminado y columnas pesadas retiradas de leads_cache")
+    print("   El espacio se libera al reescribir la tabla (VACUUM FULL / pg_repack)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--pause", type=float, default=0.1, help="Segundos entre lotes")
+    parser.add_argument("--finalize", action="store_true", help="Quitar trigger y columnas pesadas")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM ANALYZE de ambas tablas al terminar")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    start = time.perf_counter()
+    try:
+        if args.finalize:
+            if not _legacy_columns(session):
+                print("ℹ️  leads_cache ya no tiene columnas pesadas; nada que hacer")
+                return
+            print_sizes(session, "Antes")
+            finalize_phase(session)
+        else:
+            if not _legacy_columns(session):
+                print("ℹ️  leads_cache ya no tiene columnas pesadas; nada que copiar")
+                return
+            copy_phase(session, args)
+        print_sizes(session, "Después")
+    finally:
+        session.close()
+
+    if args.vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE leads_cache"))
+            conn.execute(text("VACUUM ANALYZE leads_cache_content"))
+        print("🧹 VACUUM ANALYZE completado")
+
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
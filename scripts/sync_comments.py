@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Backfill de comentarios: latest_comment / comment_count desde la API de ClickUp.
+
+Recorre leads_cache y/o case_assignments por task_id (paginación keyset) y
+sincroniza lotes de tareas con CommentSyncService: las peticiones de un lote
+van en paralelo bajo el limitador compartido (CLICKUP_RATE_LIMIT_PER_MINUTE,
+CLICKUP_MAX_CONCURRENCY), y solo se escriben las filas que cambian.
+
+Después del backfill, los webhooks de comentario mantienen los datos al día.
+Es idempotente: se puede cortar y relanzar (--start-after retoma).
+
+Uso:
+    python scripts/sync_comments.py [--target leads|assignments|all] [--batch-size 50]
+        [--only-missing] [--start-after TASK_ID] [--task-id ID ...]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import text
+from app.config import settings
+from app.database import SessionLocal
+from app.services.clickup_service import ClickUpService
+from app.services.comment_sync_service import TARGETS, CommentSyncService
+
+
+SELECT_IDS = {
+    "leads": (
+        "SELECT task_id FROM leads_cache WHERE task_id > :after {missing} ORDER BY task_id LIMIT :limit",
+        "AND COALESCE(comment_count, 0) = 0",
+    ),
+    "assignments": (
+        "SELECT task_id FROM case_assignments WHERE task_id > :after {missing} ORDER BY task_id LIMIT :limit",
+        "AND latest_comment IS NULL",
+    ),
+}
+
+
+async def backfill(target: str, args, service: CommentSyncService) -> None:
+    sql, missing = SELECT_IDS[target]
+    select_ids = text(sql.format(missing=missing if args.only_missing else ""))
+    session = SessionLocal()
+    after = args.start_after
+    totals = {target: 0, "failed": 0}
+    scanned = 0
+    start = time.perf_counter()
+
+    print(f"\n💬 {target}: sincronizando comentarios (lotes de {args.batch_size})")
+    try:
+        while True:
+            task_ids = list(session.execute(select_ids, {"after": after, "limit": args.batch_size}).scalars())
+            session.rollback()  # cierra la transacción de lectura entre lotes
+            if not task_ids:
+                break
+
+            result = await service.sync(task_ids, (target,))
+            for key in totals:
+                totals[key] += result.get(key, 0)
+            scanned += len(task_ids)
+            after = task_ids[-1]
+            rate = scanned / (time.perf_counter() - start)
+            print(f"   ⏳ {scanned} tareas | actualizadas {totals[target]} | errores {totals['failed']}"
+                  f" | {rate:.1f} tareas/s | último task_id {after}", end="\r")
+    except Exception as e:
+        print(f"\n❌ Error: {e}. Retomar con --start-after {after}")
+        raise
+    finally:
+        session.close()
+
+    print(f"\n✅ {target}: {scanned} tareas, {totals[target]} actualizadas, {totals['failed']} con error"
+          f" en {time.perf_counter() - start:.1f}s")
+
+
+async def main_async(args) -> None:
+    targets = TARGETS if args.target == "all" else (args.target,)
+    async with httpx.AsyncClient() as client:
+        service = CommentSyncService(ClickUpService(client))
+        if args.task_id:
+            print(await service.sync(args.task_id, targets))
+            return
+        for target in targets:
+            await backfill(target, args, service)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["leads", "assignments", "all"], default="all")
+    parser.add_argument("--batch-size", type=int, default=settings.comment_sync_batch_size)
+    parser.add_argument("--only-missing", action="store_true", help="Solo filas sin comentarios sincronizados")
+    parser.add_argument("--start-after", default="", help="Retomar después de este task_id")
+    parser.add_argument("--task-id", nargs="+", help="Sincronizar solo estas tareas")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Corpus sintético y determinista para benchmarks y pruebas de carga.
+
+- make_intake_description(): descripción de intake con las etiquetas que
+  espera app.core.parser (Name, Phone, Location ====, My Case ID, VAWA...).
+- make_task(): JSON de tarea de ClickUp (GET /task/{id}) con 50+ custom
+  fields de todos los tipos (drop_down, labels, date, checkbox, url, users...),
+  incluidos los de AssignmentService.ID_MAP y los que mapea LeadService.
+- make_webhook_payload(): cuerpo de un webhook de ClickUp con history_items.
+
+Mismo índice + misma semilla => mismo contenido, para comparar entre commits.
+
+Uso:
+    python scripts/synthetic_corpus.py 3   # imprime 3 tareas de ejemplo
+"""
+
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.assignment_service import AssignmentService
+
+FIRST_NAMES = ["José", "María", "Ángel", "Lucía", "Nuñez", "Sofía", "Jesús", "Andrés", "Fátima", "Iñaki", "John", "Kateryna"]
+LAST_NAMES = ["López", "García-Pérez", "Hernández", "O'Connor", "Muñoz", "Ramírez", "de la Cruz", "Zúñiga", "Smith", "Nguyễn"]
+CITIES = ["Houston, TX", "Los Angeles, CA", "Miami, FL", "Chicago, IL", "Phoenix, AZ"]
+STATUSES = ["new lead", "contacted", "interview done", "closed"]
+CASE_TYPES = ["VAWA", "Visa T", "Visa U", "Asilo", "Ajuste de estatus", "Perdón I-601A"]
+DATE_FORMATS = [
+    lambda d: d.strftime("%B %d") + "th " + d.strftime("%Y"),  # May 21th 2024 (ordinal)
+    lambda d: d.strftime("%Y-%m-%d"),
+    lambda d: d.strftime("%m/%d/%Y"),
+    lambda d: d.isoformat(),
+]
+
+BASE_TS_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+
+# Campos de leads mapeados por nombre en LeadService._parse_custom_fields
+LEAD_FIELDS = [
+    ("Pipeline de Viabilidad", "drop_down"),
+    ("Fecha Consulta Original", "date"),
+    ("TIS Open", "checkbox"),
+]
+
+FILLER_TYPES = ["short_text", "text", "number", "url", "email", "phone", "drop_down", "labels", "date", "checkbox", "users", "currency"]
+
+
+def _rng(index: int, seed: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + index)
+
+
+def _field_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _options(rng: random.Random, n: int) -> List[Dict]:
+    return [
+        {"id": _field_id(rng), "name": f"Opción {i}", "color": "#04A9F4", "orderindex": i}
+        for i in range(n)
+    ]
+
+
+def _custom_field(rng: random.Random, field_id: str, name: str, field_type: str) -> Dict:
+    field: Dict = {"id": field_id, "name": name, "type": field_type, "type_config": {}}
+    if rng.random() < 0.15:
+        return field  # sin valor, como ClickUp cuando el campo está vacío
+
+    if field_type == "drop_down":
+        options = _options(rng, rng.randint(3, 12))
+        field["type_config"] = {"default": 0, "options": options}
+        field["value"] = rng.randrange(len(options))
+    elif field_type == "labels":
+        options = [{"id": o["id"], "label": o["name"], "color": o["color"]} for o in _options(rng, 8)]
+        field["type_config"] = {"options": options}
+        field["value"] = [o["id"] for o in rng.sample(options, rng.randint(1, 3))]
+    elif field_type == "date":
+        field["value"] = str(BASE_TS_MS + rng.randrange(0, 365 * 86_400_000))
+    elif field_type == "checkbox":
+        field["value"] = rng.choice([True, False, "true"])
+    elif field_type == "users":
+        field["value"] = [{"id": rng.randrange(10**6), "username": rng.choice(FIRST_NAMES)}]
+    elif field_type in ("number", "currency"):
+        field["value"] = str(rng.randint(0, 50_000))
+    elif field_type == "url":
+        field["value"] = f"https://docs.google.com/document/d/{_field_id(rng)}"
+    elif field_type == "email":
+        field["value"] = f"user{rng.randrange(10**5)}@example.com"
+    elif field_type == "phone":
+        field["value"] = f"+1 {rng.randint(200, 999)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+    else:
+        field["value"] = " ".join(rng.choice(LAST_NAMES) for _ in range(rng.randint(1, 20)))
+    return field
+
+
+def _user(user_id: int, username: str) -> Dict:
+    """Usuario como lo devuelve ClickUp (con avatar), derivado sin consumir el rng."""
+    return {
+        "id": user_id,
+        "username": username,
+        "color": f"#{user_id % 0xFFFFFF:06x}",
+        "initials": username[:2].upper(),
+        "email": f"user{user_id}@example.com",
+        "profilePicture": f"https://attachments.clickup.com/profilePictures/{user_id}_{username[:2]}.jpg",
+    }
+
+
+def make_full_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def make_intake_description(index: int, seed: int = 42) -> str:
+    """Descripción de intake realista (~1-3 KB) con las etiquetas del parser."""
+    rng = _rng(index, seed)
+    mycase_id = f"{rng.randrange(10**7, 10**8)}"
+    lines = [
+        f"Name: {make_full_name(rng)}",
+        f"Phone: ({rng.randint(200, 999)}) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        f"Email: cliente{index}@example.com",
+        f"Interviewee: {rng.choice(FIRST_NAMES)}",
+        f"Result of interview: {rng.choice(['Completed', 'No show', 'Rescheduled'])}",
+        "Other result of interview (optional, explain why it wasn't completed):",
+        " ".join(rng.choice(LAST_NAMES) for _ in range(rng.randint(5, 60))),
+        f"Type of Interview: {rng.choice(['Phone', 'Video', 'In person'])}",
+        f"¿Fue videollamada?: {rng.choice(['YES', 'No'])}",
+        f"Tipo de caso: {rng.choice(CASE_TYPES)}",
+        f"Record Criminal: {rng.choice(['No', 'Si, DUI 2015'])}",
+        f"Tiene cortes migratorias pendientes (EOIR): {rng.choice(['No', 'Si'])}",
+        f"Nombre completo del referido: {make_full_name(rng)}",
+        f"Telefono del referido: {rng.randint(200, 999)}.{rng.randint(100, 999)}.{rng.randint(1000, 9999)}",
+        f"My Case ID: {mycase_id}",
+        f"My Case link: https://firm.mycase.com/leads/{mycase_id}",
+        "",
+        "Location",
+        "========",
+        rng.choice(CITIES),
+        "",
+        "Notas:",
+    ]
+    lines.extend(
+        f"- {rng.choice(DATE_FORMATS)(_date(rng))}: " + " ".join(rng.choice(LAST_NAMES) for _ in range(rng.randint(3, 25)))
+        for _ in range(rng.randint(2, 15))
+    )
+    return "\n".join(lines)
+
+
+def _date(rng: random.Random) -> datetime:
+    return datetime(2024, 1, 1) + timedelta(days=rng.randrange(0, 700))
+
+
+def make_date_value(index: int, seed: int = 42):
+    """Valor de fecha como los que llegan de ClickUp o del histórico (epoch ms, ISO, ordinales...)."""
+    rng = _rng(index, seed)
+    kind = rng.random()
+    if kind < 0.6:
+        return str(BASE_TS_MS + rng.randrange(0, 365 * 86_400_000))
+    if kind < 0.7:
+        return BASE_TS_MS + rng.randrange(0, 365 * 86_400_000)
+    return rng.choice(DATE_FORMATS)(_date(rng))
+
+
+def make_task(
+    index: int,
+    seed: int = 42,
+    n_custom_fields: int = 55,
+    trigger_field_name: Optional[str] = None,
+    task_id: Optional[str] = None,
+) -> Dict:
+    """
+    Tarea de ClickUp sintética con n_custom_fields campos (mínimo: los de
+    ID_MAP + LeadService + trigger). Si se da trigger_field_name, ese campo
+    lleva un link de intake para que el webhook de leads encole el dispatch.
+    """
+    rng = _rng(index, seed)
+    mycase_id = f"{rng.randrange(10**7, 10**8)}"
+    task_id = task_id or f"bench{index:07d}"
+    ts = BASE_TS_MS + rng.randrange(0, 365 * 86_400_000)
+
+    fields: List[Dict] = []
+    for field_id, column in AssignmentService.ID_MAP.items():
+        field_type = "date" if "date" in column or "fecha" in column or "deadline" in column else (
+            "checkbox" if column in ("packet_ready_cr", "caso_resometer") else (
+                "url" if "link" in column else "drop_down"
+            )
+        )
+        fields.append(_custom_field(rng, field_id, column.replace("_", " ").title(), field_type))
+    for name, field_type in LEAD_FIELDS:
+        fields.append(_custom_field(rng, _field_id(rng), name, field_type))
+    if trigger_field_name:
+        fields.append({
+            "id": _field_id(rng), "name": trigger_field_name, "type": "url", "type_config": {},
+            "value": f"https://intake.example.com/{task_id}",
+        })
+    while len(fields) < n_custom_fields:
+        field_type = rng.choice(FILLER_TYPES)
+        fields.append(_custom_field(rng, _field_id(rng), f"Campo {len(fields)} {field_type}", field_type))
+    rng.shuffle(fields)
+
+    description = make_intake_description(index, seed)
+    # rng aparte: los watchers no alteran el resto del contenido de la tarea
+    watchers_rng = _rng(index, seed + 1)
+    return {
+        "id": task_id,
+        "custom_id": None,
+        "name": f"{make_full_name(rng)} | {mycase_id}",
+        "text_content": description,
+        "description": description,
+        "status": {"status": rng.choice(STATUSES), "color": "#d3d3d3", "type": "custom", "orderindex": 1},
+        "orderindex": f"{index}.0000",
+        "date_created": str(ts),
+        "date_updated": str(ts + rng.randrange(0, 30 * 86_400_000)),
+        "date_closed": None,
+        "date_done": None,
+        "archived": False,
+        "creator": {**_user(1, rng.choice(FIRST_NAMES)), "email": "creator@example.com"},
+        "assignees": [_user(rng.randrange(10**6), rng.choice(FIRST_NAMES)) for _ in range(rng.randint(0, 3))],
+        "watchers": [
+            _user(watchers_rng.randrange(10**6), watchers_rng.choice(FIRST_NAMES))
+            for _ in range(watchers_rng.randint(1, 5))
+        ],
+        "checklists": [],
+        "tags": [{"name": rng.choice(CASE_TYPES).lower()}],
+        "parent": None,
+        "priority": rng.choice([None, {"id": "2", "priority": "high", "color": "#ffcc00"}]),
+        "due_date": rng.choice([None, str(ts + 14 * 86_400_000)]),
+        "start_date": None,
+        "time_estimate": None,
+        "custom_fields": fields,
+        "list": {"id": "900100000001", "name": "Leads DVS", "access": True},
+        "folder": {"id": "900100000002", "name": "Intake", "hidden": False, "access": True},
+        "space": {"id": "900100000003", "name": "Legal"},
+        "url": f"https://app.clickup.com/t/{task_id}",
+        "team_id": "9001000",
+        "permission_level": "create",
+        "sharing": {"public": False, "public_share_expires_on": None, "public_fields": [], "token": None, "seo_optimized": False},
+    }
+
+
+def make_webhook_payload(index: int, seed: int = 42, n_history_items: int = 1, event: str = "taskUpdated") -> Dict:
+    """
+    Payload de webhook de ClickUp (taskUpdated...) con n_history_items cambios
+    (status, assignee o custom field), cada uno con usuario y before/after.
+    """
+    rng = _rng(index, seed)
+    task_id = f"bench{index:07d}"
+    ts = BASE_TS_MS + rng.randrange(0, 365 * 86_400_000)
+    items = []
+    for i in range(n_history_items):
+        field = rng.choice(["status", "assignee_add", "custom_field"])
+        if field == "status":
+            before, after = ({"status": s, "color": "#d3d3d3", "type": "custom", "orderindex": 1} for s in rng.sample(STATUSES, 2))
+        elif field == "assignee_add":
+            before, after = None, _user(rng.randrange(10**6), rng.choice(FIRST_NAMES))
+        else:
+            before, after = make_full_name(rng), make_full_name(rng)
+        items.append({
+            "id": str(rng.randrange(10**18)),
+            "type": 1,
+            "date": str(ts + i),
+            "field": field,
+            "parent_id": "900100000001",
+            "data": {"status_type": "custom"} if field == "status" else {},
+            "source": None,
+            "user": _user(rng.randrange(10**6), rng.choice(FIRST_NAMES)),
+            "before": before,
+            "after": after,
+        })
+    return {
+        "event": event,
+        "history_items": items,
+        "task_id": task_id,
+        "webhook_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    }
+
+
+def make_comments(index: int, seed: int = 42, count: Optional[int] = None) -> List[Dict]:
+    rng = _rng(index, seed)
+    count = rng.randint(0, 8) if count is None else count
+    return [
+        {
+            "id": str(rng.randrange(10**9)),
+            "comment_text": " ".join(rng.choice(LAST_NAMES) for _ in range(rng.randint(3, 40))),
+            "user": {"username": rng.choice(FIRST_NAMES)},
+            "date": str(BASE_TS_MS + rng.randrange(0, 365 * 86_400_000)),
+        }
+        for _ in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(json.dumps([make_task(i) for i in range(n)], ensure_ascii=False, indent=2))
@@ -0,0 +1,16 @@
+"""
+Configuración de las pruebas unitarias (sin Postgres ni ClickUp).
+
+Settings exige estas variables al importar app.config: se ponen valores de
+prueba antes de que cualquier módulo de la app se importe.
+"""
+
+import os
+
+os.environ.setdefault("CLICKUP_API_TOKEN", "test-token")
+os.environ.setdefault("CLICKUP_WEBHOOK_SECRET", "test-secret")
+os.environ.setdefault("CLICKUP_WEBHOOK_SECRET_ASSIGNMENTS", "test-secret-assignments")
+os.environ.setdefault("CLICKUP_FIELD_ID_AI_LINK", "field-ai-link")
+# Sin el limitador de ClickUp: las pruebas no deben esperar por cuota
+os.environ.setdefault("CLICKUP_RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ.setdefault("CLICKUP_MAX_CONCURRENCY", "1000")
@@ -0,0 +1,50 @@
+"""AssignmentRepository.upsert sin Postgres: SQL compilado con el dialecto de Postgres."""
+
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.assignment_repository import AssignmentRepository
+from app.services.assignment_service import AssignmentService
+
+
+def _compile_upsert(data: dict, monkeypatch):
+    monkeypatch.setattr("app.repositories.assignment_repository.settings.change_feed_enabled", False)
+    db = MagicMock()
+    db.execute.return_value.rowcount = 1
+    AssignmentRepository(db).upsert(data)
+    return db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+
+
+def _upsert_sql(data: dict, monkeypatch) -> str:
+    return str(_compile_upsert(data, monkeypatch))
+
+
+def _set_clause(sql: str) -> str:
+    return sql.split("DO UPDATE SET", 1)[1].split(" WHERE ", 1)[0]
+
+
+def test_removing_every_assignee_writes_null(monkeypatch):
+    data = AssignmentService.transform_task({"id": "t1", "name": "Caso", "assignees": []})
+    assert "assignee" in data and data["assignee"] is None
+
+    compiled = _compile_upsert(data, monkeypatch)
+    # excluded.assignee es el valor insertado (NULL) y el SET lo copia
+    assert compiled.params["assignee"] is None
+    assert "assignee = excluded.assignee" in _set_clause(str(compiled))
+
+
+def test_columns_absent_from_data_are_reset_but_latest_comment_is_kept(monkeypatch):
+    set_clause = _set_clause(_upsert_sql({"task_id": "t1", "status": "open"}, monkeypatch))
+    assert "abogado_asignado = excluded.abogado_asignado" in set_clause
+    assert "latest_comment" not in set_clause
+    assert "task_id =" not in set_clause
+
+
+def test_synced_at_is_refreshed_on_update(monkeypatch):
+    sql = _upsert_sql({"task_id": "t1", "status": "open"}, monkeypatch)
+    assert "synced_at = now()" in _set_clause(sql)
+    # synced_at / date_updated no deciden si la fila cambió
+    where = sql.split("DO UPDATE SET", 1)[1].split(" WHERE ", 1)[1]
+    assert "synced_at" not in where and "date_updated" not in where
+    assert "case_assignments.status" in where
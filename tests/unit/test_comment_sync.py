@@ -0,0 +1,40 @@
+"""CommentSyncService: las escrituras no corren en el hilo del event loop."""
+
+import asyncio
+import threading
+
+from app.services import comment_sync_service as module
+from app.services.comment_sync_service import CommentSyncService
+
+
+class _FakeClickUp:
+    async def get_all_task_comments(self, task_id):
+        if task_id == "broken":
+            return None
+        return [{"date": "1", "comment_text": "viejo"}, {"date": "2", "comment_text": " nuevo "}]
+
+
+def test_store_runs_in_a_worker_thread_with_its_own_session(monkeypatch):
+    calls = []
+
+    class Session:
+        def close(self):
+            calls.append(("close", threading.get_ident()))
+
+    def store(db, summaries, targets):
+        calls.append(("store", threading.get_ident(), type(db), [s.latest_comment for s in summaries]))
+        return {target: len(summaries) for target in targets}
+
+    monkeypatch.setattr(module, "SessionLocal", Session)
+    monkeypatch.setattr(CommentSyncService, "store", staticmethod(store))
+
+    async def scenario():
+        result = await CommentSyncService(_FakeClickUp()).sync(["t1", "broken"], ("leads",))
+        return result, threading.get_ident()
+
+    result, loop_thread = asyncio.run(scenario())
+    assert result == {"leads": 1, "failed": 1}
+    (_, store_thread, session_type, comments), (_, close_thread) = calls
+    assert store_thread != loop_thread and close_thread == store_thread
+    assert session_type is Session
+    assert comments == ["nuevo"]
@@ -0,0 +1,49 @@
+"""parse_date: epoch ms, ISO 8601, formatos de exportación y dateutil."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.dates import parse_date
+
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize("value", [1704067200000, 1704067200000.0, "1704067200000"])
+def test_epoch_milliseconds(value):
+    assert parse_date(value) == datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-21T15:36:42Z", datetime(2024, 5, 21, 15, 36, 42, tzinfo=UTC)),
+    ("2024-05-21T09:36:42-06:00", datetime(2024, 5, 21, 15, 36, 42, tzinfo=UTC)),
+    ("2024-05-21", datetime(2024, 5, 21, tzinfo=UTC)),
+])
+def test_iso_8601(value, expected):
+    assert parse_date(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Tuesday, January 9th 2024, 3:36:42 pm -06:00", datetime(2024, 1, 9, 21, 36, 42, tzinfo=UTC)),
+    ("May 21st 2024", datetime(2024, 5, 21, tzinfo=UTC)),
+    ("Sep. 3, 2024, 12:05 am", datetime(2024, 9, 3, 0, 5, tzinfo=UTC)),
+    ("05/21/2024", datetime(2024, 5, 21, tzinfo=UTC)),
+    ("05/21/2024 3:36 pm", datetime(2024, 5, 21, 15, 36, tzinfo=UTC)),
+    ("5/1/2024 12:00 pm +02:00", datetime(2024, 5, 1, 10, 0, tzinfo=UTC)),
+])
+def test_clickup_export_formats(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_dateutil_fallback():
+    assert parse_date("21 May 2024 10:00") == datetime(2024, 5, 21, 10, 0, tzinfo=UTC)
+
+
+def test_results_are_aware_utc():
+    result = parse_date("2024-05-21T09:36:42+05:30")
+    assert result.utcoffset() == timedelta(0)
+
+
+@pytest.mark.parametrize("value", [None, "", 0, "   ", "not a date", "13:00 pm May 2024", "02/30/2024", []])
+def test_empty_or_invalid_returns_none(value):
+    assert parse_date(value) is None
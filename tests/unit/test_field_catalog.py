@@ -0,0 +1,115 @@
+"""Catálogo de custom fields: decodificación de drop_down y labels."""
+
+import asyncio
+
+from app.services.field_catalog import FieldCatalog, ListFields
+
+DROP_DOWN = {
+    "id": "dd",
+    "type": "drop_down",
+    "type_config": {"options": [
+        {"id": "uuid-a", "name": "Ana López", "orderindex": 0},
+        {"id": "uuid-b", "name": "Luis Pérez", "orderindex": 1},
+    ]},
+}
+LABELS = {
+    "id": "lb",
+    "type": "labels",
+    "type_config": {"options": [
+        {"id": "l1", "label": "VAWA"},
+        {"id": "l2", "label": "U-Visa"},
+    ]},
+}
+TEXT = {"id": "tx", "type": "short_text"}
+
+
+def _fields():
+    return ListFields("list-1", [DROP_DOWN, LABELS, TEXT])
+
+
+def test_drop_down_decodes_orderindex_string_and_uuid():
+    fields = _fields()
+    decoded = fields.decode([
+        {"id": "dd", "type": "drop_down", "value": 1},
+        {"id": "dd", "type": "drop_down", "value": "0"},
+        {"id": "dd", "type": "drop_down", "value": "uuid-b"},
+    ])
+    assert [f["value"] for f in decoded] == ["Luis Pérez", "Ana López", "Luis Pérez"]
+
+
+def test_labels_join_in_task_order():
+    decoded = _fields().decode([{"id": "lb", "type": "labels", "value": ["l2", "l1"]}])
+    assert decoded[0]["value"] == "U-Visa, VAWA"
+
+
+def test_other_fields_and_none_values_pass_through():
+    text = {"id": "tx", "type": "short_text", "value": "hola"}
+    empty = {"id": "dd", "type": "drop_down", "value": None}
+    decoded = _fields().decode([text, empty])
+    assert decoded[0] is text and decoded[1] is empty
+
+
+def test_task_fields_are_not_mutated():
+    field = {"id": "dd", "type": "drop_down", "value": 0}
+    _fields().decode([field])
+    assert field["value"] == 0
+
+
+def test_unknown_option_keeps_value_and_marks_stale():
+    fields = _fields()
+    decoded = fields.decode([
+        {"id": "dd", "type": "drop_down", "value": 7},
+        {"id": "lb", "type": "labels", "value": ["l1", "nueva"]},
+    ])
+    assert [f["value"] for f in decoded] == [7, ["l1", "nueva"]]
+    assert fields.stale
+
+
+def test_catalog_without_list_returns_fields_unchanged():
+    catalog = FieldCatalog()
+    custom_fields = [{"id": "dd", "type": "drop_down", "value": 0}]
+    assert catalog.decode("list-1", custom_fields) is custom_fields
+    catalog.load("list-1", [DROP_DOWN])
+    assert catalog.decode("list-1", custom_fields)[0]["value"] == "Ana López"
+
+
+class _FakeClickUp:
+    def __init__(self, fields):
+        self.fields = fields
+        self.calls = 0
+
+    async def get_list_fields(self, list_id):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.fields
+
+
+def test_ensure_downloads_once_for_concurrent_webhooks():
+    catalog = FieldCatalog(refresh_seconds=3600)
+    clickup = _FakeClickUp([DROP_DOWN])
+
+    async def scenario():
+        return await asyncio.gather(*(catalog.ensure("list-1", clickup) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert clickup.calls == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_stale_list_is_refreshed_on_next_ensure():
+    catalog = FieldCatalog(refresh_seconds=3600)
+    clickup = _FakeClickUp([DROP_DOWN])
+    fields = asyncio.run(catalog.ensure("list-1", clickup))
+    fields.decode([{"id": "dd", "type": "drop_down", "value": 9}])
+    asyncio.run(catalog.ensure("list-1", clickup))
+    assert clickup.calls == 2
+
+
+def test_failed_download_keeps_previous_definitions():
+    catalog = FieldCatalog(refresh_seconds=0)
+    previous = catalog.load("list-1", [DROP_DOWN])
+    clickup = _FakeClickUp(None)
+    assert asyncio.run(catalog.ensure("list-1", clickup)) is previous
+    # Tras un error no se reintenta enseguida
+    asyncio.run(catalog.ensure("list-1", clickup))
+    assert clickup.calls == 1
@@ -0,0 +1,94 @@
+"""Esquema de custom fields: match por ID / nombre y conversores por perfil."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core import field_schema
+from app.core.field_schema import get_schema
+
+
+@pytest.fixture
+def schema_path(tmp_path, monkeypatch):
+    config = {
+        "by_name": {
+            "type_converters": {"date": "date", "checkbox": "checkbox"},
+            "fields": [
+                {"name": "Fecha", "column": "fecha"},
+                {"name": "Activo", "column": "activo"},
+                {"name": "Notas", "column": "notas"},
+            ],
+        },
+        "by_id": {
+            "type_converters": {"checkbox": "checkbox_lenient"},
+            "fields": [
+                {"id": "id-activo", "column": "activo"},
+                {"id": "id-fecha", "column": "fecha_raw", "converter": "raw"},
+                {"id": "id-link", "name": "Link", "column": "link"},
+            ],
+        },
+        "from_settings": {
+            "fields": [{"id_setting": "clickup_field_id_ai_link", "column": "ai_link"}],
+        },
+    }
+    path = tmp_path / "custom_fields.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    monkeypatch.setattr(field_schema.settings, "custom_field_schema_path", str(path))
+    return path
+
+
+FIELDS = [
+    {"id": "id-fecha", "name": "Fecha", "type": "date", "value": "1704067200000"},
+    {"id": "id-activo", "name": "Activo", "type": "checkbox", "value": "true"},
+    {"id": "otro", "name": "Notas", "type": "text", "value": "primera"},
+    {"id": "otro-2", "name": "Notas", "type": "text", "value": "segunda"},
+    {"id": "id-x", "name": "Link", "type": "url", "value": "https://x"},
+]
+
+
+def test_match_by_name_with_type_converters(schema_path):
+    result = get_schema("by_name").extract(FIELDS)
+    assert result["fecha"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert result["activo"] is False  # "checkbox" estricto: solo True
+    assert result["notas"] == "primera"  # el primer campo que coincide gana
+
+
+def test_match_by_id_with_fixed_and_lenient_converters(schema_path):
+    result = get_schema("by_id").extract(FIELDS)
+    assert result["fecha_raw"] == "1704067200000"
+    assert result["activo"] is True
+    assert result["link"] == "https://x"  # respaldo por nombre
+
+
+def test_multiple_profiles_in_one_pass(schema_path):
+    results = get_schema("by_name", "by_id").extract_profiles(FIELDS)
+    assert set(results) == {"by_name", "by_id"}
+    assert results["by_name"]["activo"] is False
+    assert results["by_id"]["activo"] is True
+
+
+def test_id_from_settings(schema_path):
+    fields = [{"id": field_schema.settings.clickup_field_id_ai_link, "type": "url", "value": "https://ai"}]
+    assert get_schema("from_settings").extract(fields) == {"ai_link": "https://ai"}
+
+
+def test_empty_fields_and_unknown_profile(schema_path):
+    assert get_schema("by_id").extract(None) == {}
+    assert get_schema("by_name", "by_id").extract_profiles([]) == {"by_name": {}, "by_id": {}}
+    with pytest.raises(KeyError):
+        get_schema("missing")
+
+
+def test_unknown_converter_is_rejected(tmp_path, monkeypatch):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"p": {"fields": [{"id": "x", "column": "c", "converter": "nope"}]}}))
+    monkeypatch.setattr(field_schema.settings, "custom_field_schema_path", str(path))
+    with pytest.raises(ValueError):
+        get_schema("p")
+
+
+def test_bundled_schema_compiles(monkeypatch):
+    monkeypatch.setattr(field_schema.settings, "custom_field_schema_path", None)
+    schema = get_schema("trigger", "leads", "assignments")
+    assert schema.profiles == ("trigger", "leads", "assignments")
@@ -0,0 +1,19 @@
+"""LeadRepository.upsert sin Postgres (sesión simulada)."""
+
+from unittest.mock import MagicMock
+
+from app.repositories.lead_repository import HEAVY_COLUMNS, LeadRepository
+
+
+def test_upsert_does_not_mutate_callers_dict(monkeypatch):
+    monkeypatch.setattr("app.repositories.lead_repository.settings.change_feed_enabled", False)
+    db = MagicMock()
+    db.execute.return_value.rowcount = 1
+    heavy = next(iter(HEAVY_COLUMNS))
+    data = {"task_id": "t1", "mycase_id": "12345678", "task_name": "Lead", heavy: "texto"}
+    original = dict(data)
+
+    LeadRepository(db).upsert(data)
+
+    assert data == original
+    db.commit.assert_called_once()
@@ -0,0 +1,124 @@
+"""ResponseCache: etiquetas versionadas, ETag y backends."""
+
+import pytest
+
+from app.core.cache import (
+    COLLECTION_TAG,
+    MemoryStore,
+    ResponseCache,
+    SQLiteStore,
+    etag_matches,
+    task_tag,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    return MemoryStore(max_entries=16)
+
+
+def _builder(calls, body=b'{"ok":1}', tags=None):
+    def build():
+        calls.append(1)
+        return body, tags if tags is not None else [task_tag("t1"), COLLECTION_TAG]
+    return build
+
+
+def test_fetch_caches_until_a_tag_is_invalidated(store):
+    cache = ResponseCache(store, ttl=60)
+    calls = []
+    first = cache.fetch("lead", {"task_id": "t1"}, _builder(calls))
+    second = cache.fetch("lead", {"task_id": "t1"}, _builder(calls))
+    assert len(calls) == 1
+    assert second.body == first.body and second.etag == first.etag
+
+    cache.invalidate_task("t1")
+    cache.fetch("lead", {"task_id": "t1"}, _builder(calls))
+    assert len(calls) == 2
+
+
+def test_invalidating_other_task_keeps_detail_entry(store):
+    cache = ResponseCache(store, ttl=60)
+    calls = []
+    cache.fetch("lead", {"task_id": "t1"}, _builder(calls, tags=[task_tag("t1")]))
+    cache.invalidate(task_tag("t2"))
+    cache.fetch("lead", {"task_id": "t1"}, _builder(calls, tags=[task_tag("t1")]))
+    assert len(calls) == 1
+
+
+def test_collection_tag_invalidates_every_collection_response(store):
+    cache = ResponseCache(store, ttl=60)
+    calls = []
+    for query in ("ana", "luis"):
+        cache.fetch("lead_search", {"q": query}, _builder(calls, tags=[COLLECTION_TAG]))
+    cache.invalidate_task("t9")  # cualquier escritura toca la colección
+    for query in ("ana", "luis"):
+        cache.fetch("lead_search", {"q": query}, _builder(calls, tags=[COLLECTION_TAG]))
+    assert len(calls) == 4
+
+
+def test_write_during_build_is_not_cached(store):
+    cache = ResponseCache(store, ttl=60)
+    calls = []
+
+    def build():
+        calls.append(1)
+        cache.invalidate_task("t1")  # una escritura concurrente
+        return b"{}", [COLLECTION_TAG]
+
+    cache.fetch("lead_list", {}, build)
+    cache.fetch("lead_list", {}, build)
+    assert len(calls) == 2
+
+
+def test_key_ignores_param_order_and_none():
+    assert ResponseCache.make_key("ns", {"a": 1, "b": None, "c": 2}) == ResponseCache.make_key("ns", {"c": 2, "a": 1})
+    assert ResponseCache.make_key("ns", {"a": 1}) != ResponseCache.make_key("other", {"a": 1})
+
+
+def test_disabled_cache_builds_every_time():
+    cache = ResponseCache(MemoryStore(), enabled=False)
+    calls = []
+    cache.fetch("lead", {"task_id": "t1"}, _builder(calls))
+    response = cache.fetch("lead", {"task_id": "t1"}, _builder(calls))
+    assert len(calls) == 2
+    assert response.etag == ResponseCache.make_etag(response.body)
+
+
+def test_memory_store_versions_survive_lru_eviction():
+    store = MemoryStore(max_entries=2)
+    version = store.incr("tag:x")
+    for i in range(10):
+        store.set(f"k{i}", i)
+    assert store.get("tag:x") == version
+    assert len(store) == 2
+
+
+def test_etag_matches():
+    etag = ResponseCache.make_etag(b"body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_mycase_response_follows_writes_to_other_leads(monkeypatch):
+    """/leads/mycase/{id}: otro lead con el mismo id_mycase puede pasar a ser el ganador."""
+    from unittest.mock import MagicMock
+
+    from app.api import leads
+
+    cache = ResponseCache(MemoryStore(), ttl=60)
+    monkeypatch.setattr(leads, "response_cache", cache)
+    lead = MagicMock(task_id="t1")
+    monkeypatch.setattr(leads.LeadRepository, "get_by_mycase_id", lambda self, *a, **k: lead)
+    monkeypatch.setattr(leads, "_lead_dict", lambda row, selected: {"task_id": row.task_id})
+
+    first = leads.get_lead_by_mycase("12345678", fields=None, if_none_match=None, db=MagicMock())
+    lead = MagicMock(task_id="t2")
+    cache.invalidate_task("t2")  # upsert de t2 con el mismo id_mycase
+    second = leads.get_lead_by_mycase("12345678", fields=None, if_none_match=None, db=MagicMock())
+    assert b"t1" in first.body and b"t2" in second.body
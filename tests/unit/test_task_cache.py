@@ -0,0 +1,143 @@
+"""TaskCache: single-flight, TTL e invalidación por webhook."""
+
+import asyncio
+
+from app.core.cache import MemoryStore
+from app.core.clickup_task import ClickUpTask
+from app.core.task_cache import TaskCache
+
+
+def _task(task_id: str = "t1", date_updated: int = 1_000, name: str = "Lead") -> ClickUpTask:
+    return ClickUpTask({"id": task_id, "name": name, "date_updated": str(date_updated)})
+
+
+def _cache() -> TaskCache:
+    return TaskCache(MemoryStore(max_entries=16), ttl=30)
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = _cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _task()
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("t1", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    # Ya cacheada: sin fetch
+    assert asyncio.run(cache.get_or_fetch("t1", fetch)) is results[0]
+    assert len(calls) == 1
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_cached():
+    cache = _cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("clickup down")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("t1", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("t1") is None
+
+
+def test_none_is_not_cached():
+    cache = _cache()
+
+    async def fetch():
+        return None
+
+    assert asyncio.run(cache.get_or_fetch("t1", fetch)) is None
+    assert cache.get("t1") is None
+
+
+def test_keep_raw_needs_an_entry_with_raw_data():
+    cache = _cache()
+    cache.put("t1", _task())
+    assert cache.get("t1") is not None
+    assert cache.get("t1", keep_raw=True) is None
+
+
+def test_webhook_newer_than_cached_copy_invalidates():
+    cache = _cache()
+    cache.put("t1", _task(date_updated=1_000))
+    assert cache.note_webhook("taskUpdated", "t1", [{"date": "2000"}])
+    assert cache.get("t1") is None
+
+
+def test_webhook_not_newer_than_cached_copy_keeps_entry():
+    """El segundo webhook del mismo cambio reutiliza la tarea que pidió el primero."""
+    cache = _cache()
+    cache.put("t1", _task(date_updated=2_000))
+    assert not cache.note_webhook("taskUpdated", "t1", [{"date": "2000"}])
+    assert cache.get("t1") is not None
+
+
+def test_webhook_without_dates_always_invalidates():
+    cache = _cache()
+    cache.put("t1", _task())
+    assert cache.note_webhook("taskStatusUpdated", "t1", [])
+    assert cache.get("t1") is None
+
+
+def test_non_mutating_event_is_ignored():
+    cache = _cache()
+    cache.put("t1", _task())
+    assert not cache.note_webhook("taskCommentPosted", "t1", [{"date": "9999999"}])
+    assert cache.get("t1") is not None
+
+
+def test_webhook_during_fetch_discards_the_in_flight_result():
+    cache = _cache()
+    release = None
+
+    async def fetch():
+        await release.wait()
+        return _task(name="viejo")
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.ensure_future(cache.get_or_fetch("t1", fetch))
+        await asyncio.sleep(0)
+        # Cambio sin fecha: posterior al inicio del fetch en vuelo
+        invalidated = cache.note_webhook("taskUpdated", "t1")
+        release.set()
+        return invalidated, await first
+
+    invalidated, task = asyncio.run(scenario())
+    assert invalidated
+    assert task.name == "viejo"  # el solicitante recibe su respuesta...
+    assert cache.get("t1") is None  # ...pero no se cachea
+
+
+def test_invalidate_after_write():
+    cache = _cache()
+    cache.put("t1", _task())
+    cache.invalidate("t1")
+    assert cache.get("t1") is None
+
+
+def test_disabled_cache_always_fetches():
+    cache = TaskCache(MemoryStore(), enabled=False)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return _task()
+
+    asyncio.run(cache.get_or_fetch("t1", fetch))
+    asyncio.run(cache.get_or_fetch("t1", fetch))
+    assert len(calls) == 2
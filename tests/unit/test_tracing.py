@@ -0,0 +1,45 @@
+"""Tracing: span no-op compartido con el exportador apagado."""
+
+import pytest
+
+from app.core import tracing
+
+
+@pytest.fixture
+def exporter_disabled(monkeypatch):
+    monkeypatch.setattr(tracing.exporter, "enabled", False)
+
+
+def test_begin_span_without_parent_is_shared_noop(exporter_disabled):
+    span = tracing.begin_span("a")
+    assert span is tracing.NOOP_SPAN
+    assert tracing.begin_span("b") is span
+    span.name = "changed"
+    span.status = "error"
+    span.set_attribute("k", "v")
+    assert (span.name, span.status, span.attributes) == ("noop", "unset", {})
+
+
+def test_noop_is_not_propagated(exporter_disabled):
+    with tracing.start_span("outer") as span:
+        assert not span.recording
+        assert tracing.current_context() is None
+        assert not tracing.is_recording()
+    assert tracing.SpanContext.from_traceparent(tracing.NOOP_SPAN.context.traceparent) is None
+
+
+def test_incoming_trace_is_continued(exporter_disabled):
+    parent = tracing.SpanContext.from_traceparent("00-" + "a" * 32 + "-" + "b" * 16 + "-01")
+    with tracing.start_span("server", parent=parent) as span:
+        assert span.recording
+        assert span.trace_id == "a" * 32
+        with tracing.start_span("child") as child:
+            assert child.recording and child.parent_span_id == span.context.span_id
+
+
+def test_enabled_exporter_creates_root_spans(monkeypatch):
+    monkeypatch.setattr(tracing.exporter, "enabled", True)
+    monkeypatch.setattr(tracing.exporter, "export", lambda span: None)
+    span = tracing.begin_span("root")
+    assert span.recording and span is not tracing.NOOP_SPAN
+    assert len(span.trace_id) == 32
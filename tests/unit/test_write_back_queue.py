@@ -0,0 +1,206 @@
+"""Cola de escrituras a ClickUp: coalescencia, orden por clave y reintentos."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import write_back_queue as module
+from app.services.write_back_queue import WriteBackJob, WriteBackQueue
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.clickup.com/api/v2/task/t1/field/f")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(code, request=request))
+
+
+class FakeClickUp:
+    """Registra las escrituras; `failures` son errores a lanzar en orden por valor."""
+
+    def __init__(self):
+        self.writes = []  # (task_id, field_id, value) en el orden en que terminan
+        self.failures = {}  # value -> [excepciones]
+        self.delay = 0.0
+        self.inflight = set()
+        self.overlap = False
+
+    def service(self, client=None):
+        fake = self
+
+        class Service:
+            async def write_custom_field(self, task_id, field_id, value):
+                key = (task_id, field_id)
+                if key in fake.inflight:
+                    fake.overlap = True
+                fake.inflight.add(key)
+                try:
+                    await asyncio.sleep(fake.delay)
+                    errors = fake.failures.get(value)
+                    if errors:
+                        raise errors.pop(0)
+                    fake.writes.append((task_id, field_id, value))
+                finally:
+                    fake.inflight.discard(key)
+
+        return Service()
+
+
+@pytest.fixture
+def clickup(monkeypatch):
+    fake = FakeClickUp()
+    monkeypatch.setattr(module, "ClickUpService", fake.service)
+    return fake
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_coalesces_pending_writes_to_latest_value(clickup):
+    async def scenario():
+        queue = WriteBackQueue(workers=2, retry_base_seconds=0.01)
+        outcomes = [queue.enqueue(WriteBackJob("t1", "f", f"v{i}")) for i in range(5)]
+        await queue.join()
+        await queue.stop()
+        return outcomes
+
+    outcomes = _run(scenario())
+    assert outcomes == ["queued"] + ["coalesced"] * 4
+    assert clickup.writes == [("t1", "f", "v4")]
+
+
+def test_same_key_never_in_flight_twice_and_keeps_order(clickup):
+    clickup.delay = 0.02
+
+    async def scenario():
+        queue = WriteBackQueue(workers=4, retry_base_seconds=0.01)
+        queue.enqueue(WriteBackJob("t1", "f", "a"))
+        await asyncio.sleep(0.005)  # "a" ya en vuelo
+        queue.enqueue(WriteBackJob("t1", "f", "b"))
+        queue.enqueue(WriteBackJob("t2", "f", "c"))
+        await queue.join()
+        await queue.stop()
+
+    _run(scenario())
+    assert not clickup.overlap
+    assert [w[2] for w in clickup.writes if w[0] == "t1"] == ["a", "b"]
+    assert ("t2", "f", "c") in clickup.writes
+
+
+def test_retries_transient_errors_and_reports_success(clickup):
+    clickup.failures["v"] = [_status_error(503), httpx.ConnectError("down")]
+    done = []
+
+    async def scenario():
+        queue = WriteBackQueue(workers=1, retry_base_seconds=0.01)
+        job = WriteBackJob("t1", "f", "v", on_done=[lambda j, outcome: done.append((j.attempts, outcome))])
+        queue.enqueue(job)
+        await queue.join()
+        await queue.stop()
+
+    _run(scenario())
+    assert clickup.writes == [("t1", "f", "v")]
+    assert done == [(3, "success")]
+
+
+def test_client_errors_fail_without_retry(clickup):
+    clickup.failures["v"] = [_status_error(400)]
+    done = []
+
+    async def scenario():
+        queue = WriteBackQueue(workers=1, retry_base_seconds=0.01)
+        queue.enqueue(WriteBackJob("t1", "f", "v", on_done=[lambda j, outcome: done.append(outcome)]))
+        await queue.join()
+        await queue.stop()
+
+    _run(scenario())
+    assert clickup.writes == []
+    assert done == ["failed"]
+
+
+def test_newer_value_during_retry_backoff_is_not_overwritten(clickup):
+    """fallo -> llega un valor nuevo durante el backoff -> el reintento escribe el nuevo, nunca el viejo después."""
+    clickup.failures["old"] = [_status_error(500)]
+    done = []
+
+    async def scenario():
+        queue = WriteBackQueue(workers=2, retry_base_seconds=0.05)
+        queue.enqueue(WriteBackJob("t1", "f", "old", on_done=[lambda j, o: done.append(("old", o))]))
+        await asyncio.sleep(0.02)  # "old" falló y espera su reintento
+        outcome = queue.enqueue(WriteBackJob("t1", "f", "new", on_done=[lambda j, o: done.append(("new", o))]))
+        await queue.join()
+        await queue.stop()
+        return outcome
+
+    outcome = _run(scenario())
+    assert outcome == "coalesced"
+    assert clickup.writes == [("t1", "f", "new")]
+    # Ambos callbacks reciben el resultado de la única escritura
+    assert sorted(done) == [("new", "success"), ("old", "success")]
+
+
+def test_failed_write_with_newer_value_queued_is_superseded(clickup):
+    """Si ya hay un valor más nuevo en cola cuando falla, no se reintenta el viejo."""
+    clickup.delay = 0.02
+    clickup.failures["old"] = [_status_error(500)]
+
+    async def scenario():
+        queue = WriteBackQueue(workers=2, retry_base_seconds=0.01)
+        queue.enqueue(WriteBackJob("t1", "f", "old"))
+        await asyncio.sleep(0.005)  # "old" en vuelo
+        queue.enqueue(WriteBackJob("t1", "f", "new"))
+        await queue.join()
+        await queue.stop()
+
+    _run(scenario())
+    assert clickup.writes == [("t1", "f", "new")]
+
+
+def test_rejects_when_full(clickup):
+    async def scenario():
+        queue = WriteBackQueue(workers=1, max_pending=2)
+        outcomes = [queue.enqueue(WriteBackJob(f"t{i}", "f", "v")) for i in range(3)]
+        await queue.join()
+        await queue.stop()
+        return outcomes
+
+    assert _run(scenario()) == ["queued", "queued", "rejected"]
+
+
+def test_stop_reports_unfinished_writes_as_dropped(clickup):
+    clickup.delay = 0.5
+    clickup.failures["retrying"] = [_status_error(500)]
+    done = []
+
+    def track(j, outcome):
+        done.append((j.task_id, outcome))
+
+    async def scenario():
+        queue = WriteBackQueue(workers=1, retry_base_seconds=5.0)
+        queue.enqueue(WriteBackJob("t1", "f", "retrying", on_done=[track]))
+        await asyncio.sleep(0.6)  # falló y espera su reintento
+        queue.enqueue(WriteBackJob("t2", "f", "inflight", on_done=[track]))
+        queue.enqueue(WriteBackJob("t3", "f", "pending", on_done=[track]))
+        await asyncio.sleep(0.05)  # t2 en vuelo, t3 en cola
+        await queue.stop(timeout=0.05)
+        return queue
+
+    queue = _run(scenario())
+    assert sorted(done) == [("t1", "dropped"), ("t2", "dropped"), ("t3", "dropped")]
+    assert queue.pending() == 0
+
+
+def test_enqueue_is_rejected_while_stopping(clickup):
+    clickup.delay = 0.1
+
+    async def scenario():
+        queue = WriteBackQueue(workers=1)
+        queue.enqueue(WriteBackJob("t1", "f", "v"))
+        stopping = asyncio.ensure_future(queue.stop(timeout=1.0))
+        await asyncio.sleep(0)
+        outcome = queue.enqueue(WriteBackJob("t2", "f", "v"))
+        await stopping
+        return outcome
+
+    assert _run(scenario()) == "rejected"
+    assert clickup.writes == [("t1", "f", "v")]